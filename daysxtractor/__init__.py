@@ -1,5 +1,28 @@
 from .samplingdaysselector import SamplingDaysSelector
-from .mipdaysselector import MIPDaysSelector
 from .bins import Bins
 from .minpopbins import MinPopBins
+from .quantilebins import QuantileBins
+from .binscache import BinsCache, createBins
+from .periods import PeriodData, PeriodBins
 from .csv_interface import parseFile, parseRepresentativeDays, parseData
+
+
+## Modules of the attributes imported on first use, to avoid loading the optimization libraries with the package.
+_lazyAttributes = {'MIPDaysSelector': 'mipdaysselector',
+                   'LPRoundingDaysSelector': 'lproundingdaysselector',
+                   'DecomposedMIPDaysSelector': 'decomposeddaysselector',
+                   'PortfolioMIPDaysSelector': 'portfoliodaysselector',
+                   'DistributedSamplingDaysSelector': 'distributeddaysselector',
+                   'AutoDaysSelector': 'autodaysselector'}
+
+
+## Import an attribute of the package on first use.
+# @param name Name of the attribute.
+# @return Attribute.
+def __getattr__(name):
+    if name in _lazyAttributes:
+        import importlib
+        value = getattr(importlib.import_module('.' + _lazyAttributes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -3,15 +3,27 @@
 
 import sys, time, getopt, datetime, os
 
-from daysxtractor.mipdaysselector import MIPDaysSelector
 import daysxtractor.excel_interface as excel
 import daysxtractor.csv_interface as csv
+import daysxtractor.columnar_interface as columnar
 from daysxtractor import SamplingDaysSelector
 from daysxtractor import MinPopBins as Bins
+import daysxtractor.binscache as binscache
+import daysxtractor.datastore as datastore
+import daysxtractor.batch as batch
+from daysxtractor.resultcache import ResultCache
+from daysxtractor.checkpoint import Checkpoint
+import daysxtractor.evaluation as evaluation
+from daysxtractor.durationcurves import DurationCurves
+from daysxtractor.data import plotLabels, parsePeriod, AGGREGATIONS
+from daysxtractor.periods import PeriodData
+import daysxtractor.metrics as metrics
 
 
 ## Entry point of the program.
 # @param argv Program parameters.
+# @return Dictionary with the name of the labels as keys and tuples (nrmsError, relativeAreaError) as values, None if
+#         no days are selected or checked.
 def main(argv):
     # Default parameters
     numberRepresentativeDays = 12
@@ -22,16 +34,41 @@ def main(argv):
     check = None  # Path of the file containing the representative days to check
     outputFolder = None
     parseUnits = False
+    rounding = None  # Rounding of the linear relaxation, None to solve the full MIP
+    decomposition = None  # Temporal blocks of the decomposition, None to solve the full MIP
+    jobs = None  # Number of processes, None to use the number of processors
+    binsCacheFolder = None  # Folder keeping the bins between runs
+    plotFormat = "pdf"
+    metricsPath = None  # Path of the JSON report of the metrics
+    binnedErrors = False  # Measure the errors at the resolution of the bins instead of the exact duration curves
+    storePath = None  # Path of the store of the data and their bins extended with the new days of the input
+    manifestPath = None  # Path of the manifest listing the datasets of a batch
+    resamplePeriod = None  # Period of the aggregated time series, None to keep the period of the data
+    aggregation = 'mean'  # Aggregation of the values when resampling
+    resultsCacheFolder = None  # Folder keeping the selections between runs
+    continueSelection = False  # Continue from a cached selection found with a shorter time limit
+    exportFormats = []  # Formats of the export of the time series of the representative days
+    embedding = None  # Embedding of the day profiles of the sampling, None to sample on the full profiles
+    dimension = 16  # Dimension of the embedding
+    periodLength = None  # Number of days of the representative periods, None to select days
+    periodStride = None  # Number of days between the first days of consecutive periods, None for the period length
+    coordinator = None  # Address (host, port) of the coordinator of the distributed sampling, None to sample locally
+    localWorkers = 0  # Number of workers of the distributed sampling started on this host
+    samples = None  # Number of samples of the distributed sampling, None to sample until the time limit
+    checkpointPath = None  # Path of the checkpoint of the selection, None to select without checkpoint
+    resume = False  # Resume the selection from the checkpoint
+    engine = None  # Engine forced in the automatic mode, None for the automatic choice
+    autoSolverNames = None  # Solvers of the automatic mode in order of preference, None for the default ones
 
     # Parse parameters
-    if len(argv) < 1:
-        displayHelp()
-        sys.exit(2)
-    filePath = argv[-1]
-
     try:
-        opts, args = getopt.getopt(argv[0:-1], 'n:s:t:vpc:o:u',
-                                   ['number=', 'solver=', 'timelimit=', 'verbose', 'plot', 'check=', 'output=', 'units'])
+        opts, paths = getopt.getopt(argv, 'n:s:t:vpc:o:ur:d:j:b:f:m:',
+                                    ['number=', 'solver=', 'timelimit=', 'verbose', 'plot', 'check=', 'output=',
+                                     'units', 'rounding=', 'decompose=', 'jobs=', 'binscache=', 'binned',
+                                     'format=', 'metrics=', 'store=', 'manifest=', 'resample=',
+                                     'aggregation=', 'resultscache=', 'continue',
+                                     'export=', 'embedding=', 'dimension=', 'period=', 'stride=', 'coordinator=',
+                                     'workers=', 'samples=', 'checkpoint=', 'resume', 'engine='])
     except getopt.GetoptError as err:
         displayHelp()
         sys.exit(2)
@@ -43,6 +80,12 @@ def main(argv):
             numberRepresentativeDays = n
         elif opt in ('-s', '--solver'):
             solver = arg
+            if arg.startswith('auto:'):
+                solver = 'auto'
+                autoSolverNames = [name for name in arg[len('auto:'):].split(',') if name != '']
+                if len(autoSolverNames) == 0:
+                    raise Exception('Invalid solver "%s", expected auto followed by solvers such as auto:cbc,glpk.'
+                                    % arg)
         elif opt in ('-t', '--timelimit'):
             t = float(arg)
             if t < 0.0:
@@ -58,18 +101,137 @@ def main(argv):
             outputFolder = arg
         elif opt in ('-u', '--units'):
             parseUnits = True
+        elif opt in ('-r', '--rounding'):
+            if arg not in ('top', 'random'):
+                raise Exception('Unknown rounding "%s", expected "top" or "random".' % arg)
+            rounding = arg
+        elif opt in ('-d', '--decompose'):
+            if arg not in ('season', 'month'):
+                raise Exception('Unknown decomposition "%s", expected "season" or "month".' % arg)
+            decomposition = arg
+        elif opt in ('-j', '--jobs'):
+            j = int(arg)
+            if j < 1:
+                raise Exception('One process is the minimum number accepted.')
+            jobs = j
+        elif opt in ('-b', '--binscache'):
+            binsCacheFolder = arg
+        elif opt in ('-f', '--format'):
+            plotFormat = arg
+        elif opt == '--binned':
+            binnedErrors = True
+        elif opt == '--metrics':
+            metricsPath = arg
+        elif opt == '--store':
+            storePath = arg
+        elif opt in ('-m', '--manifest'):
+            manifestPath = arg
+        elif opt == '--resample':
+            resamplePeriod = parsePeriod(arg)
+        elif opt == '--aggregation':
+            if arg not in AGGREGATIONS:
+                raise Exception('Unknown aggregation "%s", expected one of %s.' % (arg, ", ".join(AGGREGATIONS)))
+            aggregation = arg
+        elif opt == '--resultscache':
+            resultsCacheFolder = arg
+        elif opt == '--continue':
+            continueSelection = True
+        elif opt == '--export':
+            exportFormats = arg.split(',')
+            for fileFormat in exportFormats:
+                if fileFormat not in ('npz', 'parquet', 'arrow', 'csv'):
+                    raise Exception('Unknown export format "%s", expected npz, parquet, arrow or csv.' % fileFormat)
+        elif opt == '--embedding':
+            if arg not in ('pca', 'random'):
+                raise Exception('Unknown embedding "%s", expected "pca" or "random".' % arg)
+            embedding = arg
+        elif opt == '--dimension':
+            k = int(arg)
+            if k < 1:
+                raise Exception('The dimension of the embedding should be positive.')
+            dimension = k
+        elif opt == '--period':
+            periodLength = int(arg)
+            if periodLength < 1:
+                raise Exception('A period of one day is the minimum accepted.')
+        elif opt == '--stride':
+            periodStride = int(arg)
+            if periodStride < 1:
+                raise Exception('A stride of one day is the minimum accepted.')
+        elif opt == '--coordinator':
+            host, separator, port = arg.rpartition(':')
+            if separator == '' or not port.isdigit():
+                raise Exception('Invalid coordinator address "%s", expected host:port.' % arg)
+            coordinator = (host, int(port))
+        elif opt == '--workers':
+            localWorkers = int(arg)
+            if localWorkers < 0:
+                raise Exception('The number of workers should be positive.')
+        elif opt == '--engine':
+            from daysxtractor.autodaysselector import ENGINES
+            if arg not in ENGINES:
+                raise Exception('Unknown engine "%s", expected one of %s.' % (arg, ", ".join(ENGINES)))
+            engine = arg
+        elif opt == '--checkpoint':
+            checkpointPath = arg
+        elif opt == '--resume':
+            resume = True
+        elif opt == '--samples':
+            samples = int(arg)
+            if samples < 1:
+                raise Exception('One sample is the minimum number accepted.')
+
+    if engine is not None and solver != 'auto':
+        raise Exception('The option --engine forces an engine of the automatic mode, it requires -s auto.')
+    if solver is not None and solver != 'auto' and ',' in solver and (rounding is not None or decomposition is not None):
+        raise Exception('A list of solvers races the full MIP, it cannot be combined with a rounding (-r) or a '
+                        'decomposition (-d).')
+    if solver == 'auto' and (rounding is not None or decomposition is not None):
+        raise Exception('The automatic mode chooses its engine, it cannot be combined with a rounding (-r) or a '
+                        'decomposition (-d). Use --engine rounding or --engine decomposed to force an engine.')
 
     if outputFolder is None:
         outputFolder = "."
     if outputFolder[-1] not in ['/', '\\']:
         outputFolder += '/'
 
-    # Read the data
+    # Process a batch of datasets, each one with the options of the batch
+    if manifestPath is not None:
+        paths = batch.parseManifest(manifestPath) + paths
+    if len(paths) < 1:
+        displayHelp()
+        sys.exit(2)
+    if manifestPath is not None or len(paths) > 1:
+        if coordinator is not None:
+            raise Exception('The distributed sampling (--coordinator) cannot process several datasets, which would all '
+                            'bind the same address.')
+        options = []
+        for opt, arg in opts:
+            if opt not in ('-o', '--output', '-j', '--jobs', '--metrics', '-m', '--manifest'):
+                options += [opt, arg] if arg != '' else [opt]
+        tic = time.time()
+        runs = batch.runBatch(paths, options, outputFolder, jobs)
+        print("%s datasets processed in %.2fs:" % (len(runs), time.time() - tic))
+        for path, folder, seconds, results, error in runs:
+            print("\t%s\t%.2fs\t%s" % (path, seconds, "ERROR: %s" % error if error is not None else folder))
+        return None
+    filePath = paths[0]
+
+    binscache.defaultCache.folder = binsCacheFolder
+    if metricsPath is not None:
+        metrics.reset()
+        metrics.enable()
+
+    # Read the data, aggregated while parsing when resampled
     ext = filePath[-3:].lower()
+    if resamplePeriod is not None:
+        print("Data resampled to periods of %s (%s) while parsing." % (resamplePeriod, aggregation))
     if ext == "xls":
-        data = excel.parseFile(filePath, parseUnits)
+        data = excel.parseFile(filePath, parseUnits, resamplePeriod, aggregation)
     elif ext == "csv":
-        data = csv.parseFile(filePath, parseUnits)
+        data = csv.parseFile(filePath, parseUnits, resamplePeriod, aggregation)
+    elif columnar.isColumnar(filePath):
+        data = columnar.parseFile(filePath, resamplePeriod, aggregation)
     else:
         print('Unknown input format "%s" of file "%s".' % (ext, filePath))
         exit(0)
@@ -79,18 +241,95 @@ def main(argv):
     if solver is None:
         if check is not None:
             print("WARNING: No optimization solver set. Try using an optimization solver (e.g. cplex, gurobi, cbc, etc.) for better results.")
-        daySelector = SamplingDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
-                                           verbose=verbose)
+        if coordinator is not None:
+            from daysxtractor.distributeddaysselector import DistributedSamplingDaysSelector
+            daySelector = DistributedSamplingDaysSelector(numberRepresentativeDays=numberRepresentativeDays,
+                                                          timelimit=timelimit, embedding=embedding,
+                                                          dimension=dimension, address=coordinator,
+                                                          localWorkers=localWorkers, samples=samples,
+                                                          verbose=verbose)
+        else:
+            daySelector = SamplingDaysSelector(numberRepresentativeDays=numberRepresentativeDays,
+                                               timelimit=timelimit, embedding=embedding, dimension=dimension,
+                                               verbose=verbose)
+    elif solver == 'auto':
+        from daysxtractor.autodaysselector import AutoDaysSelector, SOLVER_NAMES
+        daySelector = AutoDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                       solverNames=autoSolverNames if autoSolverNames is not None else SOLVER_NAMES,
+                                       engine=engine, processes=jobs, verbose=verbose)
+    elif ',' in solver:
+        from daysxtractor.portfoliodaysselector import PortfolioMIPDaysSelector
+        daySelector = PortfolioMIPDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                               solverNames=solver.split(','), verbose=verbose)
+    elif rounding is not None:
+        from daysxtractor.lproundingdaysselector import LPRoundingDaysSelector
+        daySelector = LPRoundingDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                             solverName=solver, rounding=rounding, verbose=verbose)
+    elif decomposition is not None:
+        from daysxtractor.decomposeddaysselector import DecomposedMIPDaysSelector
+        daySelector = DecomposedMIPDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                                solverName=solver, blocks=decomposition, processes=jobs,
+                                                verbose=verbose)
     else:
+        from daysxtractor.mipdaysselector import MIPDaysSelector
         daySelector = MIPDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
                                       solverName=solver, verbose=verbose)
 
+    # Extend the store with the new days and reuse its bins
+    if storePath is not None:
+        data, storeBins, days, rebuilt = datastore.append(
+            storePath, data, lambda d: binscache.createBins(d, daySelector.binsPerTimeSeries))
+        binscache.defaultCache.put(data, storeBins, persist=rebuilt) # Extended bins are not those of a new run
+        print("%s new days appended to the store%s." % (len(days), ", bins created from all the days" if rebuilt else ""))
+
+    # Select periods of consecutive days instead of days
+    if periodLength is not None:
+        data = PeriodData(data, periodLength, periodStride)
+        if numberRepresentativeDays > len(data.timeSeries):
+            raise Exception('Cannot select %s representative periods among %s periods of %s days starting every %s '
+                            'days.' % (numberRepresentativeDays, len(data.timeSeries), data.length, data.stride))
+        print("%s periods of %s days starting every %s days.\n" % (len(data.days()), data.length, data.stride))
+
+    # Periodically write the state of the selection
+    if checkpointPath is not None:
+        if not hasattr(daySelector, 'checkpoint') or coordinator is not None:
+            raise Exception('Checkpoints are only supported by the sampling and the decomposed MIP (-d).')
+        daySelector.checkpoint = Checkpoint(checkpointPath, resume=resume)
+    elif resume:
+        raise Exception('The option --resume requires a checkpoint (--checkpoint path).')
+
+    # Check a batch of representative days files
+    if check is not None and evaluation.isBatch(check):
+        checkBatch(data, daySelector.binsPerTimeSeries, check, outputFolder, jobs, binnedErrors)
+        if metricsPath is not None:
+            metrics.dump(metricsPath)
+        return None
+
     # Select days
     representativeDays = None
     if check is None:
         tic = time.time()
-        representativeDays = daySelector.selectDays(data)
+        with metrics.timer('select.' + type(daySelector).__name__):
+            try:
+                if resultsCacheFolder is not None:
+                    representativeDays, hit = ResultCache(resultsCacheFolder).selectDays(data, daySelector,
+                                                                                         continueSelection)
+                    if hit:
+                        print("\nSelection found in the results cache.")
+                else:
+                    representativeDays = daySelector.selectDays(data)
+            finally:
+                if hasattr(daySelector, 'close'):
+                    daySelector.close() # Stop the coordinator of the distributed sampling
         toc = time.time()
+        if rounding is not None:
+            from daysxtractor.lproundingdaysselector import LPRoundingDaysSelector
+            if isinstance(daySelector, LPRoundingDaysSelector):
+                print("\nObjective value of %.2f%s." % (daySelector.objective, daySelector.boundReport()))
+        if hasattr(daySelector, 'solverReport'):
+            print("\nSolvers of the portfolio:")
+            for line in daySelector.solverReport():
+                print("\t" + line)
         print("\nRepresentative days and weights found after %.2fs:" % (toc - tic))
     else:
         check_ext = check[-3:].lower()
@@ -107,9 +346,7 @@ def main(argv):
         print("\t%.2f\t-\t%s" % (
         representativeDays[day], day.strftime("%d %B %Y") if isinstance(day, datetime.datetime) else day))
 
-    bins = Bins(data, daySelector.binsPerTimeSeries)
-    representativeBins = Bins()
-    representativeBins.createFromRepresentativeDays(bins, representativeDays)
+    bins = binscache.createBins(data, daySelector.binsPerTimeSeries)
 
     # Output
     if outputFolder is not None:
@@ -118,47 +355,144 @@ def main(argv):
             excel.writeDays(representativeDays, "%s/days.xls" % outputFolder)
         else:
             csv.writeDays(representativeDays, "%s/days.csv" % outputFolder)
+        with metrics.timer('export'):
+            for fileFormat in exportFormats:
+                path = "%srepresentative.%s" % (outputFolder, fileFormat)
+                if fileFormat == "csv":
+                    csv.writeRepresentativeSeries(data, representativeDays, path, True)
+                else:
+                    columnar.writeRepresentativeSeries(data, representativeDays, path)
 
     # Plot
     if plot:
-        for label in data.labels:
-            data.plotRepresentativeTimeseries(label, representativeDays, pathPrefix=outputFolder)
+        plotLabels(data, data.labels, representativeDays, pathPrefix=outputFolder, fileFormat=plotFormat,
+                   processes=jobs)
 
     # Error measures
+    with metrics.timer('errors'):
+        results = evaluation.evaluateDays(bins, representativeDays, None if binnedErrors else DurationCurves(data))
     print("\nError measures:")
     print("\t- Bins population:")
     for p in bins.labelRanges():
-        populationMin, populationMax = bins.population(p)
-        print("\t\t%s: min=%.2f%%, max=%.2f%%" % (bins.labels[p].name, populationMin * 100.0, populationMax * 100.0))
+        print("\t\t%s: min=%.2f%%, max=%.2f%%" % (bins.labels[p].name, results[p]['populationMin'] * 100.0,
+                                                 results[p]['populationMax'] * 100.0))
 
-    print("\t- Normalized root-mean-square error:")
+    print("\t- Normalized root-mean-square error%s:" % (" (bins)" if binnedErrors else ""))
     for p in bins.labelRanges():
-        print("\t\t%s: %.2f%%" % (bins.labels[p].name, bins.nrmsError(p, representativeBins) * 100.0))
+        print("\t\t%s: %.2f%%" % (bins.labels[p].name, results[p]['nrmsError'] * 100.0))
 
-    print("\t- Relative area error:")
+    print("\t- Relative area error%s:" % (" (bins)" if binnedErrors else ""))
     for p in bins.labelRanges():
-        print("\t\t%s: %.2f%%" % (bins.labels[p].name, bins.relativeAreaError(p, representativeBins) * 100.0))
+        print("\t\t%s: %.2f%%" % (bins.labels[p].name, results[p]['relativeAreaError'] * 100.0))
+
+    if metricsPath is not None:
+        metrics.dump(metricsPath)
+
+    return {bins.labels[p].name: (results[p]['nrmsError'], results[p]['relativeAreaError']) for p in bins.labelRanges()}
+
+## Evaluate a batch of representative days files and write the evaluation table.
+# @param data Data with the time series.
+# @param binsPerTimeSeries Number of bins per time series.
+# @param pattern Directory or glob pattern of the representative days files.
+# @param outputFolder Output folder of the table.
+# @param jobs Number of processes, None to use the number of processors.
+# @param binnedErrors Measure the errors at the resolution of the bins instead of the exact duration curves.
+def checkBatch(data, binsPerTimeSeries, pattern, outputFolder, jobs, binnedErrors=False):
+    paths = evaluation.expandPaths(pattern)
+    if len(paths) == 0:
+        print('No representative days file found for "%s".' % pattern)
+        return
+
+    bins = binscache.createBins(data, binsPerTimeSeries)
+    tic = time.time()
+    curves = None if binnedErrors else DurationCurves(data)
+    evaluations = evaluation.evaluateFiles(bins, paths, curves, jobs)
+    toc = time.time()
+    print("%s files evaluated in %.2fs:" % (len(paths), toc - tic))
+
+    # Print the table
+    print("\t%s" % "\t".join(["File", "Label", "Pop. min", "Pop. max", "NRMSE", "Area error"]))
+    for path, results, error in evaluations:
+        if error is not None:
+            print("\t%s\tERROR: %s" % (path, error))
+            continue
+        for p in bins.labelRanges():
+            print("\t%s\t%s\t%s" % (path, bins.labels[p].name,
+                                    "\t".join("%.2f%%" % (results[p][m] * 100.0) for m in evaluation.MEASURES)))
+
+    os.makedirs(outputFolder, exist_ok=True)
+    evaluation.writeTable(bins, evaluations, "%scheck.csv" % outputFolder)
 
 
 ## Display help of the program.
 def displayHelp():
     text = ''
-    text += 'Usage :\n\tpython -m daysxtractor [options] data.xlsx\n'
+    text += 'Usage :\n\tpython -m daysxtractor [options] data.xlsx [data2.xlsx ...]\n'
     text += 'Extract a given number of representative days of a set of time series.\n'
-    text += '\nThe first column of the excel file is the date.\n'
+    text += '\nThe data is a CSV, XLS, NPZ, Parquet or Arrow file. The first column of the excel file is the date.\n'
     text += 'Following columns are the different parameters characterizing the parameters.\n'
 
     text += 'Options:\n'
     text += '   -n 12       --number 12       Number of representative days to select.\n'
     text += '   -s name     --solver name     Use an optimization solver (cplex, gurobi, cbc, asl:scip, etc.).\n'
+    text += '                                  A list such as cbc,glpk,appsi_highs races the solvers in parallel,\n'
+    text += '                                  without -r or -d.\n'
+    text += '                                  "auto" chooses the engine from calibration runs and the time limit,\n'
+    text += '                                  "auto:cbc,glpk" with the first available solver of the list, without\n'
+    text += '                                  -r or -d (see --engine).\n'
     text += '   -t 60       --timelimit 60    Set the time limit to 60 seconds.\n'
     text += '   -v          --verbose         Verbose mode.\n'
     text += '   -p          --plot            Plot.\n'
+    text += '   -f png      --format png      Format of the plots (pdf, png, svg, etc.), by default pdf.\n'
     text += '   -c days.xls --check days.xls  Check selected representative days. The first row of the file is a\n'
     text += '                                  header. The next lines contains the days in the first column and \n'
-    text += '                                  their weights in the second.\n'
+    text += '                                  their weights in the second. A folder or a glob pattern (e.g.\n'
+    text += '                                  "days/*.csv") evaluates all its files in a table written in check.csv.\n'
     text += '   -u          --units           Specifies that the second row of the excel files contains the units.\n'
     text += '   -o folder   --output folder   Output the plots in a specific folder.\n'
+    text += '   -r top      --rounding top    With a solver, round the linear relaxation instead of solving the\n'
+    text += '                                  full MIP ("top" or "random" rounding).\n'
+    text += '   -d season   --decompose season With a solver, solve the MIP by blocks of days ("season" or "month").\n'
+    text += '                                  The blocks and the fit of the weights share the time limit.\n'
+    text += '   -j 4        --jobs 4          Number of processes, by default the number of processors.\n'
+    text += '   -m list.txt --manifest list.txt Process the datasets listed in a file, one path per line.\n'
+    text += '   -b folder   --binscache folder Keep the bins in a folder to skip the binning of later runs.\n'
+    text += '               --resultscache folder Keep the selections in a folder and reuse them for the same data\n'
+    text += '                                  and options, up to the time limit which found them.\n'
+    text += '               --continue        With --resultscache, continue from a selection found with a shorter\n'
+    text += '                                  time limit instead of starting over.\n'
+    text += '               --export npz,csv  Write the time series of the representative days and their weights\n'
+    text += '                                  in representative.npz, .parquet, .arrow or .csv.\n'
+    text += '               --embedding pca   Without solver, sample in a PCA ("pca") or random projection ("random")\n'
+    text += '                                  of the cumulated day profiles, re-scoring the best samples exactly.\n'
+    text += '               --dimension 16    Dimension of the embedding, by default 16.\n'
+    text += '               --period 7        Select representative periods of 7 consecutive days, identified by\n'
+    text += '                                  their first day, instead of days.\n'
+    text += '               --stride 1        Number of days between the first days of consecutive periods, by\n'
+    text += '                                  default the length of the periods. The weights of the periods count\n'
+    text += '                                  windows, the exported series scales them by stride/length.\n'
+    text += '               --coordinator 0.0.0.0:50000 Without solver, distribute the sampling on workers\n'
+    text += '                                  connecting to this address (python -m\n'
+    text += '                                  daysxtractor.distributeddaysselector -H host -p 50000).\n'
+    text += '               --workers 4       With --coordinator, number of workers started on this host.\n'
+    text += '               --samples 100000  With --coordinator, number of samples instead of the time limit, for\n'
+    text += '                                  a selection reproducible with the same seed.\n'
+    text += '               --checkpoint sel.ckpt Write the state of the sampling or of the decomposed MIP every\n'
+    text += '                                  minute in a file.\n'
+    text += '               --resume          With --checkpoint, resume the selection from the file with the\n'
+    text += '                                  remaining time.\n'
+    text += '               --engine rounding Requires -s auto, force an engine (mip, decomposed, rounding,\n'
+    text += '                                  distributed, embedding or sampling).\n'
+    text += '               --binned          Measure the errors at the resolution of the bins instead of the exact\n'
+    text += '                                  duration curves.\n'
+    text += '               --metrics out.json Write the timers and counters of the run in a JSON file.\n'
+    text += '               --resample 1h     Aggregate the time series to a longer period (e.g. 1h, 15min) while\n'
+    text += '                                  parsing, by chunks of a month of days.\n'
+    text += '               --aggregation max Aggregation of the resampled values (mean, sum, min or max), by\n'
+    text += '                                  default mean.\n'
+    text += '               --store data.pickle Append the new days of the input to a store of the data and their\n'
+    text += '                                  bins, and use all the days of the store. The new days must follow the\n'
+    text += '                                  last day of the store.\n'
 
     print(text)
 
@@ -0,0 +1,331 @@
+##@package autodaysselector
+# @author Sebastien MATHIEU
+
+from __future__ import division
+
+import os, time, math, random
+
+from .daysselector import DaysSelector
+from .samplingdaysselector import SamplingDaysSelector
+from .binscache import createBins
+from . import metrics
+
+## Engines of the automatic selector, from the most to the least exact.
+ENGINES = ['mip', 'decomposed', 'rounding', 'distributed', 'embedding', 'sampling']
+## Optimization solvers of the automatic selector in order of preference.
+SOLVER_NAMES = ('cplex', 'gurobi', 'appsi_highs', 'highs', 'cbc', 'glpk')
+## Share of the time limit spent on the calibration of the engines.
+CALIBRATION_SHARE = 0.1
+## Number of days of the calibration of the optimization engines.
+CALIBRATION_DAYS = 20
+## Number of samples of the calibration of the sampling engines.
+CALIBRATION_SAMPLES = 50
+## Exponent of the growth of the solving time of the MIP with the number of days.
+MIP_EXPONENT = 2.0
+## Exponent of the growth of the solving time of the linear relaxation with the number of days.
+LP_EXPONENT = 1.5
+## Estimated memory in bytes of the optimization model per nonzero of its constraints.
+BYTES_PER_NONZERO = 1000
+## Number of blocks of the decomposed MIP, as a decomposition by season.
+DECOMPOSED_BLOCKS = 4
+## Time in seconds to start the coordinator and the local workers of the distributed sampling.
+DISTRIBUTED_OVERHEAD = 1.0
+## Dimension of the embedding of the sampling.
+EMBEDDING_DIMENSION = 16
+
+
+## Selector of days choosing its engine from the size of the data, the resources of the machine and the time limit.
+# The cost of each engine is estimated from calibration runs on a subset of the days. The most exact optimization
+# engine expected to solve within the remaining time and memory is chosen, otherwise the sampling path with the most
+# samples expected in the remaining time. The plan with the estimates is printed and kept in the plan attribute.
+class AutoDaysSelector(DaysSelector):
+    ## Constructor.
+    # @param numberRepresentativeDays Number of representative days to select.
+    # @param timelimit Time limit for the process, including the calibration.
+    # @param binsPerTimeSeries Number of bins discretizing the time series.
+    # @param solverNames Optimization solvers in order of preference, the first available one being used.
+    # @param engine Engine in ENGINES forced instead of the automatic choice, None for the automatic choice.
+    # @param processes Number of processes, None to use the number of processors.
+    # @param verbose Verbose boolean.
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40,
+                 solverNames=SOLVER_NAMES, engine=None, processes=None, verbose=False):
+        if engine is not None and engine not in ENGINES:
+            raise Exception('Unknown engine "%s", expected one of %s.' % (engine, ', '.join(ENGINES)))
+        self.numberRepresentativeDays = numberRepresentativeDays
+        self.timeLimit = timelimit
+        self.binsPerTimeSeries = binsPerTimeSeries
+        self.solverNames = list(solverNames)
+        self.engine = engine
+        self.processes = processes
+        self.verbose = verbose
+        self.objective = None
+        self.lowerBound = None
+        self.plan = None
+
+    def configuration(self):
+        configuration = DaysSelector.configuration(self)
+        configuration['solverNames'] = tuple(self.solverNames)
+        configuration['engine'] = self.engine
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
+        tic = time.time()
+        bins = createBins(data, self.binsPerTimeSeries)
+        with metrics.timer('auto.plan'):
+            self.plan = self._plan(data, bins, tic)
+        self._log()
+
+        selector = self._selector(self.plan['engine'], max(0.0, self.timeLimit - (time.time() - tic)))
+        try:
+            representativeDays = selector.selectDays(data, incumbent)
+        finally:
+            if hasattr(selector, 'close'):
+                selector.close()
+        self.objective = selector.objective
+        if getattr(selector, 'lowerBound', None) is not None:
+            self.lowerBound = selector.lowerBound
+        return representativeDays
+
+    ## Plan the selection.
+    # @param data Data with the time series.
+    # @param bins Bins of the time series.
+    # @param tic Start time of the selection.
+    # @return Dictionary with the dimensions of the problem ('days', 'labels', 'bins'), the resources ('processes',
+    #         'memory'), the solver ('solver'), the estimates of each engine ('estimates'), the time left after the
+    #         calibration ('remaining') and the chosen engine ('engine', 'reason').
+    def _plan(self, data, bins, tic):
+        plan = {'days': len(bins.days), 'labels': len(bins.labels),
+                'bins': sum(bins.binsNumber[p] for p in bins.labelRanges()),
+                'processes': self.processes or os.cpu_count() or 1, 'memory': _availableMemory(),
+                'solver': None, 'estimates': {}}
+        if self.engine is not None:
+            if self.engine in ('mip', 'decomposed', 'rounding'):
+                plan['solver'] = self._solverName()
+                if plan['solver'] is None:
+                    raise Exception('None of the solvers %s is available for the engine "%s".'
+                                    % (', '.join(self.solverNames), self.engine))
+            plan.update({'engine': self.engine, 'reason': 'forced', 'remaining': self.timeLimit - (time.time() - tic)})
+            return plan
+
+        # Calibrate the engines within a share of the time limit
+        deadline = tic + self.timeLimit * CALIBRATION_SHARE
+        estimates = plan['estimates']
+        estimates.update(self._calibrateSampling(bins, plan))
+        plan['solver'] = self._solverName()
+        if plan['solver'] is not None:
+            estimates.update(self._calibrateOptimization(data, plan, deadline))
+
+        # Estimates in the time left
+        remaining = max(0.0, self.timeLimit - (time.time() - tic))
+        plan['remaining'] = remaining
+        for estimate in estimates.values():
+            if estimate.get('secondsPerSample') is not None:
+                estimate['samples'] = int(max(0.0, remaining - estimate['overhead']) / estimate['secondsPerSample'])
+                estimate['fits'] = estimate['samples'] > 0
+            else:
+                estimate['fits'] = estimate.get('seconds') is not None and estimate['seconds'] <= remaining \
+                                   and (plan['memory'] is None or estimate['memory'] < plan['memory'] / 2)
+
+        # Most exact optimization engine expected to fit, otherwise the sampling with the most samples
+        for engine in ENGINES:
+            estimate = estimates.get(engine)
+            if estimate is not None and estimate.get('seconds') is not None and estimate['fits']:
+                plan['engine'] = engine
+                plan['reason'] = 'expected to solve in %.2fs' % estimate['seconds']
+                return plan
+        engine = max((e for e in ENGINES if estimates.get(e, {}).get('samples') is not None),
+                     key=lambda e: estimates[e]['samples'])
+        plan['engine'] = engine
+        plan['reason'] = 'most samples expected'
+        return plan
+
+    ## Estimate the time of a sample of the sampling engines.
+    # @param bins Bins of the time series.
+    # @param plan Plan with the dimensions of the problem and the resources.
+    # @return Dictionary with the engines as keys and their time per sample and overhead as values.
+    def _calibrateSampling(self, bins, plan):
+        sampling = SamplingDaysSelector(numberRepresentativeDays=self.numberRepresentativeDays,
+                                        binsPerTimeSeries=self.binsPerTimeSeries)
+        profiles, cumulatedBinSize = sampling._profiles(bins)
+        with metrics.timer('auto.calibration.sampling'):
+            seconds = _sampleTime(sampling, profiles, cumulatedBinSize)
+        estimates = {'sampling': {'secondsPerSample': seconds, 'overhead': 0.0}}
+
+        if plan['processes'] > 1:
+            estimates['distributed'] = {'secondsPerSample': seconds / plan['processes'],
+                                        'overhead': DISTRIBUTED_OVERHEAD}
+
+        if plan['bins'] > 2 * EMBEDDING_DIMENSION:
+            sampling.embedding = 'pca'
+            sampling.dimension = EMBEDDING_DIMENSION
+            with metrics.timer('auto.calibration.embedding'):
+                tic = time.time()
+                embeddedProfiles, embeddedTarget = sampling._embed(bins, profiles, cumulatedBinSize)
+                overhead = time.time() - tic
+                seconds = _sampleTime(sampling, embeddedProfiles, embeddedTarget)
+            estimates['embedding'] = {'secondsPerSample': seconds, 'overhead': overhead}
+        return estimates
+
+    ## Estimate the solving time of the optimization engines from their solving time on a subset of the days.
+    # The engines which cannot be solved on the subset before the deadline are not estimated.
+    # @param data Data with the time series.
+    # @param plan Plan with the dimensions of the problem, the resources and the solver.
+    # @param deadline Time at which the calibration stops.
+    # @return Dictionary with the engines as keys and their estimated time and memory as values.
+    def _calibrateOptimization(self, data, plan, deadline):
+        from .lproundingdaysselector import LPRoundingDaysSelector
+        from .portfoliodaysselector import PortfolioMIPDaysSelector
+
+        D = plan['days']
+        days = list(data.days())
+        m = min(D, CALIBRATION_DAYS)
+        subset = data.subset([days[int(i * D / m)] for i in range(m)])
+        n = max(1, min(self.numberRepresentativeDays, m // 2))
+
+        # Memory of the model, the error constraints having a nonzero per day and bin
+        memory = 2 * D * plan['bins'] * BYTES_PER_NONZERO
+
+        # Linear relaxation, quickly solved
+        estimates = {}
+        if time.time() < deadline:
+            tic = time.time()
+            try:
+                with metrics.timer('auto.calibration.rounding'):
+                    LPRoundingDaysSelector(n, deadline - tic, self.binsPerTimeSeries, plan['solver']).selectDays(subset)
+                seconds = time.time() - tic
+                estimates['rounding'] = {'calibration': seconds, 'seconds': seconds * (D / m) ** LP_EXPONENT,
+                                         'memory': memory}
+            except Exception as e:
+                estimates['rounding'] = {'seconds': None, 'error': str(e) or type(e).__name__}
+        else:
+            estimates['rounding'] = {'seconds': None, 'error': 'no time left for the calibration'}
+
+        # MIP in a process stopped at the deadline
+        if time.time() < deadline:
+            selector = PortfolioMIPDaysSelector(n, deadline - time.time(), self.binsPerTimeSeries, [plan['solver']],
+                                                grace=0)
+            try:
+                with metrics.timer('auto.calibration.mip'):
+                    selector.selectDays(subset)
+            except Exception:
+                pass
+            result = selector.solverResults[plan['solver']]
+            if result['status'] == 'optimal':
+                estimates['mip'] = {'calibration': result['seconds'],
+                                    'seconds': result['seconds'] * (D / m) ** MIP_EXPONENT, 'memory': memory}
+            else:
+                estimates['mip'] = {'seconds': None, 'error': 'not solved within the calibration (%s)'
+                                                             % result['status']}
+        else:
+            estimates['mip'] = {'seconds': None, 'error': 'no time left for the calibration'}
+
+        # Blocks solved in parallel, the weights being then fitted on all the days
+        mip = estimates['mip']
+        if mip.get('seconds') is not None and D > DECOMPOSED_BLOCKS * m:
+            blockSeconds = mip['calibration'] * (D / DECOMPOSED_BLOCKS / m) ** MIP_EXPONENT
+            rounds = math.ceil(DECOMPOSED_BLOCKS / plan['processes'])
+            estimates['decomposed'] = {'seconds': blockSeconds * rounds + (estimates['rounding'].get('seconds') or 0.0),
+                                       'memory': memory / DECOMPOSED_BLOCKS}
+        return estimates
+
+    ## Name of the first available solver.
+    # @return Name of the solver, None if no solver is available.
+    def _solverName(self):
+        try:
+            from .mipdaysselector import solverAvailable
+        except ImportError:
+            return None
+        for solverName in self.solverNames:
+            if solverAvailable(solverName):
+                return solverName
+        return None
+
+    ## Create the selector of an engine.
+    # @param engine Engine in ENGINES.
+    # @param timelimit Time limit of the selector.
+    # @return Days selector.
+    def _selector(self, engine, timelimit):
+        parameters = {'numberRepresentativeDays': self.numberRepresentativeDays, 'timelimit': timelimit,
+                      'binsPerTimeSeries': self.binsPerTimeSeries, 'verbose': self.verbose}
+        if engine == 'sampling':
+            return SamplingDaysSelector(**parameters)
+        elif engine == 'embedding':
+            return SamplingDaysSelector(embedding='pca', dimension=EMBEDDING_DIMENSION, **parameters)
+        elif engine == 'distributed':
+            from .distributeddaysselector import DistributedSamplingDaysSelector
+            return DistributedSamplingDaysSelector(address=('127.0.0.1', 0), localWorkers=self.plan['processes'],
+                                                   **parameters)
+        elif engine == 'mip':
+            from .mipdaysselector import MIPDaysSelector
+            return MIPDaysSelector(solverName=self.plan['solver'], **parameters)
+        elif engine == 'rounding':
+            from .lproundingdaysselector import LPRoundingDaysSelector
+            return LPRoundingDaysSelector(solverName=self.plan['solver'], **parameters)
+        from .decomposeddaysselector import DecomposedMIPDaysSelector
+        return DecomposedMIPDaysSelector(solverName=self.plan['solver'], processes=self.processes, **parameters)
+
+    ## Print and record the plan.
+    def _log(self):
+        plan = self.plan
+        memory = '%.1f GB' % (plan['memory'] / 1e9) if plan['memory'] is not None else 'unknown'
+        print("Automatic planning for %s days, %s labels and %s bins with %s processes, %s of memory and the solver %s:"
+              % (plan['days'], plan['labels'], plan['bins'], plan['processes'], memory, plan['solver']))
+        for engine in ENGINES:
+            estimate = plan['estimates'].get(engine)
+            if estimate is None:
+                continue
+            if estimate.get('error') is not None:
+                description = 'calibration failed: %s' % estimate['error']
+            elif estimate.get('samples') is not None:
+                description = '%d samples at %.2es per sample' % (estimate['samples'], estimate['secondsPerSample'])
+            else:
+                description = '%.2fs' % estimate['seconds']
+            print("\t%s: %s%s" % (engine, description, '' if estimate['fits'] else ', does not fit'))
+        print("Engine %s chosen (%s) with %.2fs left.\n" % (plan['engine'], plan['reason'],
+                                                          max(0.0, plan['remaining'])))
+
+        metrics.record('auto.engine', plan['engine'])
+        metrics.record('auto.estimates', plan['estimates'])
+
+    ## @var numberRepresentativeDays
+    # Number of representative days to select.
+    ## @var timeLimit
+    # Time limit for the process in seconds, including the calibration.
+    ## @var binsPerTimeSeries
+    # Number of bins discretizing the time series.
+    ## @var solverNames
+    # Optimization solvers in order of preference.
+    ## @var engine
+    # Engine forced instead of the automatic choice, None for the automatic choice.
+    ## @var processes
+    # Number of processes, None to use the number of processors.
+    ## @var verbose
+    # Verbose (True or False).
+    ## @var objective
+    # Objective value of the last selection, None before any selection.
+    ## @var lowerBound
+    # Lower bound of the objective given by the chosen engine, None if it gives none.
+    ## @var plan
+    # Plan of the last selection, None before any selection.
+
+
+## Average time of a sample.
+# @param sampling Sampling selector.
+# @param profiles Profile of each day.
+# @param cumulatedBinSize Cumulated bin sizes.
+# @return Time in seconds.
+def _sampleTime(sampling, profiles, cumulatedBinSize):
+    rand = random.Random(0)
+    tic = time.time()
+    for s in range(CALIBRATION_SAMPLES):
+        sampling._evaluateDays(sampling._sampleDays(rand, len(profiles)), profiles, cumulatedBinSize)
+    return max(time.time() - tic, 1e-9) / CALIBRATION_SAMPLES
+
+
+## Available memory of the machine.
+# @return Memory in bytes, None if it is unknown.
+def _availableMemory():
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
@@ -0,0 +1,128 @@
+##@package batch
+# @author Sebastien MATHIEU
+#
+# Batch of datasets processed by the command line interface in a pool of processes.
+
+import os, csv, time, contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+
+## Parse a manifest listing the datasets of a batch.
+# The manifest has one path per line. Empty lines and lines starting with # are ignored and relative paths are relative
+# to the folder of the manifest.
+# @param path Path of the manifest.
+# @return List of paths of the datasets.
+def parseManifest(path):
+    folder = os.path.dirname(path)
+    paths = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line == '' or line.startswith('#'):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(folder, line))
+    return paths
+
+
+## Unique name of each dataset, after its file.
+# @param paths List of paths of the datasets.
+# @return List of names, in the order of the paths.
+def datasetNames(paths):
+    names = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        unique = name
+        i = 2
+        while unique in names:
+            unique = "%s-%s" % (name, i)
+            i += 1
+        names.append(unique)
+    return names
+
+
+## Output folder of each dataset, named after its file.
+# @param paths List of paths of the datasets.
+# @param outputFolder Output folder of the batch.
+# @return List of output folders, in the order of the paths.
+def datasetFolders(paths, outputFolder):
+    return [os.path.join(outputFolder, name, '') for name in datasetNames(paths)]
+
+
+## Command line options of a dataset of the batch.
+# The files written by a single dataset, given by the options of DATASET_FILE_OPTIONS, get the name of the dataset
+# (e.g. store.pickle becomes store-region1.pickle) so that the datasets never write the same file.
+# @param options List of command line options of the batch.
+# @param name Name of the dataset.
+# @return List of command line options of the dataset.
+def datasetOptions(options, name):
+    options = list(options)
+    for i in range(len(options) - 1):
+        if options[i] in DATASET_FILE_OPTIONS:
+            root, ext = os.path.splitext(options[i + 1])
+            options[i + 1] = "%s-%s%s" % (root, name, ext)
+    return options
+
+
+## Options of the files written by a single dataset, renamed for each dataset of a batch.
+DATASET_FILE_OPTIONS = ('--store', '--checkpoint')
+
+
+## Process datasets with the command line interface and write a summary of the batch.
+# Each dataset is processed with its own output folder, where its days, plots, metrics and output are written. A
+# dataset which fails is reported in the summary without stopping the batch.
+# @param paths List of paths of the datasets.
+# @param options List of command line options applied to each dataset.
+# @param outputFolder Output folder of the batch.
+# @param processes Number of processes, None to use the number of processors and 1 to process in this process.
+# @return List of tuples (path, folder, seconds, results, error) where results is returned by the command line
+#         interface and error is None on success.
+def runBatch(paths, options, outputFolder, processes=None):
+    tasks = [(path, folder, datasetOptions(options, name))
+             for path, folder, name in zip(paths, datasetFolders(paths, outputFolder), datasetNames(paths))]
+    if processes == 1:
+        runs = [_runDataset(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            runs = list(executor.map(_runDataset, tasks))
+
+    os.makedirs(outputFolder, exist_ok=True)
+    writeSummary(runs, os.path.join(outputFolder, 'summary.csv'))
+    return runs
+
+
+## Write the summary of a batch in a CSV table with one row per dataset and label.
+# @param runs List of runs as returned by runBatch.
+# @param path Output file path.
+def writeSummary(runs, path):
+    with open(path, "w", newline='') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["File", "Folder", "Seconds", "Label", "nrmsError", "relativeAreaError", "Error"])
+        for filePath, folder, seconds, results, error in runs:
+            if error is not None or not results:
+                writer.writerow([filePath, folder, seconds, "", "", "", error or ""])
+                continue
+            for label, (nrmsError, relativeAreaError) in results.items():
+                writer.writerow([filePath, folder, seconds, label, nrmsError, relativeAreaError, ""])
+
+
+## Process a dataset in a worker process.
+# The output of the command line interface is written in the file output.txt of the folder of the dataset.
+# @param task Tuple (path, folder, options).
+# @return Tuple (path, folder, seconds, results, error).
+def _runDataset(task):
+    from .__main__ import main
+
+    path, folder, options = task
+    os.makedirs(folder, exist_ok=True)
+    tic = time.time()
+    outputPath = os.path.join(folder, 'output.txt')
+    try:
+        with open(outputPath, 'w') as output, contextlib.redirect_stdout(output):
+            results = main(options + ['-o', folder, '-j', '1', '--metrics', os.path.join(folder, 'metrics.json'),
+                                      path])
+        return path, folder, time.time() - tic, results, None
+    except SystemExit as e:
+        return path, folder, time.time() - tic, None, 'Stopped with status %s, see %s.' % (e.code, outputPath)
+    except Exception as e:
+        return path, folder, time.time() - tic, None, str(e) or type(e).__name__
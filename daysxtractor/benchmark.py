@@ -0,0 +1,191 @@
+##@package benchmark
+# @author Sebastien MATHIEU
+#
+# Benchmark of every stage of the pipeline on seeded synthetic data.
+# Usage: python -m daysxtractor.benchmark [options]
+
+import sys, os, time, getopt, json, platform, tempfile, shutil, io, contextlib
+
+from . import csv_interface, excel_interface, binscache
+from .synthetic import generateData
+from .bins import Bins
+from .minpopbins import MinPopBins
+from .quantilebins import QuantileBins
+from .samplingdaysselector import SamplingDaysSelector
+from .durationcurves import DurationCurves
+from .data import plotLabels
+
+## Maximum number of rows of an xls sheet.
+XLS_MAX_ROWS = 65536
+
+
+## Run the benchmark.
+# @param years Number of years of synthetic data.
+# @param periodsPerDay Number of periods in each day.
+# @param labels Number of labels.
+# @param numberRepresentativeDays Number of representative days to select.
+# @param timelimit Time limit of each days selector in seconds.
+# @param solver Name of the optimization solver for the MIP-based selectors, None to skip them.
+# @param repeat Number of repetitions of the fast stages, the best time being kept.
+# @param seed Seed of the synthetic data.
+# @return Dictionary with the parameters and the results of each stage.
+def runBenchmark(years=1, periodsPerDay=24, labels=3, numberRepresentativeDays=12, timelimit=5, solver=None, repeat=3,
+                 seed=42):
+    binsPerTimeSeries = 40
+    stages = {}
+    folder = tempfile.mkdtemp(prefix='daysxtractor-benchmark-')
+    try:
+        data = _time(stages, 'generate', lambda: generateData(years, periodsPerDay, labels, seed), repeat)
+
+        # Parsers
+        csvPath = os.path.join(folder, 'data.csv')
+        _time(stages, 'csv.write', lambda: csv_interface.writeData(data, csvPath, True), 1)
+        _time(stages, 'csv.parse', lambda: _quiet(csv_interface.parseFile, csvPath, True), repeat)
+        if len(data.days()) * periodsPerDay + 2 <= XLS_MAX_ROWS:
+            xlsPath = os.path.join(folder, 'data.xls')
+            _time(stages, 'xls.write', lambda: excel_interface.writeData(data, xlsPath), 1)
+            _time(stages, 'xls.parse', lambda: _quiet(excel_interface.parseFile, xlsPath, True), repeat)
+
+        # Bins
+        _time(stages, 'bins.Bins', lambda: Bins(data, binsPerTimeSeries), repeat)
+        bins = _time(stages, 'bins.MinPopBins', lambda: MinPopBins(data, binsPerTimeSeries), repeat)
+        _time(stages, 'bins.QuantileBins', lambda: QuantileBins(data, binsPerTimeSeries), repeat)
+
+        # Days selectors
+        selectors = {'SamplingDaysSelector': SamplingDaysSelector(numberRepresentativeDays, timelimit,
+                                                                  binsPerTimeSeries)}
+        if solver is not None:
+            from .mipdaysselector import MIPDaysSelector
+            from .lproundingdaysselector import LPRoundingDaysSelector
+            from .decomposeddaysselector import DecomposedMIPDaysSelector
+            for selectorClass in (MIPDaysSelector, LPRoundingDaysSelector, DecomposedMIPDaysSelector):
+                selectors[selectorClass.__name__] = selectorClass(numberRepresentativeDays, timelimit,
+                                                                  binsPerTimeSeries, solverName=solver)
+        representativeDays = None
+        for name, selector in selectors.items():
+            representativeDays = _time(stages, 'select.' + name, lambda: _uncached(selector.selectDays, data), 1)
+            stages['select.' + name]['objective'] = getattr(selector, 'objective', None)
+
+        # Error measures
+        def binnedErrors():
+            representativeBins = Bins()
+            representativeBins.createFromRepresentativeDays(bins, representativeDays)
+            return [(bins.nrmsError(p, representativeBins), bins.relativeAreaError(p, representativeBins))
+                    for p in bins.labelRanges()]
+        _time(stages, 'errors.binned', binnedErrors, repeat)
+        curves = _time(stages, 'errors.curves', lambda: DurationCurves(data), repeat)
+        _time(stages, 'errors.exact', lambda: [(curves.nrmsError(p, representativeDays),
+                                                curves.relativeAreaError(p, representativeDays))
+                                               for p in curves.labelRanges()], repeat)
+
+        # Plots
+        prefix = os.path.join(folder, '')
+        for fileFormat in ('pdf', 'png'):
+            _time(stages, 'plot.' + fileFormat, lambda: plotLabels(data, data.labels, representativeDays,
+                                                                   pathPrefix=prefix, fileFormat=fileFormat), 1)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {'parameters': {'years': years, 'periodsPerDay': periodsPerDay, 'labels': labels,
+                           'numberRepresentativeDays': numberRepresentativeDays, 'timelimit': timelimit,
+                           'solver': solver, 'repeat': repeat, 'seed': seed, 'binsPerTimeSeries': binsPerTimeSeries},
+            'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                            'processors': os.cpu_count()},
+            'stages': stages}
+
+
+## Time a stage and record its results.
+# @param stages Dictionary of the results of the stages.
+# @param name Name of the stage.
+# @param function Function running the stage.
+# @param repeat Number of repetitions, the best time being kept.
+# @return Value returned by the last call to the function.
+def _time(stages, name, function, repeat):
+    times = []
+    for r in range(repeat):
+        tic = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - tic)
+    stages[name] = {'seconds': min(times), 'mean': sum(times) / len(times), 'repeat': repeat}
+    return result
+
+
+## Call a function with an empty cache of bins, so that each timed selection creates its bins.
+# @param function Function to call.
+# @param args Arguments of the function.
+# @return Value returned by the function.
+def _uncached(function, *args):
+    binscache.defaultCache.clear()
+    return function(*args)
+
+
+## Call a function without printing its output.
+# @param function Function to call.
+# @param args Arguments of the function.
+# @return Value returned by the function.
+def _quiet(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+## Entry point of the benchmark.
+# @param argv Program parameters.
+def main(argv):
+    parameters = {}
+    outputPath = None
+    try:
+        opts, args = getopt.getopt(argv, 'y:p:l:n:t:s:r:o:',
+                                   ['years=', 'periods=', 'labels=', 'number=', 'timelimit=', 'solver=', 'repeat=',
+                                    'output='])
+    except getopt.GetoptError as err:
+        displayHelp()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-y', '--years'):
+            parameters['years'] = float(arg)
+        elif opt in ('-p', '--periods'):
+            parameters['periodsPerDay'] = int(arg)
+        elif opt in ('-l', '--labels'):
+            parameters['labels'] = int(arg)
+        elif opt in ('-n', '--number'):
+            parameters['numberRepresentativeDays'] = int(arg)
+        elif opt in ('-t', '--timelimit'):
+            parameters['timelimit'] = float(arg)
+        elif opt in ('-s', '--solver'):
+            parameters['solver'] = arg
+        elif opt in ('-r', '--repeat'):
+            parameters['repeat'] = int(arg)
+        elif opt in ('-o', '--output'):
+            outputPath = arg
+
+    results = runBenchmark(**parameters)
+    for name, stage in results['stages'].items():
+        print("\t%-40s %10.4fs" % (name, stage['seconds']))
+
+    if outputPath is not None:
+        with open(outputPath, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+## Display help of the benchmark.
+def displayHelp():
+    text = ''
+    text += 'Usage :\n\tpython -m daysxtractor.benchmark [options]\n'
+    text += 'Benchmark every stage of the pipeline on seeded synthetic data.\n'
+
+    text += 'Options:\n'
+    text += '   -y 1        --years 1         Years of synthetic data.\n'
+    text += '   -p 24       --periods 24      Periods per day.\n'
+    text += '   -l 3        --labels 3        Number of labels.\n'
+    text += '   -n 12       --number 12       Number of representative days to select.\n'
+    text += '   -t 5        --timelimit 5     Time limit of each days selector in seconds.\n'
+    text += '   -s name     --solver name     Also benchmark the MIP-based selectors with this solver.\n'
+    text += '   -r 3        --repeat 3        Repetitions of the fast stages, the best time being kept.\n'
+    text += '   -o out.json --output out.json Write the results in a JSON file.\n'
+
+    print(text)
+
+
+# Starting point from python #
+if __name__ == "__main__":
+    main(sys.argv[1:])
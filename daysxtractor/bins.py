@@ -2,6 +2,9 @@
 # @author Sebastien MATHIEU
 
 import math, copy
+import numpy as np
+
+from . import metrics
 
 ## Create bins for time series.
 class Bins:
@@ -11,15 +14,18 @@ class Bins:
     def __init__(self, data=None, binsPerTimeSeries=10):
         self.labels = None
         self.days = None
+        self.dayIndex = None
         self.binStart = None
         self.binSize = None
         self.binsNumber = None
         self.cumulatedBinSize = None
         self.A = None
+        self.binsPerTimeSeries = binsPerTimeSeries
 
         # Actually create the bins
         if data is not None:
-            self._createBins(data, binsPerTimeSeries)
+            with metrics.timer('bins.' + type(self).__name__):
+                self._createBins(data, binsPerTimeSeries)
 
     ## Create bins from representative days.
     # @param bins Bins of the initial time series.
@@ -31,28 +37,25 @@ class Bins:
         self.binsNumber = copy.deepcopy(bins.binsNumber)
 
         # Find the original indexes of each days
-        dayIndex = 0
-        origIndexes = {}
-        weights = {}
+        self.dayIndex = {}
+        origIndexes = []
+        weights = []
         for day, w in representativeDays.items():
-            self.days[dayIndex] = day
-            weights[dayIndex] = w
-            for oIndex, d in bins.days.items():
-                if d == day:
-                    origIndexes[dayIndex] = oIndex
-                    break
-            dayIndex += 1
-
-        # Create A and binSize
+            if day not in bins.dayIndex:
+                raise Exception('Representative day %s is not part of the time series.' % day)
+            self.days[len(origIndexes)] = day
+            self.dayIndex[day] = len(origIndexes)
+            origIndexes.append(bins.dayIndex[day])
+            weights.append(w)
+        origIndexes = np.array(origIndexes, dtype=int)
+        weights = np.array(weights, dtype=float)
+
+        # Gather the columns of the representative days in A and weight them to obtain binSize
         self.A = []
         self.binSize = []
         for p in self.labelRanges():
-            self.A.append([])
-            self.binSize.append([0.0]*len(self.binRange(p)))
-            for b in self.binRange(p):
-                self.A[p].append([bins.A[p][b][origIndexes[d]] for d in self.daysRange()])
-                for d in self.daysRange():
-                    self.binSize[p][b] += weights[d]*self.A[p][b][d]
+            self.A.append(bins.A[p][:, origIndexes])
+            self.binSize.append(self.A[p].dot(weights).tolist())
 
         # Compute cumulated bin size
         self._computeCumulatedBinSize()
@@ -81,17 +84,10 @@ class Bins:
         if B != bins.binsNumber[p]:
             raise Exception("Invalid number of bins for label %s. Original has %s bins and the approximated %s." % (p, B, bins.binsNumber[p]))
 
-        result = 0.0
-        maxDC = None
-        minDC = None
-        for b in self.binRange(p):
-            binValue = (self.binStart[p][b]-self.binStart[p][b-1])/2
-            DC = self.binSize[p][b]*binValue
-            maxDC = DC if maxDC is None else max(maxDC, DC)
-            minDC = DC if minDC is None else min(minDC, DC)
-            dSize = DC-bins.binSize[p][b]*binValue
-            result += dSize*dSize
-        return math.sqrt(result/B)/(maxDC-minDC)
+        binValue = self._binValues(p)
+        DC = np.array(self.binSize[p], dtype=float)*binValue
+        dSize = DC-np.array(bins.binSize[p], dtype=float)*binValue
+        return float(math.sqrt(dSize.dot(dSize)/B)/(DC.max()-DC.min()))
 
     ## Compute the relative area error between the original duration curve and the approximated duration curve.
     # This measure directly corresponds to the average value of the time series.
@@ -102,13 +98,18 @@ class Bins:
         if self.binsNumber[p] != bins.binsNumber[p]:
             raise Exception("Invalid number of bins for label %s. Original has %s bins and the approximated %s." % (p, self.binsNumber[p], bins.binsNumber[p]))
 
-        totalCurve = 0
-        totalApproxCurve = 0.0
-        for b in self.binRange(p):
-            binValue = (self.binStart[p][b]-self.binStart[p][b-1])/2
-            totalCurve += self.binSize[p][b]*binValue
-            totalApproxCurve += bins.binSize[p][b]*binValue
-        return abs((totalCurve-totalApproxCurve)/totalCurve)
+        binValue = self._binValues(p)
+        totalCurve = np.dot(self.binSize[p], binValue)
+        totalApproxCurve = np.dot(bins.binSize[p], binValue)
+        return float(abs((totalCurve-totalApproxCurve)/totalCurve))
+
+    ## Value associated to each bin by the error measures, half the difference with the start of the previous bin.
+    # @param p Label index.
+    # @return Array with the value of each bin.
+    def _binValues(self, p):
+        binStart = np.array(self.binStart[p], dtype=float)
+        b = np.arange(self.binsNumber[p])
+        return (binStart[b]-binStart[b-1])/2
 
     ## Create bins discretizing the time series.
     # @param data Data with the time series.
@@ -131,39 +132,60 @@ class Bins:
     ## Create the bins using the starting value of each bin.
     # Assumes that labels and binStart are assigned.
     # @param data Data.
-    def _createBinsFromStartValues(self, data):
+    # @param values List with, for each label, a tuple (values, dayIndexes) as returned by Data.labelValues. None to
+    #               obtain them from the data.
+    def _createBinsFromStartValues(self, data, values=None):
         self.labels = data.labels # By security
+        self.days = {d: day for d, day in enumerate(data.days())}
+        self.dayIndex = {day: d for d, day in self.days.items()}
+        D = len(self.days)
 
-        # Init
+        # Fill with the data in a single pass per label
         self.binSize = [] # Size of the bin for a given time series binSize[p,b].
         self.A = [] # Number of element for a given time series and bin of a day A[p,b,d].
         for p in self.labelRanges():
-            self.binSize.append([])
-            self.A.append([])
-            for b in range(len(self.binStart[p])-1):
-                self.binSize[p].append(0)
-                self.A[p].append([0]*len(data.days()))
-
-        # Fill with the data
-        dayIndex = 0
-        self.days = {}
-        for d, dayData in data.timeSeries.items():
-            self.days[dayIndex] = d
-            for p, values in dayData.items():
-                label = data.labels[p]
-                for v in values:
-                    # Find the bin
-                    b = 1
-                    while b < len(self.binStart[p])-1:
-                        if self.binStart[p][b] > v:
-                            break
-                        b += 1
-                    b -= 1
-
-                    # Populate
-                    self.binSize[p][b] += 1
-                    self.A[p][b][dayIndex] += 1
-            dayIndex += 1
+            v, dayIndexes = values[p] if values is not None else data.labelValues(p)
+            self.A.append(self._occupancy(p, v, dayIndexes, D))
+            self.binSize.append(self.A[p].sum(axis=1).tolist())
+
+    ## Append new days of the data to the bins.
+    # The new days are binned on their own if their values are in the range of the bins, otherwise all the bins are
+    # created again from the data.
+    # @param data Data with the time series, including the new days.
+    # @param days New days of the data.
+    # @return True if the bins have been created again, False if they have only been extended.
+    def appendDays(self, data, days):
+        newData = data.subset(days)
+        values = [newData.labelValues(p) for p in newData.labelRanges()]
+        for p in self.labelRanges():
+            if len(values[p][0]) > 0 and (values[p][0].min() < self.binStart[p][0]
+                                          or values[p][0].max() > self.binStart[p][-1]):
+                with metrics.timer('bins.' + type(self).__name__):
+                    self._createBins(data, self.binsPerTimeSeries)
+                return True
+
+        with metrics.timer('bins.append'):
+            for day in newData.days():
+                self.days[len(self.dayIndex)] = day
+                self.dayIndex[day] = len(self.dayIndex)
+            for p in self.labelRanges():
+                A = self._occupancy(p, values[p][0], values[p][1], len(newData.timeSeries))
+                self.A[p] = np.concatenate((self.A[p], A), axis=1)
+                self.binSize[p] = (np.array(self.binSize[p]) + A.sum(axis=1)).tolist()
+            self._computeCumulatedBinSize()
+        return False
+
+    ## Count the values of a label in each bin of each day.
+    # @param p Label index.
+    # @param values Array with the values of the label.
+    # @param dayIndexes Array with the day index of each value.
+    # @param D Number of days.
+    # @return Array indexed by the bin and the day index.
+    def _occupancy(self, p, values, dayIndexes, D):
+        metrics.count('bins.values', len(values))
+        B = len(self.binStart[p]) - 1
+        b = np.searchsorted(self.binStart[p][1:-1], values, side='right') # Index of the last bin starting before v
+        return np.bincount(b * D + dayIndexes, minlength=B * D).reshape(B, D)
 
     ## Compute the cumulated bin sizes.
     def _computeCumulatedBinSize(self):
@@ -189,6 +211,8 @@ class Bins:
     # List with the labels of the time series.
     ## @var days
     # Dictionary taking as key the day index and as value the day itself.
+    ## @var dayIndex
+    # Dictionary taking as key the day and as value its index.
     ## @var binsNumber
     # Number of bins for each label.
     ## @var binStart
@@ -197,5 +221,7 @@ class Bins:
     # For each parameter, size of each bin.
     ## @var cumulatedBinSize
     # Cumulated sum over the bin sizes for each parameter and each bin.
+    ## @var binsPerTimeSeries
+    # Default number of bins per time series.
     ## @var A
-    # Number of periods in each bin of a given day.
+    # Number of periods in each bin of a given day. For each label, an array indexed by the bin and the day index.
@@ -0,0 +1,137 @@
+##@package binscache
+# @author Sebastien MATHIEU
+
+import os, pickle, hashlib
+from collections import OrderedDict
+
+from .minpopbins import MinPopBins
+from .periods import PeriodData, PeriodBins
+
+
+## Version of the format of the files of bins.
+FORMAT_VERSION = 1
+
+
+## Bounded cache of bins keyed by the data and the binning parameters.
+# The least recently used bins are evicted from memory. An optional folder keeps the bins between runs.
+class BinsCache:
+    ## Constructor.
+    # @param maxSize Maximum number of bins kept in memory.
+    # @param folder Folder where the bins are stored between runs, None to keep them only in memory.
+    def __init__(self, maxSize=8, folder=None):
+        self.maxSize = maxSize
+        self.folder = folder
+        self._bins = OrderedDict()
+
+    ## Get the bins of data, creating them if they are not cached.
+    # The bins of periods are derived from the bins of their days, which are cached as well, and are only kept in
+    # memory.
+    # @param data Data with the time series.
+    # @param binsPerTimeSeries Default number of bins per time series.
+    # @param binsClass Class of the bins.
+    # @param parameters Additional parameters of the bins class (e.g. minPop).
+    # @return Bins of the data.
+    def get(self, data, binsPerTimeSeries=10, binsClass=MinPopBins, **parameters):
+        bins = self.lookup(data, binsPerTimeSeries, binsClass, **parameters)
+        if bins is None and isinstance(data, PeriodData):
+            bins = PeriodBins(self.get(data.data, binsPerTimeSeries, binsClass, **parameters), data.length,
+                              data.stride)
+            self._store(self.key(data, binsPerTimeSeries, binsClass, **parameters), bins)
+        elif bins is None:
+            bins = binsClass(data, binsPerTimeSeries, **parameters)
+            self.put(data, bins, **parameters)
+        return bins
+
+    ## Get the bins of data if they are cached.
+    # @param data Data with the time series.
+    # @param binsPerTimeSeries Default number of bins per time series.
+    # @param binsClass Class of the bins.
+    # @param parameters Additional parameters of the bins class (e.g. minPop).
+    # @return Bins of the data or None if they are neither in memory nor in the folder.
+    def lookup(self, data, binsPerTimeSeries=10, binsClass=MinPopBins, **parameters):
+        key = self.key(data, binsPerTimeSeries, binsClass, **parameters)
+
+        # Memory
+        bins = self._bins.get(key)
+        if bins is not None:
+            self._bins.move_to_end(key)
+            return bins
+
+        # Disk, the files of other versions or keys being ignored and later overwritten
+        path = self._path(key)
+        if path is not None and os.path.isfile(path):
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+            if isinstance(entry, dict) and entry.get('version') == FORMAT_VERSION and entry.get('key') == key:
+                bins = entry['bins']
+                self._store(key, bins)
+        return bins
+
+    ## Put bins in the cache, e.g. bins extended with new days of the data.
+    # @param data Data with the time series.
+    # @param bins Bins of the data.
+    # @param persist False to keep the bins only in memory, e.g. bins extended with new days which differ from the
+    #                bins a later run would create from the data.
+    # @param parameters Additional parameters of the bins class.
+    def put(self, data, bins, persist=True, **parameters):
+        key = self.key(data, bins.binsPerTimeSeries, type(bins), **parameters)
+        self._store(key, bins, self._path(key) if persist else None)
+
+    ## Path of the file of bins.
+    # @param key Key of the bins.
+    # @return Path or None if the bins are only kept in memory.
+    def _path(self, key):
+        return os.path.join(self.folder, key + '.pickle') if self.folder is not None else None
+
+    ## Keep bins in memory and optionally write them in a file.
+    # @param key Key of the bins.
+    # @param bins Bins.
+    # @param path Path of the file, None to keep them only in memory.
+    def _store(self, key, bins, path=None):
+        if path is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            temporaryPath = '%s.%s.tmp' % (path, os.getpid())  # Folders shared by the processes of a batch
+            with open(temporaryPath, 'wb') as file:
+                pickle.dump({'version': FORMAT_VERSION, 'key': key, 'bins': bins}, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporaryPath, path)
+
+        self._bins[key] = bins
+        self._bins.move_to_end(key)
+        while len(self._bins) > self.maxSize:
+            self._bins.popitem(last=False)
+
+    ## Key of bins in the cache.
+    # @param data Data with the time series.
+    # @param binsPerTimeSeries Default number of bins per time series.
+    # @param binsClass Class of the bins.
+    # @param parameters Additional parameters of the bins class.
+    # @return Key as an hexadecimal string.
+    def key(self, data, binsPerTimeSeries=10, binsClass=MinPopBins, **parameters):
+        description = repr((data.fingerprint(), binsClass.__module__, binsClass.__name__, binsPerTimeSeries,
+                            sorted(parameters.items())))
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    ## Remove all the bins from memory.
+    def clear(self):
+        self._bins.clear()
+
+    ## @var maxSize
+    # Maximum number of bins kept in memory.
+    ## @var folder
+    # Folder where the bins are stored between runs, None to keep them only in memory.
+    ## @var _bins
+    # Ordered dictionary with the keys as keys and the bins as values, from the least to the most recently used.
+
+
+## Cache used by the days selectors and the command line interface.
+defaultCache = BinsCache()
+
+
+## Get the bins of data from the default cache.
+# @param data Data with the time series.
+# @param binsPerTimeSeries Default number of bins per time series.
+# @param binsClass Class of the bins.
+# @param parameters Additional parameters of the bins class (e.g. minPop).
+# @return Bins of the data.
+def createBins(data, binsPerTimeSeries=10, binsClass=MinPopBins, **parameters):
+    return defaultCache.get(data, binsPerTimeSeries, binsClass, **parameters)
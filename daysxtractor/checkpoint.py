@@ -0,0 +1,69 @@
+##@package checkpoint
+# @author Sebastien MATHIEU
+
+import os, time, pickle
+
+from .resultcache import selectionKey
+
+
+## Checkpoint of a long selection, periodically written so that an interrupted selection can be resumed.
+# The checkpoint is keyed by the data and the configuration of the selector, so that it is never applied to other
+# inputs. The state written is specific to each selector.
+class Checkpoint:
+    ## Constructor.
+    # @param path Path of the checkpoint file.
+    # @param interval Minimum time in seconds between two writes.
+    # @param resume True to resume from the checkpoint file if it exists, False to start over and overwrite it.
+    def __init__(self, path, interval=60, resume=False):
+        self.path = path
+        self.interval = interval
+        self.resume = resume
+        self._lastSave = time.time()
+
+    ## Load the state of a selection to resume.
+    # @param data Data with the time series.
+    # @param selector Days selector.
+    # @return State written by the selector, None if the selection starts over.
+    def load(self, data, selector):
+        self._lastSave = time.time()
+        if not self.resume or not os.path.isfile(self.path):
+            return None
+        with open(self.path, 'rb') as file:
+            checkpoint = pickle.load(file)
+        if checkpoint.get('version') != FORMAT_VERSION or checkpoint.get('key') != selectionKey(data, selector):
+            raise Exception('The checkpoint "%s" has been written for other data or another configuration of the '
+                            'selector.' % self.path)
+        return checkpoint['state']
+
+    ## Check if the checkpoint is due.
+    # @return True if the interval since the last write has elapsed.
+    def due(self):
+        return time.time() - self._lastSave >= self.interval
+
+    ## Write the state of a selection.
+    # @param data Data with the time series.
+    # @param selector Days selector.
+    # @param state State of the selection, picklable.
+    def save(self, data, selector, state):
+        folder = os.path.dirname(self.path)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        checkpoint = {'version': FORMAT_VERSION, 'key': selectionKey(data, selector),
+                      'configuration': selector.configuration(), 'state': state}
+        with open(self.path + '.tmp', 'wb') as file:
+            pickle.dump(checkpoint, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(self.path + '.tmp', self.path)
+        self._lastSave = time.time()
+
+    ## @var path
+    # Path of the checkpoint file.
+    ## @var interval
+    # Minimum time in seconds between two writes.
+    ## @var resume
+    # True to resume from the checkpoint file if it exists.
+    ## @var _lastSave
+    # Time of the last write or load.
+
+
+## Version of the format of the checkpoint files.
+FORMAT_VERSION = 1
@@ -0,0 +1,226 @@
+##@package columnar_interface
+# @author Sebastien MATHIEU
+#
+# Columnar binary files with time series: NumPy .npz archives and, with pyarrow, Parquet and Arrow IPC files.
+#
+# A .npz archive contains the arrays "time" (datetime64 or ISO strings), "values" (periods x labels), "labels" and
+# optionally "units". Parquet and Arrow files have the time in their first column and a column per label, the units
+# being given by the "units" metadata of the fields.
+
+import time, os
+import numpy as np
+
+from .data import Data, TimeSeriesLabel, RESAMPLE_CHUNK_DAYS, appendResampled
+from . import metrics
+
+## Extensions of the NumPy archives.
+NUMPY_EXTENSIONS = ('.npz',)
+## Extensions of the Parquet files.
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+## Extensions of the Arrow IPC files.
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+## Name of the column with the weights of the representative series, marked by the "role" metadata.
+WEIGHT_COLUMN = 'Weight'
+
+
+## Check if a file has a columnar format.
+# @param filePath Path of the file.
+# @return True if the extension of the file is a columnar format.
+def isColumnar(filePath):
+    return os.path.splitext(filePath)[1].lower() in NUMPY_EXTENSIONS + PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+
+## Parse a columnar file with time series.
+# @param filePath Path to the file.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
+# @return Data with the time series.
+def parseFile(filePath, period=None, aggregation='mean'):
+    tic = time.perf_counter()
+
+    extension = os.path.splitext(filePath)[1].lower()
+    with metrics.timer('parse.columnar'):
+        if extension in NUMPY_EXTENSIONS:
+            data = _parseNumpy(filePath, period, aggregation)
+        elif extension in PARQUET_EXTENSIONS + ARROW_EXTENSIONS:
+            data = _parseArrow(filePath, extension in PARQUET_EXTENSIONS, period, aggregation)
+        else:
+            raise Exception('Unknown columnar format "%s" of file "%s".' % (extension, filePath))
+    metrics.count('parse.values', sum(l.datapoints for l in data.labels))
+
+    # Print what has been read
+    toc = time.perf_counter()
+    print("Data for %s days read in %.2f seconds.\nLabels:" % (len(data.days()), toc-tic))
+    for l in data.labels:
+        print("\t%s: min=%.2f, average=%.2f, max=%.2f" % (l.name, l.min, l.average, l.max))
+    print("")
+
+    return data
+
+
+## Write time series into a columnar file readable by parseFile.
+# The days are evenly divided in periods.
+# @param data Data with the time series.
+# @param path Output file path, its extension giving the format.
+def writeData(data, path):
+    columns = [data.labelValues(p)[0] for p in data.labelRanges()]
+    _writeColumns(path, 'DateTime', data.periodTimes(), data.labels, columns)
+
+
+## Write the time series of representative days and their weights into a columnar file.
+# Each period of the representative days is a row with its values and the weight of its day. The file is readable by
+# parseFile, which ignores the weights.
+# @param data Data with the time series.
+# @param representativeDays Dictionary with the representative days as keys and their weights as values.
+# @param path Output file path, its extension giving the format.
+def writeRepresentativeSeries(data, representativeDays, path):
+    times, columns, weights = data.representativeSeries(representativeDays)
+    _writeColumns(path, 'DateTime', times, data.labels, columns, weights)
+
+
+## Parse a NumPy archive.
+# @param filePath Path to the file.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
+# @return Data with the time series.
+def _parseNumpy(filePath, period=None, aggregation='mean'):
+    with np.load(filePath, allow_pickle=False) as archive:
+        for name in ('time', 'values', 'labels'):
+            if name not in archive.files:
+                raise Exception('The array "%s" is missing from "%s".' % (name, filePath))
+        values = archive['values']
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+        names = [str(n) for n in archive['labels']]
+        units = [str(u) for u in archive['units']] if 'units' in archive.files else [''] * len(names)
+        # Weights of the representative series are ignored
+        return _createData(archive['time'], [values[:, p] for p in range(values.shape[1])], names, units, period,
+                           aggregation)
+
+
+## Parse a Parquet or an Arrow IPC file.
+# @param filePath Path to the file.
+# @param parquet True for a Parquet file, False for an Arrow IPC file.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
+# @return Data with the time series.
+def _parseArrow(filePath, parquet, period=None, aggregation='mean'):
+    pa = _pyarrow()
+    if parquet:
+        import pyarrow.parquet as pq
+        table = pq.read_table(filePath)
+    else:
+        try:
+            table = pa.ipc.open_file(filePath).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_stream(filePath).read_all()
+
+    if table.num_columns < 2:
+        raise Exception('The file "%s" needs a time column and at least one label column.' % filePath)
+    # Label columns, without the weights of the representative series
+    fields = table.schema
+    labelColumns = [j for j in range(1, table.num_columns)
+                    if (fields.field(j).metadata or {}).get(b'role') != b'weight']
+    names = [fields.field(j).name for j in labelColumns]
+    units = [(fields.field(j).metadata or {}).get(b'units', b'').decode('utf-8') for j in labelColumns]
+    columns = [table.column(j).to_numpy() for j in labelColumns]
+    return _createData(table.column(0).to_numpy(), columns, names, units, period, aggregation)
+
+
+## Create data from columns.
+# The periods are grouped in days following their order, as in the CSV files. Missing values are rejected as by the
+# CSV and XLS parsers. The values of each day are a slice of the array of its column. With a period, the days are
+# aggregated by chunks of RESAMPLE_CHUNK_DAYS days.
+# @param times Array with the time of each period.
+# @param columns List with the array of values of each label.
+# @param names Names of the labels.
+# @param units Units of the labels.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the columns.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
+# @return Data with the time series.
+def _createData(times, columns, names, units, period=None, aggregation='mean'):
+    if not np.issubdtype(times.dtype, np.datetime64):
+        times = np.array(times, dtype='datetime64[s]')
+    days = times.astype('datetime64[D]')
+    starts = np.concatenate(([0], np.flatnonzero(days[1:] != days[:-1]) + 1, [len(days)]))
+
+    data = Data()
+    for name, unit in zip(names, units):
+        label = TimeSeriesLabel(name)
+        label.units = unit
+        data.labels.append(label)
+
+    columns = [np.asarray(values, dtype=float) for values in columns]
+    for name, values in zip(names, columns):
+        missing = np.flatnonzero(np.isnan(values))
+        if len(missing) > 0:
+            raise Exception('Missing value of label "%s" at %s.' % (name, times[missing[0]]))
+    dayList = days[starts[:-1]].astype(object)
+    dayValues = [np.split(values, starts[1:-1]) for values in columns]
+    if period is not None:
+        chunk = data.subset([])
+        for i, day in enumerate(dayList):
+            if len(chunk.timeSeries) >= RESAMPLE_CHUNK_DAYS:
+                appendResampled(data, chunk, period, aggregation)
+            chunk.timeSeries[day] = {p: dayValues[p][i] for p in data.labelRanges()}
+        appendResampled(data, chunk, period, aggregation)
+        return data
+
+    for p in data.labelRanges():
+        label = data.labels[p]
+        label.datapoints = len(columns[p])
+        if label.datapoints > 0:
+            label.min, label.max = float(columns[p].min()), float(columns[p].max())
+            label.average = float(columns[p].mean())
+    for i, day in enumerate(dayList):
+        data.timeSeries[day] = {p: dayValues[p][i] for p in data.labelRanges()}
+    return data
+
+
+## Write columns in a columnar file.
+# @param path Output file path, its extension giving the format.
+# @param timeName Name of the time column.
+# @param times Array with the time of each row.
+# @param labels Labels of the columns.
+# @param columns List with the array of values of each label.
+# @param weights Array with the weight of each row, None to write only the time series.
+def _writeColumns(path, timeName, times, labels, columns, weights=None):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in NUMPY_EXTENSIONS:
+        arrays = {'time': times, 'labels': np.array([l.name for l in labels], dtype=str),
+                  'values': np.column_stack(columns) if len(columns) > 0 else np.empty((len(times), 0)),
+                  'units': np.array([l.units or '' for l in labels], dtype=str)}
+        if weights is not None:
+            arrays['weights'] = weights
+        np.savez(path, **arrays)
+        return
+    if extension not in PARQUET_EXTENSIONS + ARROW_EXTENSIONS:
+        raise Exception('Unknown columnar format "%s" of file "%s".' % (extension, path))
+
+    pa = _pyarrow()
+    fields = [pa.field(timeName, pa.timestamp('s'))]
+    arrays = [pa.array(times)]
+    for label, values in zip(labels, columns):
+        fields.append(pa.field(label.name, pa.float64(), metadata={'units': label.units or ''}))
+        arrays.append(pa.array(values))
+    if weights is not None:
+        fields.append(pa.field(WEIGHT_COLUMN, pa.float64(), metadata={'role': 'weight'}))
+        arrays.append(pa.array(weights))
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+    if extension in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, 'wb') as file, pa.ipc.new_file(file, table.schema) as writer:
+            writer.write_table(table)
+
+
+## Import pyarrow, which is only required by the Parquet and Arrow files.
+# @return The pyarrow module.
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise Exception('The Parquet and Arrow formats require pyarrow (pip install pyarrow).')
+    return pyarrow
@@ -5,6 +5,8 @@ import time, datetime
 from .data import *
 import csv
 import dateutil
+import numpy as np
+from . import metrics
 
 
 ## Parse a CSV file with time series.
@@ -13,16 +15,19 @@ import dateutil
 # The first two lines compose the header with the title of each column on the first and the units in the second.
 # @param filePath Path to the excel file.
 # @param with_units Boolean, true if the second row contains the units.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
 # @return Data with the time series.
-def parseFile(filePath, with_units=False):
+def parseFile(filePath, with_units=False, period=None, aggregation='mean'):
     # Open excel
-    tic = time.clock()
+    tic = time.perf_counter()
 
-    with open(filePath, newline='') as file:
-        data = parseData(file, with_units)
+    with open(filePath, newline='') as file, metrics.timer('parse.csv'):
+        data = parseData(file, with_units, period, aggregation)
+    metrics.count('parse.values', sum(l.datapoints for l in data.labels))
 
     # Print what has been read
-    toc = time.clock()
+    toc = time.perf_counter()
     print("Data for %s days read in %.2f seconds.\nLabels:" % (len(data.days()), toc-tic))
     for l in data.labels:
         print("\t%s: min=%.2f, average=%.2f, max=%.2f" % (l.name, l.min, l.average, l.max))
@@ -35,10 +40,13 @@ def parseFile(filePath, with_units=False):
 # The first column of the file is the date, the second corresponds to the quarter (which may be empty).
 # Following columns are the different parameters characterizing the parameters.
 # The first two lines compose the header with the title of each column on the first and the units in the second.
+# With a period, the days are aggregated while they are parsed, by chunks of RESAMPLE_CHUNK_DAYS days.
 # @param file File pointer
 # @param with_units Boolean, true if the second row contains the units.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
 # @return Data with the time series.
-def parseData(file, with_units=False):
+def parseData(file, with_units=False, period=None, aggregation='mean'):
     data = Data()
     reader = csv.reader(file)
 
@@ -53,6 +61,9 @@ def parseData(file, with_units=False):
             label.units = units_header[j]
         data.labels.append(label)
 
+    # Days at full resolution, aggregated by chunks when resampling
+    chunk = data if period is None else data.subset([])
+
     # Content
     day = None
     dayTimeSeries = {}
@@ -63,12 +74,14 @@ def parseData(file, with_units=False):
 
         if d != day:
             day = d
+            if chunk is not data and len(chunk.timeSeries) >= RESAMPLE_CHUNK_DAYS:
+                appendResampled(data, chunk, period, aggregation)
 
             # Initialize the time series
             dayTimeSeries = {}
             for p in range(len(data.labels)):
                 dayTimeSeries[p] = []
-            data.timeSeries[day] = dayTimeSeries
+            chunk.timeSeries[day] = dayTimeSeries
 
         # Add the data
         for p in data.labelRanges():
@@ -76,15 +89,21 @@ def parseData(file, with_units=False):
             dayTimeSeries[p].append(v)
 
             # Update min-max
-            data.labels[p].min = min(data.labels[p].min, v) if data.labels[p].min is not None else v
-            data.labels[p].max = max(data.labels[p].max, v) if data.labels[p].max is not None else v
-            if data.labels[p].average is None:
-                data.labels[p].average = v
-            else:
-                data.labels[p].average += v
+            if chunk is data:
+                data.labels[p].min = min(data.labels[p].min, v) if data.labels[p].min is not None else v
+                data.labels[p].max = max(data.labels[p].max, v) if data.labels[p].max is not None else v
+                if data.labels[p].average is None:
+                    data.labels[p].average = v
+                else:
+                    data.labels[p].average += v
 
         rows += 1
 
+    if chunk is not data:
+        # The statistics come from the aggregated values
+        appendResampled(data, chunk, period, aggregation)
+        return data
+
     # Finish the average computation
     for p in data.labelRanges():
         data.labels[p].datapoints = rows
@@ -127,3 +146,41 @@ def writeDays(days, path):
         writer.writerow(["Day", "Weight"])
         for d in sorted(days.keys()):
             writer.writerow([d, days[d]])
+
+
+## Write the time series of representative days and their weights into a CSV file.
+# Each period of the representative days is a row with its time, its values and the weight of its day.
+# @param data Data with the time series.
+# @param representativeDays Dictionary with the representative days as keys and their weights as values.
+# @param path Output file path.
+# @param with_units Boolean, true to write the units in the second row.
+def writeRepresentativeSeries(data, representativeDays, path, with_units=False):
+    times, columns, weights = data.representativeSeries(representativeDays)
+
+    with open(path, "w", newline='') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["DateTime"] + [l.name for l in data.labels] + ["Weight"])
+        if with_units:
+            writer.writerow([""] + [l.units for l in data.labels] + [""])
+        writer.writerows(zip(np.datetime_as_string(times).tolist(), *[c.tolist() for c in columns], weights.tolist()))
+
+
+## Write time series into a CSV file readable by parseFile.
+# The first column is the time of each period, the days being evenly divided in periods.
+# @param data Data with the time series.
+# @param path Output file path.
+# @param with_units Boolean, true to write the units in the second row.
+def writeData(data, path, with_units=False):
+    with open(path, "w", newline='') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["DateTime"] + [l.name for l in data.labels])
+        if with_units:
+            writer.writerow([""] + [l.units for l in data.labels])
+        for day, dayData in data.timeSeries.items():
+            periods = len(dayData[0]) if len(data.labels) > 0 else 0
+            start = datetime.datetime(day.year, day.month, day.day)
+            for t in range(periods):
+                writer.writerow([(start + datetime.timedelta(days=t / periods)).isoformat()]
+                                + [dayData[p][t] for p in data.labelRanges()])
@@ -1,10 +1,11 @@
 ##@package data
 #@author Sebastien MATHIEU
 
-import math
-import matplotlib as mpl
-mpl.use('Agg')
-import matplotlib.pyplot as pyplot
+import math, itertools, hashlib, re, datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from . import metrics
 
 
 ## Class containing the time series data.
@@ -12,6 +13,7 @@ class Data:
     def __init__(self):
         self.labels=[]
         self.timeSeries={}
+        self._fingerprint = None
 
     ## Get the list of days.
     # @return List of days.
@@ -23,138 +25,350 @@ class Data:
     def labelRanges(self):
         return range(len(self.labels))
 
-    ## Plot a timeseries.
-    # @param label Label of the timeseries.
-    # @param resolution of the chart in ]0,1[, the smaller the better.
-    # @param pathPrefix Prefix of the output file.
-    def plotTimeseries(self, label, resolution=0.01, pathPrefix=""):
-        labelIndex = self.labels.index(label)
+    ## Fingerprint of the data hashing its days and all the values of its labels.
+    # The fingerprint is computed once and kept until the days are appended or the statistics of the labels are
+    # computed again, which is expected after modifying the time series in place. Copies compute it again.
+    # @return Fingerprint as an hexadecimal string.
+    def fingerprint(self):
+        if getattr(self, '_fingerprint', None) is None:
+            sha = hashlib.sha1(repr(list(self.timeSeries.keys())).encode('utf-8'))
+            for p in self.labelRanges():
+                values, dayIndexes = self.labelValues(p)
+                sha.update(repr((self.labels[p].name, self.labels[p].units)).encode('utf-8'))
+                sha.update(np.bincount(dayIndexes, minlength=len(self.timeSeries)).tobytes())
+                sha.update(values.tobytes())
+            self._fingerprint = sha.hexdigest()
+        return self._fingerprint
 
-        # Define the bins
-        if resolution <= 0 or resolution >= 1:
-            raise Exception("Invalid resolution %s which is outside of the range ]0,1[." % resolution)
-        ticks = []
-        v = 0
-        while v < 1.0:
-            ticks.append(v)
-            v += resolution
-        ticks.append(1.0)
-        B = len(ticks)
-
-        # Compute the bin sizes
-        binSize = [0]*B
-        observations = 0
-        for dayData in self.timeSeries.values():
-            dayTimeseries = dayData[labelIndex]
-            observations += len(dayTimeseries)
-            for v in dayTimeseries:
-                bucket = B-1-math.floor((v-label.min)/(label.max-label.min)*B)
-                binSize[bucket] += 1
+    ## Pickle and copy the data without their fingerprint, which is computed again for modified copies.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_fingerprint'] = None
+        return state
 
-        # Compute cumulated sums
-        cumulated = [0]*B
-        binSize[0] /= observations
-        cumulated[0] = binSize[0]
-        for b in range(1, B):
-            binSize[b] /= observations
-            cumulated[b] = cumulated[b-1]+binSize[b]
-
-        # Plot
-        x = [v*100 if v < 100 else 100.0 for v in cumulated]
-        y = [label.max-v*(label.max-label.min) for v in ticks]
-
-        pyplot.plot(x, y, 'k')
-        pyplot.xticks(range(0, 101, 10))
-        pyplot.axis([0, 100.0, label.min, label.max])
-
-        pyplot.xlabel('Duration [%]')
-        pyplot.ylabel('Duration curve values')
-        if label.units is not None and label.units != "":
-            pyplot.title('%s [%s]' % (label.name, label.units))
+    ## Get the values of a label as flat arrays ordered by day.
+    # @param p Label index.
+    # @return Tuple (values, dayIndexes) with the values and the index of their day.
+    def labelValues(self, p):
+        dayValues = [dayData[p] for dayData in self.timeSeries.values()]
+        lengths = [len(values) for values in dayValues]
+        if len(dayValues) > 0 and all(isinstance(values, np.ndarray) for values in dayValues):
+            values = np.concatenate(dayValues).astype(float, copy=False) # Slices of the columns of a columnar file
         else:
-            pyplot.title('%s' % label.name)
-        pyplot.savefig(pathPrefix + label.name + ".pdf")
+            values = np.fromiter(itertools.chain.from_iterable(dayValues), dtype=float, count=sum(lengths))
+        dayIndexes = np.repeat(np.arange(len(lengths)), lengths)
+        return values, dayIndexes
+
+    ## Get the days of each element of the time series as ranges of consecutive days.
+    # @return Tuple (days, ranges) with the data of the days and an array with the index of the first day and of the day
+    #         after the last one of each element of the time series, a single day for data of days.
+    def dayRanges(self):
+        indexes = np.arange(len(self.timeSeries))
+        return self, np.column_stack((indexes, indexes + 1))
+
+    ## Get the time of each period, the days being evenly divided in periods.
+    # @return Array of datetime64 in seconds, ordered as the values of labelValues.
+    def periodTimes(self):
+        if len(self.labels) == 0:
+            return np.array([], dtype='datetime64[s]')
+        lengths = np.array([len(dayData[0]) for dayData in self.timeSeries.values()], dtype=int)
+        starts = np.array([np.datetime64(day, 'D') for day in self.days()], dtype='datetime64[D]')
+        periods = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        seconds = (periods * 86400) // np.repeat(lengths, lengths)
+        return np.repeat(starts, lengths).astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+
+    ## Get the time series of representative days and their weights as arrays.
+    # @param representativeDays Dictionary with the representative days as keys and their weights as values.
+    # @return Tuple (times, columns, weights) with the time of each period of the representative days in chronological
+    #         order, the list of the arrays of values of each label and the array with the weight of the day of each
+    #         period.
+    def representativeSeries(self, representativeDays):
+        days = sorted(representativeDays.keys())
+        for day in days:
+            if day not in self.timeSeries:
+                raise Exception('Representative day %s is not part of the time series.' % day)
+        data = self.subset(days)
+        columns = [data.labelValues(p)[0] for p in data.labelRanges()]
+        lengths = [len(data.timeSeries[day][0]) if len(self.labels) > 0 else 0 for day in days]
+        weights = np.repeat(np.array([representativeDays[day] for day in days], dtype=float), lengths)
+        return data.periodTimes(), columns, weights
 
-        pyplot.close()
+    ## Get the data restricted to some days.
+    # @param days Days to keep.
+    # @return Data with the time series of the given days and the statistics of its labels.
+    def subset(self, days):
+        data = Data()
+        for l in self.labels:
+            label = TimeSeriesLabel(l.name)
+            label.units = l.units
+            data.labels.append(label)
+        for day in days:
+            data.timeSeries[day] = self.timeSeries[day]
+        data.computeLabelStatistics()
+        return data
+
+    ## Aggregate the time series to a longer period.
+    # The period of the values is given by the most common number of values in a day. The values of a day are
+    # aggregated by consecutive groups of periods, the last group of a day being possibly shorter.
+    # @param period Period of the aggregated values as a timedelta, a multiple of the period of the values.
+    # @param aggregation Aggregation of the values of a group in AGGREGATIONS.
+    # @return Data with the aggregated time series and the statistics of its labels.
+    def resample(self, period, aggregation='mean'):
+        if aggregation not in AGGREGATIONS:
+            raise Exception('Unknown aggregation "%s", expected one of %s.' % (aggregation, ", ".join(AGGREGATIONS)))
+        data = self.subset([])
+        if len(self.timeSeries) == 0:
+            return data
+
+        with metrics.timer('resample'):
+            factor = None
+            for p in self.labelRanges():
+                values, dayIndexes = self.labelValues(p)
+                lengths = np.bincount(dayIndexes, minlength=len(self.timeSeries))
+                if factor is None:
+                    periodsPerDay = int(np.bincount(lengths).argmax())
+                    factor = period.total_seconds() * periodsPerDay / 86400.0
+                    if factor < 1 or abs(factor - round(factor)) > 1e-6:
+                        raise Exception('Cannot resample periods of %s to a period of %s.'
+                                        % (datetime.timedelta(days=1) / periodsPerDay, period))
+                    factor = int(round(factor))
+
+                # Start of each group of values
+                groups = -(-lengths // factor)
+                groupDays = np.repeat(np.arange(len(lengths)), groups)
+                groupRanks = np.arange(groups.sum()) - (np.cumsum(groups) - groups)[groupDays]
+                starts = (np.cumsum(lengths) - lengths)[groupDays] + groupRanks * factor
+
+                aggregated = AGGREGATIONS[aggregation].reduceat(values, starts) if len(values) > 0 else values
+                if aggregation == 'mean':
+                    aggregated = aggregated / np.diff(np.append(starts, len(values)))
+
+                for day, dayValues in zip(self.days(), np.split(aggregated, np.cumsum(groups)[:-1])):
+                    data.timeSeries.setdefault(day, {})[p] = dayValues.tolist()
+
+                label = data.labels[p]
+                label.datapoints = len(aggregated)
+                if label.datapoints > 0:
+                    label.min, label.max = float(aggregated.min()), float(aggregated.max())
+                    label.average = float(aggregated.mean())
+        metrics.count('resample.values', sum(l.datapoints for l in data.labels))
+        return data
+
+    ## Append the days of other data with the same labels.
+    # The statistics of the labels are updated from the new values only. The new days must follow the last day of the
+    # data in chronological order, since the fingerprint, the decomposition in blocks and the periods rely on the order
+    # of the days.
+    # @param data Data with the new days.
+    def appendDays(self, data):
+        if [l.name for l in data.labels] != [l.name for l in self.labels]:
+            raise Exception("Cannot append data with the labels %s to data with the labels %s."
+                            % ([l.name for l in data.labels], [l.name for l in self.labels]))
+        previous = next(reversed(self.timeSeries), None)
+        for day in data.days():
+            if day in self.timeSeries:
+                raise Exception("Day %s is already part of the time series." % day)
+            if previous is not None and day <= previous:
+                raise Exception("Day %s cannot be appended after day %s, the days are appended in chronological order."
+                                % (day, previous))
+            previous = day
+
+        for p in self.labelRanges():
+            label = self.labels[p]
+            newLabel = data.labels[p]
+            if newLabel.datapoints == 0:
+                continue
+            if label.datapoints == 0:
+                label.min, label.max, label.average = newLabel.min, newLabel.max, newLabel.average
+            else:
+                label.min = min(label.min, newLabel.min)
+                label.max = max(label.max, newLabel.max)
+                label.average = (label.average*label.datapoints + newLabel.average*newLabel.datapoints) \
+                                / (label.datapoints + newLabel.datapoints)
+            label.datapoints += newLabel.datapoints
+        self.timeSeries.update(data.timeSeries)
+        self._fingerprint = None
+
+    ## Compute the minimum, maximum, average and number of data points of the labels from the time series.
+    def computeLabelStatistics(self):
+        self._fingerprint = None
+        for p in self.labelRanges():
+            label = self.labels[p]
+            values = self.labelValues(p)[0]
+            label.datapoints = len(values)
+            if label.datapoints > 0:
+                label.min, label.max, label.average = float(values.min()), float(values.max()), float(values.mean())
+            else:
+                label.min, label.max, label.average = None, None, None
+
+    ## Plot a timeseries.
+    # @param label Label of the timeseries.
+    # @param resolution of the chart in ]0,1[, the smaller the better.
+    # @param pathPrefix Prefix of the output file.
+    # @param fileFormat Format of the output file (pdf, png, svg, etc.).
+    def plotTimeseries(self, label, resolution=0.01, pathPrefix="", fileFormat="pdf"):
+        ticks, cumulated = self._durationCurve(self.labels.index(label), resolution)
+        _drawDurationCurves(label, ticks, [cumulated], pathPrefix, fileFormat)
 
     ## Plot the original timeseries and the one obtained with the representative days.
     # @param label Label of the timeseries.
     # @param representativeDays List of representative days
     # @param resolution Resolution of the chart in ]0,1[, the smaller the better.
     # @param pathPrefix Prefix of the output file.
-    def plotRepresentativeTimeseries(self, label, representativeDays, resolution=0.01, pathPrefix=""):
+    # @param fileFormat Format of the output file (pdf, png, svg, etc.).
+    def plotRepresentativeTimeseries(self, label, representativeDays, resolution=0.01, pathPrefix="", fileFormat="pdf"):
         labelIndex = self.labels.index(label)
+        ticks, cumulated = self._durationCurve(labelIndex, resolution)
+        ticks, reprCumulated = self._durationCurve(labelIndex, resolution, representativeDays)
+        _drawDurationCurves(label, ticks, [cumulated, reprCumulated], pathPrefix, fileFormat)
+
+    ## Compute the duration curve of a label discretized with a given resolution.
+    # The histogram is read from uniform bins with one bin per tick. These bins are taken from the cache of bins, so
+    # that they are computed once for all the labels, the original and the representative curves and later plots.
+    # @param labelIndex Index of the label.
+    # @param resolution Resolution in ]0,1[.
+    # @param representativeDays Dictionary with the representative days and their weights, None to use all the days.
+    # @return Tuple (ticks, cumulated) of arrays with the relative values and their cumulated duration in [0,1].
+    def _durationCurve(self, labelIndex, resolution, representativeDays=None):
+        from .bins import Bins
+        from .binscache import createBins
 
         # Define the bins
         if resolution <= 0 or resolution >= 1:
             raise Exception("Invalid resolution %s which is outside of the range ]0,1[." % resolution)
-        ticks = []
-        v = 0
-        while v < 1.0:
-            ticks.append(v)
-            v += resolution
-        ticks.append(1.0)
-        B = len(ticks)
-
-        # Compute the original bin sizes
-        binSize = [0]*B
-        observations = 0
-        for dayData in self.timeSeries.values():
-            dayTimeseries = dayData[labelIndex]
-            observations += len(dayTimeseries)
-            for v in dayTimeseries:
-                bucket = B-1-math.floor((v-label.min)/(label.max-label.min)*B)
-                binSize[bucket] += 1
+        ticks = np.append(np.arange(0.0, 1.0, resolution), 1.0)
+        bins = createBins(self, len(ticks), Bins)
 
-        # Compute cumulated sums
-        cumulated = [0]*B
-        binSize[0] /= observations
-        cumulated[0] = binSize[0]
-        for b in range(1, B):
-            binSize[b] /= observations
-            cumulated[b] = cumulated[b-1]+binSize[b]
-
-        # Compute the representative bin sizes
-        reprBinSize = [0]*B
-        # Find the original indexes of each days
-        for day, w in representativeDays.items():
-            dayTimeseries = self.timeSeries[day][labelIndex]
-            for v in dayTimeseries:
-                bucket = B-1-math.floor((v-label.min)/(label.max-label.min)*B)
-                reprBinSize[bucket] += w
-
-        # Compute representative cumulated sums
-        reprCumulated = [0]*B
-        reprBinSize[0] /= observations
-        reprCumulated[0] = reprBinSize[0]
-        for b in range(1, B):
-            reprBinSize[b] /= observations
-            reprCumulated[b] = reprCumulated[b-1]+reprBinSize[b]
-
-        # Plot
-        x = [v*100 if v < 100 else 100.0 for v in cumulated]
-        reprX = [v*100 if v < 100 else 100.0 for v in reprCumulated]
-        y = [label.max-v*(label.max-label.min) for v in ticks]
-
-        pyplot.plot(x, y, 'k', reprX, y, 'k--')
-        pyplot.xticks(range(0, 101, 10))
-        pyplot.axis([0, 100.0, label.min, label.max])
-
-        pyplot.xlabel('Duration [%]')
-        pyplot.ylabel('Duration curve values')
-        if label.units is not None and label.units != "":
-            pyplot.title('%s [%s]' % (label.name, label.units))
+        # Compute the bin sizes from the highest values to the lowest ones
+        A = bins.A[labelIndex]
+        observations = A.sum()
+        if representativeDays is not None:
+            dayWeights = np.zeros(A.shape[1])
+            for day, w in representativeDays.items():
+                if day not in bins.dayIndex:
+                    raise Exception('Representative day %s is not part of the time series.' % day)
+                dayWeights[bins.dayIndex[day]] = w
+            binSize = A.dot(dayWeights)
         else:
-            pyplot.title(label.name)
-        pyplot.legend(['Original', 'Representative days'])
-        pyplot.savefig(pathPrefix + label.name + ".pdf")
+            binSize = A.sum(axis=1)
 
-        pyplot.close()
+        # Compute cumulated sums
+        return ticks, np.cumsum(binSize[::-1]/observations)
 
     ## @var labels
     # List of TimeSeriesLabels.
     ## @var timeSeries
     # Dictionary with the time series taking as key the day and as value a dictionary label index/array of values.
+    ## @var _fingerprint
+    # Fingerprint of the data, None until it is computed.
+
+
+## Aggregations of Data.resample with their name as keys and the reducing function as values.
+# The mean is obtained by dividing the sum by the number of values.
+AGGREGATIONS = {'mean': np.add, 'sum': np.add, 'min': np.minimum, 'max': np.maximum}
+
+## Number of days the parsers keep at full resolution before aggregating them when they resample the time series.
+RESAMPLE_CHUNK_DAYS = 31
+
+
+## Aggregate the days parsed at full resolution and append them to the data.
+# The parsers resample the time series by chunks of RESAMPLE_CHUNK_DAYS days, so that the full resolution of the
+# whole file is never in memory.
+# @param data Data with the aggregated days.
+# @param chunk Data with the days at full resolution and the labels of data, emptied once aggregated.
+# @param period Period of the aggregated values as a timedelta.
+# @param aggregation Aggregation of the values in AGGREGATIONS.
+def appendResampled(data, chunk, period, aggregation):
+    if len(chunk.timeSeries) > 0:
+        data.appendDays(chunk.resample(period, aggregation))
+        chunk.timeSeries = {}
+
+
+## Parse a period such as 1h, 15min or 30s.
+# @param text Period with a number and a unit (s, min or h).
+# @return Period as a timedelta.
+def parsePeriod(text):
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*(s|min|m|h)\s*', text)
+    if match is None:
+        raise Exception('Invalid period "%s", expected a number and a unit (s, min or h) such as 1h.' % text)
+    value, unit = float(match.group(1)), match.group(2)
+    if unit == 's':
+        return datetime.timedelta(seconds=value)
+    elif unit == 'h':
+        return datetime.timedelta(hours=value)
+    return datetime.timedelta(minutes=value)
+
+
+## Import the plotting library on first use with the headless Agg backend.
+# @return The matplotlib.pyplot module.
+def _pyplot():
+    import matplotlib as mpl
+    mpl.use('Agg')
+    import matplotlib.pyplot as pyplot
+    return pyplot
+
+
+## Draw duration curves of a label in a file.
+# @param label Label of the timeseries.
+# @param ticks Array with the relative values of the curves.
+# @param curves List with the original cumulated duration curve and optionally the one of the representative days.
+# @param pathPrefix Prefix of the output file.
+# @param fileFormat Format of the output file (pdf, png, svg, etc.).
+def _drawDurationCurves(label, ticks, curves, pathPrefix="", fileFormat="pdf"):
+    pyplot = _pyplot()
+
+    # Plot
+    y = label.max-ticks*(label.max-label.min)
+    for cumulated, style in zip(curves, ['k', 'k--']):
+        pyplot.plot(np.minimum(cumulated*100, 100.0), y, style)
+    pyplot.xticks(range(0, 101, 10))
+    pyplot.axis([0, 100.0, label.min, label.max])
+
+    pyplot.xlabel('Duration [%]')
+    pyplot.ylabel('Duration curve values')
+    if label.units is not None and label.units != "":
+        pyplot.title('%s [%s]' % (label.name, label.units))
+    else:
+        pyplot.title(label.name)
+    if len(curves) > 1:
+        pyplot.legend(['Original', 'Representative days'])
+    pyplot.savefig(pathPrefix + label.name + "." + fileFormat)
+
+    pyplot.close()
+
+
+## Minimum number of figures rendered in a process pool when the number of processes is not given.
+PARALLEL_FIGURES = 8
+
+
+## Plot the duration curves of several labels, in parallel for many labels.
+# The curves are computed in this process from the cached bins, the processes only render the figures.
+# @param data Data with the time series.
+# @param labels Labels to plot.
+# @param representativeDays Dictionary with the representative days and their weights, None to plot only the original.
+# @param resolution Resolution of the chart in ]0,1[, the smaller the better.
+# @param pathPrefix Prefix of the output files.
+# @param fileFormat Format of the output files (pdf, png, svg, etc.).
+# @param processes Number of processes, None to use the number of processors from PARALLEL_FIGURES figures and 1 to
+#                  plot in this process.
+def plotLabels(data, labels, representativeDays=None, resolution=0.01, pathPrefix="", fileFormat="pdf", processes=None):
+    metrics.count('plot.figures', len(labels))
+    with metrics.timer('plot'):
+        tasks = []
+        for label in labels:
+            labelIndex = data.labels.index(label)
+            ticks, cumulated = data._durationCurve(labelIndex, resolution)
+            curves = [cumulated]
+            if representativeDays is not None:
+                curves.append(data._durationCurve(labelIndex, resolution, representativeDays)[1])
+            tasks.append((label, ticks, curves, pathPrefix, fileFormat))
+
+        if processes == 1 or len(tasks) <= 1 or (processes is None and len(tasks) < PARALLEL_FIGURES):
+            for task in tasks:
+                _drawDurationCurves(*task)
+            return
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(_drawDurationCurves, *zip(*tasks)))
 
 
 ## Time series labels and information.
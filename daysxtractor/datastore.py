@@ -0,0 +1,57 @@
+##@package datastore
+# @author Sebastien MATHIEU
+#
+# Store of parsed data and their bins, extended with the new days of later inputs instead of being parsed and binned
+# again.
+
+import os, pickle
+
+## Version of the format of the stores.
+FORMAT_VERSION = 1
+
+
+## Save data and their bins in a store.
+# @param path Path of the store.
+# @param data Data with the time series.
+# @param bins Bins of the data.
+def save(path, data, bins):
+    folder = os.path.dirname(path)
+    if folder != '':
+        os.makedirs(folder, exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        pickle.dump({'version': FORMAT_VERSION, 'data': data, 'bins': bins}, file, pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+
+## Load data and their bins from a store.
+# @param path Path of the store.
+# @return Tuple (data, bins).
+def load(path):
+    with open(path, 'rb') as file:
+        content = pickle.load(file)
+    if not isinstance(content, dict) or content.get('version') != FORMAT_VERSION:
+        raise Exception('Unknown format of the store "%s".' % path)
+    return content['data'], content['bins']
+
+
+## Append the new days of data to the data and the bins of a store.
+# Days already in the store are ignored. The store is created if it does not exist.
+# @param path Path of the store.
+# @param data Data with the time series, possibly with days already in the store.
+# @param createBins Function creating the bins of data if the store does not exist.
+# @return Tuple (data, bins, days, rebuilt) with the data and the bins of the store, the list of appended days and True
+#         if the bins have been created again.
+def append(path, data, createBins):
+    if not os.path.isfile(path):
+        bins = createBins(data)
+        save(path, data, bins)
+        return data, bins, list(data.days()), True
+
+    storedData, bins = load(path)
+    days = [day for day in data.days() if day not in storedData.timeSeries]
+    rebuilt = False
+    if len(days) > 0:
+        storedData.appendDays(data.subset(days))
+        rebuilt = bins.appendDays(storedData, days)
+        save(path, storedData, bins)
+    return storedData, bins, days, rebuilt
@@ -10,7 +10,16 @@ class DaysSelector:
 
     ## Select representative days from time series.
     # @param data Data with the time series.
+    # @param incumbent Dictionary with representative days and their weights from which the selection continues, None
+    #                  to start over. Selectors which cannot start from a selection ignore it.
     # @return Dictionary with the select days and their weights.
     @abstractmethod
-    def selectDays(self, data):
+    def selectDays(self, data, incumbent=None):
         return None
+
+    ## Configuration determining the selection of the selector, apart from its time limit.
+    # @return Dictionary with the name of the parameters as keys and their value as values.
+    def configuration(self):
+        return {'selector': '%s.%s' % (type(self).__module__, type(self).__name__),
+                'numberRepresentativeDays': self.numberRepresentativeDays,
+                'binsPerTimeSeries': self.binsPerTimeSeries}
@@ -0,0 +1,195 @@
+##@package decomposeddaysselector
+# @author Sebastien MATHIEU
+
+from __future__ import division
+
+import os, math, time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pyomo.environ import *
+
+from .mipdaysselector import MIPDaysSelector
+from .binscache import createBins
+
+## Share of the time limit reserved for the final fit of the weights.
+FIT_SHARE = 0.1
+## Minimum time limit in seconds of a block and of the final fit, for the solvers to find a feasible solution.
+MIN_TIME_LIMIT = 1.0
+
+
+## Selector of days decomposing the MIPDaysSelector problem in temporal blocks (seasons, months, etc.).
+# The representative days are allocated to the blocks in proportion to their share of the binned error. The block
+# sub-problems are solved in parallel and their selections are merged before fitting the weights on all the days.
+# The blocks and the fit share the time limit of the selection, a resumed selection having the remaining time. A share
+# of the time is reserved for the fit, and a block starting is given the time left to the blocks divided by the number
+# of rounds of the blocks still waiting for a process.
+class DecomposedMIPDaysSelector(MIPDaysSelector):
+    ## Constructor.
+    # @param binsPerTimeSeries Number of bins discretizing the time series.
+    # @param numberRepresentativeDays Number of representative days to select.
+    # @param timelimit Time limit of the selection in seconds, shared by the blocks and the final fit.
+    # @param solverName Name of the optimization solver to use (cplex, cbc, glpk, gurobi, etc.).
+    # @param blocks Decomposition in blocks: "season", "month" or a function taking a day and returning its block.
+    # @param processes Number of processes solving the blocks, None to use the number of processors.
+    # @param verbose Verbose boolean.
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40, solverName='cplex',
+                 blocks='season', processes=None, verbose=False):
+        if not callable(blocks) and blocks not in ('season', 'month'):
+            raise Exception('Unknown decomposition "%s", expected "season", "month" or a function.' % blocks)
+
+        MIPDaysSelector.__init__(self, numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                 binsPerTimeSeries=binsPerTimeSeries, solverName=solverName, verbose=verbose)
+        self.blocks = blocks
+        self.processes = processes
+        self.checkpoint = None
+
+    def configuration(self):
+        configuration = MIPDaysSelector.configuration(self)
+        configuration['blocks'] = self.blocks if not callable(self.blocks) \
+            else '%s.%s' % (self.blocks.__module__, self.blocks.__qualname__)
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
+        bins = createBins(data, self.binsPerTimeSeries)
+
+        # Decompose and allocate the representative days
+        blocks = self._decompose(bins)
+        allocation = self._allocate(blocks, bins)
+        if self.verbose:
+            print("Decomposition in %s blocks:" % len(blocks))
+            for k in blocks.keys():
+                print("\t%s: %s days, %s representative days" % (k, len(blocks[k]), allocation[k]))
+
+        # Resume the blocks solved before the checkpoint
+        tic = time.time()
+        solved = {}
+        state = self.checkpoint.load(data, self) if self.checkpoint is not None else None
+        if state is not None:
+            solved = state['blocks']
+            tic -= state['elapsed']
+            if self.verbose:
+                print("Resuming with %s blocks solved." % len(solved))
+
+        # Solve the sub-problems, writing the checkpoint after each block
+        deadline = tic + self.timeLimit
+        blocksDeadline = deadline - max(MIN_TIME_LIMIT, FIT_SHARE * self.timeLimit)
+        processes = 1 if self.processes == 1 else self.processes or os.cpu_count() or 1
+        waiting = [k for k in blocks.keys() if allocation[k] > 0 and k not in solved]
+
+        # Task of the next waiting block, started at once
+        def nextTask():
+            k = waiting.pop(0)
+            rounds = math.ceil((len(waiting) + 1) / processes)
+            timelimit = max(MIN_TIME_LIMIT, (blocksDeadline - time.time()) / rounds)
+            blockData = data.subset([bins.days[d] for d in blocks[k]])
+            return k, (allocation[k], timelimit, self.binsPerTimeSeries, self.solverName, blockData)
+
+        if processes == 1:
+            while len(waiting) > 0:
+                k, task = nextTask()
+                solved[k] = _selectBlockDays(task)
+                self._saveCheckpoint(data, solved, time.time() - tic)
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = {}
+                while len(waiting) > 0 or len(futures) > 0:
+                    while len(waiting) > 0 and len(futures) < processes:
+                        k, task = nextTask()
+                        futures[executor.submit(_selectBlockDays, task)] = k
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        solved[futures.pop(future)] = future.result()
+                        self._saveCheckpoint(data, solved, time.time() - tic)
+        selections = [solved[k] for k in blocks.keys() if allocation[k] > 0]
+
+        # Merge the selections and fit the weights on all the days
+        dayIndexes = {day: d for d, day in bins.days.items()}
+        selectedDays = [dayIndexes[day] for selection in selections for day in selection.keys()]
+        if self.verbose:
+            print('Fitting the weights of the merged selection using "%s"...' % self.solverName)
+        model = self._buildModel(bins)
+        self._fitWeights(model, selectedDays, max(MIN_TIME_LIMIT, deadline - time.time()))
+
+        self.objective = value(model.obj)
+        if self.verbose:
+            print("Merged solution has an objective value of %.2f." % self.objective)
+        return self._selection(model, bins)
+
+    ## Write the selections of the solved blocks in the checkpoint, if any.
+    # @param data Data with the time series.
+    # @param solved Dictionary with the solved blocks as keys and their selection as values.
+    # @param elapsed Time elapsed in seconds.
+    def _saveCheckpoint(self, data, solved, elapsed):
+        if self.checkpoint is not None:
+            self.checkpoint.save(data, self, {'blocks': solved, 'elapsed': elapsed})
+
+    ## Decompose the days in blocks.
+    # Days which are not dates are split in four consecutive blocks.
+    # @param bins Bins of the time series.
+    # @return Dictionary with the blocks as keys and the list of their days index as values.
+    def _decompose(self, bins):
+        if callable(self.blocks):
+            blockOf = self.blocks
+        elif not all(hasattr(day, 'month') for day in bins.days.values()):
+            blockSize = int(math.ceil(len(bins.days) / 4))
+            dayIndexes = {day: d for d, day in bins.days.items()}
+            blockOf = lambda day: dayIndexes[day] // blockSize
+        elif self.blocks == 'month':
+            blockOf = lambda day: day.month
+        else:
+            blockOf = lambda day: ('winter', 'spring', 'summer', 'autumn')[(day.month % 12) // 3]
+
+        blocks = {}
+        for d in bins.daysRange():
+            blocks.setdefault(blockOf(bins.days[d]), []).append(d)
+        return blocks
+
+    ## Allocate the representative days to the blocks in proportion to their binned error.
+    # The binned error of a block is the error of approximating each of its days by the average day of the block.
+    # @param blocks Dictionary with the blocks as keys and the list of their days index as values.
+    # @param bins Bins of the time series.
+    # @return Dictionary with the blocks as keys and their number of representative days as values.
+    def _allocate(self, blocks, bins):
+        errors = {}
+        for k, days in blocks.items():
+            errors[k] = 0.0
+            for p in bins.labelRanges():
+                cumulated = np.cumsum(bins.A[p][:, days], axis=0)
+                errors[k] += float(np.abs(cumulated - cumulated.mean(axis=1, keepdims=True)).sum())
+
+        # At least one day per block if possible, then the largest remainders
+        n = min(self.numberRepresentativeDays, len(bins.days))
+        allocation = {k: 0 for k in blocks.keys()}
+        ranked = sorted(blocks.keys(), key=lambda k: -errors[k])
+        for k in ranked[0:n]:
+            allocation[k] = 1
+        remaining = n - sum(allocation.values())
+        totalError = sum(errors.values())
+        if remaining > 0:
+            share = {k: (errors[k] / totalError if totalError > 0 else len(blocks[k]) / len(bins.days)) * remaining
+                     for k in blocks.keys()}
+            for k in blocks.keys():
+                allocation[k] += min(int(share[k]), len(blocks[k]) - allocation[k])
+            while sum(allocation.values()) < n:
+                candidates = [k for k in ranked if allocation[k] < len(blocks[k])]
+                k = max(candidates, key=lambda k: share[k] - int(share[k]))
+                allocation[k] += 1
+                share[k] = int(share[k])
+        return allocation
+
+    ## @var blocks
+    # Decomposition in blocks: "season", "month" or a function taking a day and returning its block.
+    ## @var processes
+    # Number of processes solving the blocks, None to use the number of processors.
+    ## @var checkpoint
+    # Checkpoint of the solved blocks, None to solve without checkpoint.
+
+
+## Select the representative days of a block.
+# @param task Tuple (numberRepresentativeDays, timelimit, binsPerTimeSeries, solverName, data) of the block.
+# @return Dictionary with the select days and their weights.
+def _selectBlockDays(task):
+    numberRepresentativeDays, timelimit, binsPerTimeSeries, solverName, data = task
+    selector = MIPDaysSelector(numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                               binsPerTimeSeries=binsPerTimeSeries, solverName=solverName)
+    return selector.selectDays(data)
@@ -0,0 +1,421 @@
+##@package distributeddaysselector
+# @author Sebastien MATHIEU
+#
+# Random sampling of representative days by workers on several hosts, coordinated over TCP.
+# Usage of a worker: python -m daysxtractor.distributeddaysselector [options]
+#
+# The coordinator ships the profiles of the days once per selection and hands out tasks, each one being a number of
+# samples drawn with its own seed. The workers send back the best selection of each task. The seed of a task only
+# depends on the seed of the selector and on the index of the task, so that a selection bounded by a number of samples
+# is reproducible whatever the workers which processed the tasks.
+#
+# The tasks are pickled over TCP, so the coordinator and the workers share a secret authentication key given by the
+# DAYSXTRACTOR_AUTHKEY variable. Without it, a coordinator on a loopback address generates a random key, and one on
+# another address refuses to start.
+
+import sys, os, time, math, random, queue, uuid, getopt, ipaddress
+import multiprocessing
+from multiprocessing.managers import BaseManager, DictProxy
+
+from .samplingdaysselector import SamplingDaysSelector, RESCORED_CANDIDATES
+from .binscache import createBins
+from . import metrics
+
+## Select representative days by random sampling distributed on workers.
+# The workers are started by hand on other hosts with the address of the coordinator, or by the selector on this host.
+class DistributedSamplingDaysSelector(SamplingDaysSelector):
+    ## Constructor
+    # @param numberRepresentativeDays Number of representative days to select.
+    # @param timelimit Time limit for the process. With a number of samples, time without any new result after which the
+    #                  pending tasks are handed out again, once.
+    # @param binsPerTimeSeries Number of bins discretizing the time series.
+    # @param seed Seed of the sampling.
+    # @param embedding Embedding of the day profiles in which the sampling is performed, None to sample on the full
+    #                  profiles, "pca" for a principal component analysis or "random" for a random projection.
+    # @param dimension Dimension of the embedding.
+    # @param address Tuple (host, port) of the coordinator, the port 0 taking any free port.
+    # @param authkey Authentication key of the coordinator, None for the DAYSXTRACTOR_AUTHKEY variable or, on a loopback
+    #                address, a random key.
+    # @param localWorkers Number of workers started by the selector on this host.
+    # @param samples Number of samples of a selection, None to sample until the time limit.
+    # @param samplesPerTask Number of samples of a task.
+    # @param verbose Verbose boolean.
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40, seed=42, embedding=None,
+                 dimension=16, address=('127.0.0.1', 50000), authkey=None, localWorkers=0, samples=None,
+                 samplesPerTask=100, verbose=False):
+        SamplingDaysSelector.__init__(self, numberRepresentativeDays, timelimit, binsPerTimeSeries, seed, embedding,
+                                      dimension, verbose)
+        if samplesPerTask < 1:
+            raise Exception('A task should have at least one sample.')
+        self.address = address
+        self.authkey = authkey if authkey is not None else _authkey()
+        self._generatedKey = self.authkey is None
+        if self.authkey is None:
+            if not _isLoopback(address[0]):
+                raise Exception('The coordinator on %s:%s accepts workers of other hosts, set their shared '
+                                'authentication key in the DAYSXTRACTOR_AUTHKEY variable.' % tuple(address))
+            self.authkey = os.urandom(16).hex().encode('ascii')
+        self.localWorkers = localWorkers
+        self.samples = samples
+        self.samplesPerTask = samplesPerTask
+        self.grace = 5
+        self._manager = None
+        self._workers = []
+
+    def configuration(self):
+        configuration = SamplingDaysSelector.configuration(self)
+        configuration['samples'] = self.samples
+        configuration['samplesPerTask'] = self.samplesPerTask
+        return configuration
+
+    ## Start the coordinator and the local workers.
+    def start(self):
+        if self._manager is not None:
+            return
+        self._manager = _CoordinatorManager(address=self.address, authkey=self.authkey)
+        self._manager.start()
+        self.address = self._manager.address
+        if self.verbose:
+            print("Coordinator listening on %s:%s." % self.address)
+        if self._generatedKey and (self.verbose or self.localWorkers == 0):
+            print("Workers of this host connect with DAYSXTRACTOR_AUTHKEY=%s." % self.authkey.decode('ascii'))
+        for w in range(self.localWorkers):
+            worker = multiprocessing.Process(target=runWorker, args=(self.address, self.authkey), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    ## Stop the local workers and the coordinator, which stops the other workers.
+    def close(self):
+        for worker in self._workers:
+            worker.terminate()
+            worker.join()
+        self._workers = []
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def selectDays(self, data, incumbent=None):
+        self.start()
+
+        # Prepare parameters
+        bins = createBins(data, self.binsPerTimeSeries)
+        profiles, cumulatedBinSize = self._profiles(bins)
+        searchProfiles, searchTarget = self._searchSpace(bins, profiles, cumulatedBinSize)
+
+        # Start from the incumbent with a sampling differing from the one which found it
+        bestObj = None
+        bestSelection = None
+        seed = str(self.seed)
+        if incumbent is not None:
+            for day in incumbent.keys():
+                if day not in bins.dayIndex:
+                    raise Exception('Representative day %s is not part of the time series.' % day)
+            bestObj, bestSelection = self._evaluateDays([bins.dayIndex[day] for day in incumbent.keys()], profiles,
+                                                        cumulatedBinSize)
+            seed = '%s-%s' % (self.seed, sorted(str(day) for day in incumbent.keys()))
+
+        # Ship the profiles once
+        problemId = uuid.uuid4().hex
+        problems = self._manager.problems()
+        problems[problemId] = {'profiles': searchProfiles, 'cumulatedBinSize': searchTarget,
+                               'numberRepresentativeDays': self.numberRepresentativeDays}
+        try:
+            with metrics.timer('sampling.search'):
+                results = self._distribute(problemId, seed)
+        finally:
+            problems.pop(problemId)
+
+        # Best selection of the tasks, in the order of the tasks for equal objectives
+        results.sort(key=lambda result: (result[0], result[1]))
+        if self.embedding is None:
+            objValue, selectedDaysWeights = self._evaluateDays(results[0][2], profiles, cumulatedBinSize)
+            if bestObj is None or bestObj > objValue:
+                bestObj, bestSelection = objValue, selectedDaysWeights
+        else:
+            bestObj, bestSelection = self._rescore([selectedDays for _, _, selectedDays
+                                                    in results[:RESCORED_CANDIDATES]], profiles, cumulatedBinSize,
+                                                   bestObj, bestSelection)
+
+        samples = len(results) * self.samplesPerTask
+        if self.verbose:
+            print("Best solution found has an objective value of %.2f after %s samples." % (bestObj, samples))
+        metrics.count('sampling.samples', samples)
+        metrics.count('sampling.tasks', len(results))
+        metrics.record('sampling.objective', bestObj)
+        self.objective = bestObj
+
+        # Reformat selection
+        return {bins.days[d]: v for d, v in bestSelection.items()}
+
+    ## Hand out the tasks of a selection and collect their results.
+    # With a number of samples, all its tasks are collected. Otherwise tasks are handed out until the time limit and
+    # the tasks which have not started are then withdrawn, the running ones being awaited for a grace period.
+    # Without any new result for the time limit and the grace period, the tasks still pending are handed out again
+    # once, for a worker which died with its task, and the selection then fails. It fails at once if no worker
+    # returned any result.
+    # @param problemId Identifier of the profiles of the selection.
+    # @param seed Seed of the selection from which the seeds of the tasks are derived.
+    # @return List of tuples (objective, task index, selected days index) of the collected tasks.
+    def _distribute(self, problemId, seed):
+        tasks = self._manager.tasks()
+        resultQueue = self._manager.results()
+        taskNumber = None if self.samples is None else max(1, int(math.ceil(self.samples / self.samplesPerTask)))
+        queueSize = 2 * max(1, self.localWorkers) + 8
+
+        results = []
+        pending = set()
+        nextTask = 0
+        tic = time.time()
+        stopTime = None
+        progressTime = tic
+        requeued = False
+        if self.verbose:
+            print("Distributed random sampling of representative days...")
+        while True:
+            if taskNumber is not None:
+                stopping = nextTask >= taskNumber
+            else:
+                stopping = time.time() - tic >= self.timeLimit and len(results) > 0
+
+            # Hand out tasks
+            while not stopping and len(pending) < queueSize and (taskNumber is None or nextTask < taskNumber):
+                tasks.put((problemId, nextTask, '%s-%s' % (seed, nextTask), self.samplesPerTask))
+                pending.add(nextTask)
+                nextTask += 1
+
+            # Withdraw the tasks which have not started
+            if stopping and taskNumber is None and stopTime is None:
+                stopTime = time.time()
+                pending.difference_update(self._withdraw(tasks, problemId))
+            if len(pending) == 0 or (stopTime is not None and time.time() - stopTime > self.grace):
+                break
+
+            # Hand out the pending tasks again or fail without any result before the deadline
+            if time.time() - progressTime > self.timeLimit + self.grace:
+                if requeued or len(results) == 0:
+                    raise Exception('No worker returned a result in %.1f seconds, check that workers are connected to '
+                                    'the coordinator %s:%s.' % ((time.time() - progressTime,) + tuple(self.address)))
+                self._withdraw(tasks, problemId)
+                for task in sorted(pending):
+                    tasks.put((problemId, task, '%s-%s' % (seed, task), self.samplesPerTask))
+                progressTime = time.time()
+                requeued = True
+                if self.verbose:
+                    print('\tTasks %s handed out again.' % sorted(pending))
+
+            # Collect a result
+            try:
+                resultProblemId, task, objValue, selectedDays = resultQueue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if resultProblemId != problemId or task not in pending:
+                continue
+            pending.discard(task)
+            progressTime = time.time()
+            requeued = False
+            results.append((objValue, task, selectedDays))
+            if self.verbose and objValue == min(result[0] for result in results):
+                print('\tNew incumbent with an objective value of %.2f after %s tasks.' % (objValue, len(results)))
+        return results
+
+    ## Withdraw the tasks of a selection which have not started.
+    # @param tasks Queue of the tasks.
+    # @param problemId Identifier of the profiles of the selection.
+    # @return List of the indexes of the withdrawn tasks.
+    def _withdraw(self, tasks, problemId):
+        withdrawn = []
+        try:
+            while True:
+                task = tasks.get_nowait()
+                if task[0] == problemId:
+                    withdrawn.append(task[1])
+        except queue.Empty:
+            pass
+        return withdrawn
+
+    ## @var address
+    # Tuple (host, port) of the coordinator.
+    ## @var authkey
+    # Authentication key of the coordinator.
+    ## @var localWorkers
+    # Number of workers started by the selector on this host.
+    ## @var samples
+    # Number of samples of a selection, None to sample until the time limit.
+    ## @var samplesPerTask
+    # Number of samples of a task.
+    ## @var grace
+    # Time in seconds given to the running tasks after the time limit, and added to the time limit before handing out
+    # again the tasks pending without any result.
+    ## @var _generatedKey
+    # True if the authentication key was generated, to be given to the workers started by hand.
+    ## @var _manager
+    # Manager serving the queues of the coordinator, None if the coordinator is not started.
+    ## @var _workers
+    # Processes of the local workers.
+
+
+## Manager serving the queues of tasks and results and the profiles of the selections.
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+## Queue of the tasks in the process of the coordinator.
+_tasks = queue.Queue()
+## Queue of the results in the process of the coordinator.
+_results = queue.Queue()
+## Dictionary with the identifiers of the selections as keys and their profiles as values.
+_problems = {}
+
+
+
+## Get the queue of the tasks in the process of the coordinator.
+# @return Queue of the tasks.
+def _getTasks():
+    return _tasks
+
+
+## Get the queue of the results in the process of the coordinator.
+# @return Queue of the results.
+def _getResults():
+    return _results
+
+
+## Get the profiles of the selections in the process of the coordinator.
+# @return Dictionary of the profiles.
+def _getProblems():
+    return _problems
+
+
+_CoordinatorManager.register('tasks', callable=_getTasks)
+_CoordinatorManager.register('results', callable=_getResults)
+_CoordinatorManager.register('problems', callable=_getProblems, proxytype=DictProxy)
+
+
+## Run a worker until the coordinator stops.
+# @param address Tuple (host, port) of the coordinator.
+# @param authkey Authentication key of the coordinator, None for the DAYSXTRACTOR_AUTHKEY variable.
+# @param verbose Verbose boolean.
+def runWorker(address, authkey=None, verbose=False):
+    if authkey is None:
+        authkey = _authkey()
+        if authkey is None:
+            raise Exception('The authentication key of the coordinator is missing, set the DAYSXTRACTOR_AUTHKEY '
+                            'variable.')
+    manager = _CoordinatorManager(address=tuple(address), authkey=authkey)
+    manager.connect()
+    tasks, results, problems = manager.tasks(), manager.results(), manager.problems()
+    if verbose:
+        print("Connected to the coordinator %s:%s." % tuple(address))
+
+    problemId = None
+    problem = None
+    while True:
+        try:
+            task = tasks.get(timeout=1.0)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError):
+            break
+
+        taskProblemId, index, seed, samples = task
+        if taskProblemId != problemId:
+            problem = problems.get(taskProblemId)
+            if problem is None:
+                continue # The selection is over
+            problemId = taskProblemId
+        objValue, selectedDays = _sampleTask(problem, seed, samples)
+        try:
+            results.put((problemId, index, objValue, selectedDays))
+        except (EOFError, OSError):
+            break
+    if verbose:
+        print("Disconnected from the coordinator.")
+
+
+## Sample selections of a task.
+# @param problem Dictionary with the profiles of the selection.
+# @param seed Seed of the task.
+# @param samples Number of samples.
+# @return Tuple (objValue, selectedDays) of the best selection of the task.
+def _sampleTask(problem, seed, samples):
+    selector = SamplingDaysSelector(numberRepresentativeDays=problem['numberRepresentativeDays'])
+    profiles, cumulatedBinSize = problem['profiles'], problem['cumulatedBinSize']
+    rand = random.Random(seed)
+    bestObj, bestSelection = None, None
+    for s in range(samples):
+        selectedDays = selector._sampleDays(rand, len(profiles))
+        objValue = selector._evaluateDays(selectedDays, profiles, cumulatedBinSize)[0]
+        if bestObj is None or objValue < bestObj:
+            bestObj, bestSelection = objValue, selectedDays
+    return bestObj, bestSelection
+
+
+## Authentication key of the coordinator and the workers.
+# @return Key from the DAYSXTRACTOR_AUTHKEY variable, None if it is not set.
+def _authkey():
+    key = os.environ.get('DAYSXTRACTOR_AUTHKEY')
+    return key.encode('utf-8') if key else None
+
+
+## Check if a host is a loopback address, which only accepts workers of this host.
+# @param host Host name or IP address.
+# @return True for localhost or a loopback IP address.
+def _isLoopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+## Entry point of a worker.
+# @param argv Program parameters.
+def main(argv):
+    host = '127.0.0.1'
+    port = 50000
+    verbose = False
+    try:
+        opts, args = getopt.getopt(argv, 'H:p:v', ['host=', 'port=', 'verbose'])
+    except getopt.GetoptError as err:
+        displayHelp()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-H', '--host'):
+            host = arg
+        elif opt in ('-p', '--port'):
+            port = int(arg)
+        elif opt in ('-v', '--verbose'):
+            verbose = True
+
+    try:
+        runWorker((host, port), verbose=verbose)
+    except KeyboardInterrupt:
+        pass
+
+
+## Display help of a worker.
+def displayHelp():
+    text = ''
+    text += 'Usage :\n\tpython -m daysxtractor.distributeddaysselector [options]\n'
+    text += 'Sample representative days for a coordinator until it stops. The authentication key is given by the\n'
+    text += 'DAYSXTRACTOR_AUTHKEY variable.\n'
+
+    text += 'Options:\n'
+    text += '   -H 127.0.0.1 --host 127.0.0.1 Host of the coordinator.\n'
+    text += '   -p 50000    --port 50000      Port of the coordinator.\n'
+    text += '   -v          --verbose         Verbose mode.\n'
+
+    print(text)
+
+
+# Starting point from python #
+if __name__ == "__main__":
+    main(sys.argv[1:])
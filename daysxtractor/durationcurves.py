@@ -0,0 +1,128 @@
+##@package durationcurves
+# @author Sebastien MATHIEU
+
+import math
+import numpy as np
+
+
+## Exact duration curves of the time series, without the discretization of the bins.
+# The values of each label are sorted once and kept to evaluate many sets of representative days. The curves are built
+# from the values of the days and the days of each element of the time series, so that overlapping periods count the
+# values of a day once per period without copying them.
+class DurationCurves:
+    ## Constructor.
+    # @param data Data with the time series.
+    def __init__(self, data):
+        self.labels = data.labels
+        dayData, ranges = data.dayRanges()
+        self.days = {day: r for day, r in zip(data.days(), ranges.tolist())}
+        self._dayValues = []
+        self._sortedValues = []
+        self._sortedCounts = []
+
+        # Number of elements of the time series including each day
+        D = len(dayData.timeSeries)
+        counts = np.cumsum(np.bincount(ranges[:, 0], minlength=D + 1) - np.bincount(ranges[:, 1], minlength=D + 1))[:D]
+        for p in self.labelRanges():
+            values, dayIndexes = dayData.labelValues(p)
+            valueCounts = counts[dayIndexes]
+            kept = valueCounts > 0
+            order = np.argsort(-values[kept], kind='stable')
+            self._sortedValues.append(values[kept][order])
+            self._sortedCounts.append(valueCounts[kept][order])
+
+            # Boundaries of each day in the values
+            bounds = np.searchsorted(dayIndexes, np.arange(D + 1))
+            self._dayValues.append((values, bounds))
+
+    ## Get the range of index of the labels.
+    # @return Range of labels.
+    def labelRanges(self):
+        return range(len(self.labels))
+
+    ## Duration curve of a label.
+    # @param p Label index.
+    # @return Array with the values of the label sorted in decreasing order.
+    def curve(self, p):
+        return np.repeat(self._sortedValues[p], self._sortedCounts[p])
+
+    ## Duration curve of a label approximated by representative days.
+    # The values of the representative days are merged in decreasing order, each one lasting the weight of its day.
+    # The approximated curve is sampled at the middle of each original period and extended by its last value.
+    # @param p Label index.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    # @return Array with the approximated duration curve, with the same number of values as the original curve.
+    def representativeCurve(self, p, representativeDays):
+        values, ends = self._representativeSteps(p, representativeDays)
+        positions = np.arange(self._sortedCounts[p].sum()) + 0.5
+        return values[np.minimum(np.searchsorted(ends, positions, side='right'), len(values) - 1)]
+
+    ## Compute the normalized root-mean-square error (NRMSE) between the original and the approximated duration curve.
+    # Both curves are constant between the ends of the original values and of the representative values, so the
+    # error is summed over these steps instead of each original period.
+    # @param p Label index.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    # @return Value as a float in [0,1].
+    def nrmsError(self, p, representativeDays):
+        values, ends = self._representativeSteps(p, representativeDays)
+        curve, counts = self._sortedValues[p], self._sortedCounts[p]
+        size = counts.sum()
+
+        # First original period of each step, the approximated curve changing at the period whose middle reaches an end
+        originalEnds = np.cumsum(counts)
+        starts = np.unique(np.concatenate(([0], originalEnds[:-1], np.clip(np.ceil(ends - 0.5), 0, size))))
+        starts = starts[starts < size]
+        lengths = np.diff(np.append(starts, size))
+        original = curve[np.searchsorted(originalEnds, starts, side='right')]
+        approximated = values[np.minimum(np.searchsorted(ends, starts + 0.5, side='right'), len(values) - 1)]
+        difference = original - approximated
+        return float(math.sqrt(difference.dot(difference * lengths) / size) / (curve[0] - curve[-1]))
+
+    ## Compute the relative area error between the original and the approximated duration curve.
+    # This measure directly corresponds to the average value of the time series.
+    # @param p Label index.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    # @return Value as a float in [0,1].
+    def relativeAreaError(self, p, representativeDays):
+        values, durations = self._weightedValues(p, representativeDays)
+        total = self._sortedValues[p].dot(self._sortedCounts[p])
+        return float(abs((total - values.dot(durations)) / total))
+
+    ## Values of the representative days sorted in decreasing order and the end of their duration.
+    # @param p Label index.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    # @return Tuple (values, ends) of arrays.
+    def _representativeSteps(self, p, representativeDays):
+        values, durations = self._weightedValues(p, representativeDays)
+        order = np.argsort(-values, kind='stable')
+        return values[order], np.cumsum(durations[order])
+
+    ## Values of the representative days and their duration.
+    # @param p Label index.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    # @return Tuple (values, durations) of arrays.
+    def _weightedValues(self, p, representativeDays):
+        values, bounds = self._dayValues[p]
+        parts = []
+        durations = []
+        for day, w in representativeDays.items():
+            if day not in self.days:
+                raise Exception('Representative day %s is not part of the time series.' % day)
+            first, end = self.days[day]
+            parts.append(values[bounds[first]:bounds[end]])
+            durations.append(np.full(bounds[end] - bounds[first], float(w)))
+        if len(parts) == 0:
+            raise Exception('No representative days to evaluate.')
+        return np.concatenate(parts), np.concatenate(durations)
+
+    ## @var labels
+    # List with the labels of the time series.
+    ## @var days
+    # Dictionary taking as key the day, or the first day of a period, and as value the list with the index of its first
+    # day and of the day after its last one.
+    ## @var _sortedValues
+    # For each label, array with the values of the days sorted in decreasing order.
+    ## @var _sortedCounts
+    # For each label, array with the number of elements of the time series including the day of each sorted value.
+    ## @var _dayValues
+    # For each label, tuple (values, bounds) with the values ordered by day and the index of the first value of each day.
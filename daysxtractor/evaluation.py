@@ -0,0 +1,126 @@
+##@package evaluation
+# @author Sebastien MATHIEU
+
+import os, glob, csv
+from concurrent.futures import ProcessPoolExecutor
+
+from .bins import Bins
+from . import csv_interface, excel_interface
+
+
+## Measures of the error of representative days, in the order of the columns of the evaluation table.
+MEASURES = ['populationMin', 'populationMax', 'nrmsError', 'relativeAreaError']
+
+
+## Evaluate representative days against the bins of the time series.
+# The population of the bins is the one of the time series, so that it is the same for the command line and the
+# evaluation tables.
+# @param bins Bins of the time series.
+# @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+# @param curves Exact duration curves of the time series, None to measure the errors at the resolution of the bins.
+# @return List with, for each label, a dictionary with the measures as keys and their value in [0,1] as values.
+def evaluateDays(bins, representativeDays, curves=None):
+    representativeBins = Bins()
+    representativeBins.createFromRepresentativeDays(bins, representativeDays)
+
+    results = []
+    for p in bins.labelRanges():
+        populationMin, populationMax = bins.population(p)
+        results.append({'populationMin': populationMin, 'populationMax': populationMax})
+        if curves is None:
+            results[p]['nrmsError'] = bins.nrmsError(p, representativeBins)
+            results[p]['relativeAreaError'] = bins.relativeAreaError(p, representativeBins)
+        else:
+            results[p]['nrmsError'] = curves.nrmsError(p, representativeDays)
+            results[p]['relativeAreaError'] = curves.relativeAreaError(p, representativeDays)
+    return results
+
+
+## Evaluate files of representative days.
+# Files which cannot be evaluated are reported with their error instead of the measures.
+# @param bins Bins of the time series.
+# @param paths List of paths of the files with the representative days.
+# @param curves Exact duration curves of the time series, None to measure the errors at the resolution of the bins.
+# @param processes Number of processes, None to use the number of processors and 1 to evaluate in this process.
+# @return List of tuples (path, results, error) where results is given by evaluateDays and error is None on success.
+def evaluateFiles(bins, paths, curves=None, processes=None):
+    if processes == 1:
+        _initWorker(bins, curves)
+        return [_evaluateFile(path) for path in paths]
+
+    chunksize = max(1, len(paths) // (4 * (processes or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initWorker, initargs=(bins, curves)) as executor:
+        return list(executor.map(_evaluateFile, paths, chunksize=chunksize))
+
+
+## Check if a path to check is a batch of files of representative days.
+# Existing files are never considered as glob patterns, even if their name contains wildcard characters.
+# @param pattern Directory, glob pattern or path of a file.
+# @return True for a directory or a glob pattern.
+def isBatch(pattern):
+    if os.path.isdir(pattern):
+        return True
+    return not os.path.exists(pattern) and any(c in pattern for c in '*?[')
+
+
+## Expand a directory or a glob pattern into the paths of the files with representative days.
+# @param pattern Directory, glob pattern or path of a file.
+# @return Sorted list of paths.
+def expandPaths(pattern):
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*')
+    return sorted(path for path in glob.glob(pattern) if path[-3:].lower() in ('csv', 'xls'))
+
+
+## Parse a file with representative days according to its extension.
+# @param path Path of a CSV or XLS file.
+# @return Dictionary with the select days and their weights.
+def parseRepresentativeDays(path):
+    ext = path[-3:].lower()
+    if ext == "xls":
+        return excel_interface.parseRepresentativeDays(path)
+    elif ext == "csv":
+        return csv_interface.parseRepresentativeDays(path)
+    raise Exception('Unknown input format "%s" of file "%s".' % (ext, path))
+
+
+## Write the evaluation of files in a CSV table with one row per file and label.
+# @param bins Bins of the time series.
+# @param evaluations List of evaluations as returned by evaluateFiles.
+# @param path Output file path.
+def writeTable(bins, evaluations, path):
+    with open(path, "w", newline='') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["File", "Label"] + MEASURES + ["Error"])
+        for filePath, results, error in evaluations:
+            if error is not None:
+                writer.writerow([filePath, ""] + [""] * len(MEASURES) + [error])
+                continue
+            for p in bins.labelRanges():
+                writer.writerow([filePath, bins.labels[p].name] + [results[p][m] for m in MEASURES] + [""])
+
+
+## Bins of the time series in a worker process.
+_workerBins = None
+## Exact duration curves of the time series in a worker process.
+_workerCurves = None
+
+
+## Initialize a worker process.
+# @param bins Bins of the time series.
+# @param curves Exact duration curves of the time series or None.
+def _initWorker(bins, curves):
+    global _workerBins, _workerCurves
+    _workerBins = bins
+    _workerCurves = curves
+
+
+## Evaluate a file of representative days in a worker process.
+# @param path Path of the file.
+# @return Tuple (path, results, error).
+def _evaluateFile(path):
+    try:
+        return path, evaluateDays(_workerBins, parseRepresentativeDays(path), _workerCurves), None
+    except Exception as e:
+        return path, None, str(e)
@@ -2,9 +2,8 @@
 #@author Sebastien MATHIEU
 
 import time, datetime
-import xlrd
-import xlwt
 from .data import *
+from . import metrics
 
 
 ## Parse an excel file with time series.
@@ -12,10 +11,37 @@ from .data import *
 # Following columns are the different parameters characterizing the parameters.
 # @param filePath Path to the excel file.
 # @param with_units Boolean, true if the second row contains the units.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
 # @return Data with the time series.
-def parseFile(filePath, with_units=False):
+def parseFile(filePath, with_units=False, period=None, aggregation='mean'):
+    # Open excel
+    tic = time.perf_counter()
+    with metrics.timer('parse.xls'):
+        data = _parseWorkbook(filePath, with_units, period, aggregation)
+    metrics.count('parse.values', sum(l.datapoints for l in data.labels))
+
+    # Print what has been read
+    toc = time.perf_counter()
+    print("Data for %s days read in %.2f seconds.\nLabels:" % (len(data.days()), toc-tic))
+    for l in data.labels:
+        print("\t%s: min=%.2f, average=%.2f, max=%.2f" % (l.name, l.min, l.average, l.max))
+    print("")
+
+    return data
+
+
+## Parse the time series of an excel file.
+# With a period, the days are aggregated while they are parsed, by chunks of RESAMPLE_CHUNK_DAYS days.
+# @param filePath Path to the excel file.
+# @param with_units Boolean, true if the second row contains the units.
+# @param period Period of the aggregated time series as a timedelta, None to keep the period of the file.
+# @param aggregation Aggregation of the resampled values in AGGREGATIONS.
+# @return Data with the time series.
+def _parseWorkbook(filePath, with_units, period=None, aggregation='mean'):
+    import xlrd
+
     # Open excel
-    tic = time.clock()
     data = Data()
     workbook = xlrd.open_workbook(filePath, on_demand=True)
     sheet = workbook.sheet_by_index(0)
@@ -27,6 +53,9 @@ def parseFile(filePath, with_units=False):
             label.units = sheet.cell_value(1, c)
         data.labels.append(label)
 
+    # Days at full resolution, aggregated by chunks when resampling
+    chunk = data if period is None else data.subset([])
+
     # Parse content
     dayRaw = None
     dayTimeSeries = {}
@@ -53,10 +82,12 @@ def parseFile(filePath, with_units=False):
                 takeDayRaw = True
 
             # Initialize the time series
+            if chunk is not data and len(chunk.timeSeries) >= RESAMPLE_CHUNK_DAYS:
+                appendResampled(data, chunk, period, aggregation)
             dayTimeSeries = {}
             for p in range(len(data.labels)):
                 dayTimeSeries[p] = []
-            data.timeSeries[day] = dayTimeSeries
+            chunk.timeSeries[day] = dayTimeSeries
 
         # Add the data
         for p in data.labelRanges():
@@ -64,25 +95,24 @@ def parseFile(filePath, with_units=False):
             dayTimeSeries[p].append(v)
 
             # Update min-max
-            data.labels[p].min = min(data.labels[p].min, v) if data.labels[p].min is not None else v
-            data.labels[p].max = max(data.labels[p].max, v) if data.labels[p].max is not None else v
-            if data.labels[p].average is None:
-                data.labels[p].average = v
-            else:
-                data.labels[p].average += v
+            if chunk is data:
+                data.labels[p].min = min(data.labels[p].min, v) if data.labels[p].min is not None else v
+                data.labels[p].max = max(data.labels[p].max, v) if data.labels[p].max is not None else v
+                if data.labels[p].average is None:
+                    data.labels[p].average = v
+                else:
+                    data.labels[p].average += v
+
+    if chunk is not data:
+        # The statistics come from the aggregated values
+        appendResampled(data, chunk, period, aggregation)
+        return data
 
     # Finish the average computation
     for p in data.labelRanges():
         data.labels[p].datapoints = sheet.nrows-2
         data.labels[p].average /= sheet.nrows-2
 
-    # Print what has been read
-    toc = time.clock()
-    print("Data for %s days read in %.2f seconds.\nLabels:" % (len(data.days()), toc-tic))
-    for l in data.labels:
-        print("\t%s: min=%.2f, average=%.2f, max=%.2f" % (l.name, l.min, l.average, l.max))
-    print("")
-
     return data
 
 
@@ -92,6 +122,7 @@ def parseFile(filePath, with_units=False):
 # @param filePath Path to the excel file.
 # @return Dictionary with the select days and their weights.
 def parseRepresentativeDays(filePath):
+    import xlrd
     days = {}
 
     # Open the file
@@ -130,6 +161,7 @@ def parseRepresentativeDays(filePath):
 # @param days Dictionary with the days as keys and their weight as values.
 # @param path Output file path.
 def writeDays(days, path):
+    import xlwt
     wb = xlwt.Workbook()
     ws = wb.add_sheet('days')
     ws.write(0, 0, "Day")
@@ -142,3 +174,28 @@ def writeDays(days, path):
         ws.write(i, 1, days[d])
         i += 1
     wb.save(path)
+
+
+## Write time series into an excel file readable by parseFile.
+# The first column is the day of each period and the second row contains the units.
+# @param data Data with the time series.
+# @param path Output file path.
+def writeData(data, path):
+    import xlwt
+    wb = xlwt.Workbook()
+    ws = wb.add_sheet('data')
+    date_style = xlwt.easyxf(num_format_str="dd/mm/yyyy")
+
+    ws.write(0, 0, "Day")
+    for p in data.labelRanges():
+        ws.write(0, p + 1, data.labels[p].name)
+        ws.write(1, p + 1, data.labels[p].units)
+
+    i = 2
+    for day, dayData in data.timeSeries.items():
+        for t in range(len(dayData[0]) if len(data.labels) > 0 else 0):
+            ws.write(i, 0, day, date_style)
+            for p in data.labelRanges():
+                ws.write(i, p + 1, dayData[p][t])
+            i += 1
+    wb.save(path)
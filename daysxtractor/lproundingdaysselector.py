@@ -0,0 +1,116 @@
+##@package lproundingdaysselector
+# @author Sebastien MATHIEU
+
+from __future__ import division
+
+import random
+from pyomo.environ import *
+
+from .mipdaysselector import MIPDaysSelector
+from .binscache import createBins
+
+
+## Fast approximate selector of days rounding the linear relaxation of the MIPDaysSelector formulation.
+# The weights of the rounded selection are then fitted by solving the linear problem with the selection fixed.
+# The relaxation lets every day carry its own weight, which represents the time series exactly, so its lower bound is
+# trivial (0) and only tells whether the relaxation was solved to optimality.
+class LPRoundingDaysSelector(MIPDaysSelector):
+    ## Constructor.
+    # @param binsPerTimeSeries Number of bins discretizing the time series.
+    # @param numberRepresentativeDays Number of representative days to select.
+    # @param timelimit Time limit for each linear optimization in seconds.
+    # @param solverName Name of the optimization solver to use (cplex, cbc, glpk, gurobi, etc.).
+    # @param rounding Rounding of the relaxed selection, "top" to keep the days with the largest values or "random" to sample them.
+    # @param seed Seed of the randomized rounding.
+    # @param verbose Verbose boolean.
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40, solverName='cplex',
+                 rounding='top', seed=42, verbose=False):
+        if rounding not in ('top', 'random'):
+            raise Exception('Unknown rounding "%s", expected "top" or "random".' % rounding)
+
+        MIPDaysSelector.__init__(self, numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                 binsPerTimeSeries=binsPerTimeSeries, solverName=solverName, verbose=verbose)
+        self.rounding = rounding
+        self.seed = seed
+        self.lowerBound = None
+
+    def configuration(self):
+        configuration = MIPDaysSelector.configuration(self)
+        configuration['rounding'] = self.rounding
+        configuration['seed'] = self.seed
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
+        bins = createBins(data, self.binsPerTimeSeries)
+        model = self._buildModel(bins)
+
+        # Solve the relaxation
+        for d in model.days:
+            model.u[d].domain = UnitInterval
+        if self.verbose:
+            print('Solving the linear relaxation using "%s"...' % self.solverName)
+        results = self._solve(model)
+        optimal = results.solver.termination_condition == TerminationCondition.optimal
+        self.lowerBound = value(model.obj) if optimal else None  # A relaxation stopped early bounds nothing
+
+        # Round and fit the weights
+        selectedDays = self._round({d: model.u[d].value for d in model.days})
+        if self.verbose:
+            print('Fitting the weights of the rounded selection...')
+        self._fitWeights(model, selectedDays)
+        self.objective = value(model.obj)
+
+        if self.verbose:
+            print("Rounded solution has an objective value of %.2f%s." % (self.objective, self.boundReport()))
+        return self._selection(model, bins)
+
+    ## Relative gap between the objective of the rounded selection and the lower bound of the relaxation.
+    # @return Gap as a float, 0 if the rounded selection is optimal.
+    def gap(self):
+        if self.objective is None or self.lowerBound is None:
+            return None
+        if self.objective == 0:
+            return 0.0
+        return (self.objective - self.lowerBound) / abs(self.objective)
+
+    ## Describe the lower bound and the gap of the last selection.
+    # @return Text to append to the objective value.
+    def boundReport(self):
+        if self.lowerBound is None:
+            return " without lower bound (the relaxation was not solved to optimality)"
+        if self.lowerBound <= 1e-6:
+            return " for a trivial lower bound of 0 (the relaxation lets every day carry its own weight)"
+        return " for a lower bound of %.2f (gap of %.2f%%)" % (self.lowerBound, self.gap() * 100.0)
+
+    ## Round the relaxed selection.
+    # @param relaxedSelection Dictionary with the days index as keys and their relaxed selection in [0,1] as values.
+    # @return List with the indexes of the selected days.
+    def _round(self, relaxedSelection):
+        n = min(self.numberRepresentativeDays, len(relaxedSelection))
+        ranked = sorted(relaxedSelection.keys(), key=lambda d: (-(relaxedSelection[d] or 0.0), d))
+        if self.rounding == 'top':
+            return ranked[0:n]
+
+        # Sample without replacement with a probability proportional to the relaxed values
+        rand = random.Random(self.seed)
+        keys = {}
+        for d, u in relaxedSelection.items():
+            if u is not None and u > 1e-9:
+                keys[d] = rand.random() ** (1.0 / u)
+        selectedDays = sorted(keys.keys(), key=lambda d: -keys[d])[0:n]
+
+        # Complete with the best remaining days if not enough days have a positive value
+        for d in ranked:
+            if len(selectedDays) >= n:
+                break
+            if d not in keys:
+                selectedDays.append(d)
+        return selectedDays
+
+    ## @var rounding
+    # Rounding of the relaxed selection, "top" or "random".
+    ## @var seed
+    # Seed of the randomized rounding.
+    ## @var lowerBound
+    # Objective value of the linear relaxation of the last selection, None before any selection or if the relaxation was
+    # not solved to optimality. The bound is trivial, the relaxation representing the time series exactly.
@@ -0,0 +1,126 @@
+##@package metrics
+# @author Sebastien MATHIEU
+#
+# Registry of stage timers, counters and values of a run.
+# The registry is disabled by default, in which case timers are a shared no-op context and counters return at once.
+#
+# The memory of the stages is measured with the peak resident memory of the process, the only measure which costs
+# nothing while the stage runs. It is therefore not the memory used by the stage alone: processPeakMemory is the peak
+# of the whole process since its start, as reached at the end of the stage, and peakMemoryIncrease is how much the
+# stage raised this peak. A stage running after a larger one has no increase even if it allocates a lot of memory.
+
+import time, json, contextlib
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+## True if the metrics are recorded.
+enabled = False
+
+## Dictionary with the name of the stages as keys and dictionaries with their calls, seconds, processPeakMemory and
+# peakMemoryIncrease as values.
+_stages = {}
+## Dictionary with the name of the counters as keys and their count as values.
+_counters = {}
+## Dictionary with the name of the recorded values as keys and their value as values.
+_values = {}
+
+## Context doing nothing, returned by timer when the metrics are disabled.
+_nullTimer = contextlib.nullcontext()
+
+
+## Enable or disable the recording of the metrics.
+# @param flag True to enable the metrics.
+def enable(flag=True):
+    global enabled
+    enabled = flag
+
+
+## Remove all the recorded metrics.
+def reset():
+    _stages.clear()
+    _counters.clear()
+    _values.clear()
+
+
+## Time a stage.
+# Usage: with metrics.timer('name'): ...
+# @param name Name of the stage.
+# @return Context manager timing the stage.
+def timer(name):
+    if not enabled:
+        return _nullTimer
+    return _Timer(name)
+
+
+## Increment a counter.
+# @param name Name of the counter.
+# @param n Increment.
+def count(name, n=1):
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+## Record a value.
+# @param name Name of the value.
+# @param value Value, which must be serializable in JSON.
+def record(name, value):
+    if enabled:
+        _values[name] = value
+
+
+## Get the report of the recorded metrics.
+# @return Dictionary with the stages, the counters and the values.
+def report():
+    return {'stages': dict(_stages), 'counters': dict(_counters), 'values': dict(_values)}
+
+
+## Write the report of the recorded metrics in a JSON file.
+# @param path Output file path.
+def dump(path):
+    with open(path, 'w') as file:
+        json.dump(report(), file, indent=2, default=str)
+
+
+## Peak memory of the process in bytes, since its start.
+# @return Peak resident memory or None if it is not available.
+def peakMemory():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Kilobytes on Linux
+
+
+## Timer of a stage.
+class _Timer:
+    ## Constructor.
+    # @param name Name of the stage.
+    def __init__(self, name):
+        self.name = name
+        self.tic = None
+        self.memory = None
+
+    def __enter__(self):
+        self.memory = peakMemory()
+        self.tic = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.tic
+        memory = peakMemory()
+        stage = _stages.setdefault(self.name, {'calls': 0, 'seconds': 0.0, 'processPeakMemory': None,
+                                               'peakMemoryIncrease': None})
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        if memory is not None:
+            stage['processPeakMemory'] = memory
+            stage['peakMemoryIncrease'] = (stage['peakMemoryIncrease'] or 0) + memory - self.memory
+        return False
+
+    ## @var name
+    # Name of the stage.
+    ## @var tic
+    # Start time of the stage.
+    ## @var memory
+    # Peak memory of the process at the start of the stage.
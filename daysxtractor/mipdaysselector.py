@@ -6,9 +6,15 @@ from __future__ import division
 import math
 from pyomo.environ import *
 from pyomo.opt import SolverFactory
+from pyomo.core.expr.visitor import identify_variables
 
 from .daysselector import DaysSelector
-from .minpopbins import MinPopBins as Bins
+from .binscache import createBins
+from . import metrics
+
+
+## Name of the time limit option of the solvers which do not call it "timelimit".
+TIMELIMIT_PARAMETERS = {'cbc': 'sec', 'glpk': 'tmlim'}
 
 
 ## Selector of days based on a mixed-interger linear optimization problem.
@@ -25,22 +31,60 @@ class MIPDaysSelector(DaysSelector):
         self.binsPerTimeSeries = binsPerTimeSeries
         self.numberRepresentativeDays = numberRepresentativeDays
         self.timeLimit = timelimit
+        self.solverName = solverName
         self.verbose = verbose
+        self.objective = None
 
         # Prepare the solver
         self.solver = SolverFactory(solverName)
         if self.solver is None:
-            raise Exception('Unable to use the solver "%s".' % self.solver)
+            raise Exception('Unable to use the solver "%s".' % solverName)
+
+    def configuration(self):
+        configuration = DaysSelector.configuration(self)
+        configuration['solverName'] = self.solverName
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
+        bins = createBins(data, self.binsPerTimeSeries)
+        model = self._buildModel(bins)
 
-        # Define the time limit parameter in function of the solver
-        if solverName == 'cbc':
-            self._timelimitParameter = 'sec'
-        else:
-            self._timelimitParameter = "timelimit"
+        # Start from the incumbent
+        if incumbent is not None:
+            for d in model.days:
+                day = bins.days[d]
+                model.u[d].value = 1 if day in incumbent else 0
+                model.w[d].value = incumbent.get(day, 0)
+
+        # Solve
+        if self.verbose:
+            print('Solving the optimization problem using "%s"...' % self.solverName)
+        self._solve(model, warmstart=incumbent is not None)
 
-    def selectDays(self, data):
-        bins = Bins(data, self.binsPerTimeSeries)
-        D = len(data.days())
+        # Load results
+        self.objective = value(model.obj)
+        if self.verbose:
+            print("Best solution found has an objective value of %.2f." % self.objective)
+        return self._selection(model, bins)
+
+    ## Build the optimization model selecting the representative days.
+    # @param bins Bins of the time series.
+    # @return Pyomo concrete model.
+    def _buildModel(self, bins):
+        with metrics.timer('mip.build'):
+            model = self._buildModelComponents(bins)
+        if metrics.enabled:
+            metrics.record('mip.variables', model.nvariables())
+            metrics.record('mip.constraints', model.nconstraints())
+            metrics.record('mip.nonzeros', sum(len(list(identify_variables(c.body)))
+                                               for c in model.component_data_objects(Constraint, active=True)))
+        return model
+
+    ## Build the components of the optimization model.
+    # @param bins Bins of the time series.
+    # @return Pyomo concrete model.
+    def _buildModelComponents(self, bins):
+        D = len(bins.days)
 
         # Sets of the of the optimization model
         model = ConcreteModel()
@@ -76,12 +120,13 @@ class MIPDaysSelector(DaysSelector):
 
             cumulatedBinSize = 0
             cumulatedBinApprox = 0.0
+            A = bins.A[p].tolist()
             for b in bins.binRange(p):
                 cumulatedBinSize += bins.binSize[p][b]
 
                 binApprox = 0.0
                 for d in bins.daysRange():
-                    binApprox += model.w[d] * bins.A[p][b][d]
+                    binApprox += model.w[d] * A[b][d]
                 cumulatedBinApprox += binApprox
 
                 errorDefLbExpr[p][b] = (model.e[p, b] >= cumulatedBinSize - cumulatedBinApprox)
@@ -102,7 +147,7 @@ class MIPDaysSelector(DaysSelector):
 
         # Activate only the weights of selected days
         def weightActivation(m, d):
-            return model.w[d] <= model.u[d] * (D / 2 if self.numberRepresentativeDays > 0.02 * D else D)
+            return model.w[d] <= model.u[d] * (D / 2 if self.numberRepresentativeDays > max(1, 0.02 * D) else D)
 
         model.weightActivation = Constraint(model.days, rule=weightActivation)
 
@@ -116,17 +161,46 @@ class MIPDaysSelector(DaysSelector):
         # Sum of the weights
         model.sumWeights = Constraint(expr=summation(model.w) == D)
 
-        # Solve
-        self.solver.options[self._timelimitParameter] = self.timeLimit
-        if self.verbose:
-            print('Solving the optimization problem using "%s"...' % self.solver.name)
-        self.solver.solve(model, keepfiles=False, tee=self.verbose)  # tee=True to display the solver output
-        if len(model.solutions) == 0:
+        return model
+
+    ## Solve the optimization model within the time limit.
+    # @param model Pyomo concrete model.
+    # @param warmstart True to start from the values of the variables if the solver is able to.
+    # @param timeLimit Time limit of the solve in seconds, None for the time limit of the selector.
+    # @return Results of the solver.
+    def _solve(self, model, warmstart=False, timeLimit=None):
+        if timeLimit is None:
+            timeLimit = self.timeLimit
+        options = {'keepfiles': False, 'tee': self.verbose}  # tee=True to display the solver output
+        options.update(timeLimitArguments(self.solver, self.solverName, timeLimit))
+        if warmstart and getattr(self.solver, 'warm_start_capable', lambda: False)():
+            options['warmstart'] = True
+        metrics.count('mip.solves')
+        with metrics.timer('mip.solve'):
+            results = self.solver.solve(model, **options)
+        solverTime = getattr(getattr(results, 'solver', None), 'time', None)
+        if isinstance(solverTime, float):
+            metrics.count('mip.solverTime', solverTime)  # Summed over the solves, e.g. the two of the LP rounding
+        # The appsi interfaces load the solution in the variables without registering it in model.solutions
+        if len(model.solutions) == 0 and any(model.e[i].value is None for i in model.binSet):
             raise Exception('No solution found.')
-
-        # Load results
-        if self.verbose:
-            print("Best solution found has an objective value of %.2f." % value(model.obj))
+        return results
+
+    ## Fit the weights of a fixed set of days by solving the remaining linear problem.
+    # @param model Pyomo concrete model.
+    # @param selectedDays Indexes of the selected days.
+    # @param timeLimit Time limit of the fit in seconds, None for the time limit of the selector.
+    def _fitWeights(self, model, selectedDays, timeLimit=None):
+        selectedDays = set(selectedDays)
+        for d in model.days:
+            model.u[d].fix(1 if d in selectedDays else 0)
+        self._solve(model, timeLimit=timeLimit)
+
+    ## Get the selection of a solved model.
+    # @param model Solved pyomo concrete model.
+    # @param bins Bins of the time series.
+    # @return Dictionary with the select days and their weights.
+    def _selection(self, model, bins):
         selectedDays = {}
         for d in bins.daysRange():
             if model.u[d].value > 0.5:
@@ -136,6 +210,8 @@ class MIPDaysSelector(DaysSelector):
 
 ## @var binsPerTimeSeries
 # Number of bins discretizing the time series.
+## @var solverName
+# Name of the optimization solver.
 ## @var solver
 # Instance of the MIP solver called to solve the optimization problem
 ## @var numberRepresentativeDays
@@ -144,5 +220,30 @@ class MIPDaysSelector(DaysSelector):
 # Time limit for the optimization in seconds.
 ## @var verbose
 # Verbose (True or False).
-## @var _timelimitParameter
-# Name of the timelimit paramater for the instanciated solver.
+## @var objective
+# Objective value of the last selection, None before any selection.
+
+
+## Check if a solver is available.
+# @param solverName Name of the solver.
+# @return True if the solver can be used.
+def solverAvailable(solverName):
+    try:
+        solver = SolverFactory(solverName)
+        return solver is not None and bool(solver.available(exception_flag=False))
+    except Exception:
+        return False
+
+
+## Set the time limit of a solver.
+# The appsi interfaces take the time limit as an argument of solve, which overwrites the time limit of their
+# configuration, while the other solvers take it as an option.
+# @param solver Solver given by SolverFactory.
+# @param solverName Name of the solver.
+# @param timeLimit Time limit in seconds.
+# @return Dictionary with the arguments of solve giving the time limit.
+def timeLimitArguments(solver, solverName, timeLimit):
+    if hasattr(solver, 'config') and hasattr(solver.config, 'time_limit'):
+        return {'timelimit': timeLimit}
+    solver.options[TIMELIMIT_PARAMETERS.get(solverName, "timelimit")] = timeLimit
+    return {}
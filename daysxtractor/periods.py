@@ -0,0 +1,201 @@
+##@package periods
+# @author Sebastien MATHIEU
+#
+# Representative periods of several consecutive days, such as weeks or 48-hour windows.
+#
+# A period is a window of consecutive days of the data, identified by its first day. Windows start every stride days
+# and overlap when the stride is shorter than their length. The selectors and the error measures run unchanged on the
+# periods, the bins of the periods being derived from the bins of the days.
+#
+# The weights of representative periods count windows and sum to the number of periods. With overlapping periods, a
+# day is part of length/stride windows, so the exported time series scale the weights by stride/length to count the
+# days of the data.
+
+import collections.abc
+import numpy as np
+
+from .data import Data
+from .bins import Bins
+from . import metrics
+
+
+## Time series of periods of consecutive days.
+class PeriodData(Data):
+    ## Constructor.
+    # @param data Data with the time series of the days, in chronological order.
+    # @param length Number of days of a period.
+    # @param stride Number of days between the first days of consecutive periods, by default the length.
+    def __init__(self, data, length=7, stride=None):
+        Data.__init__(self)
+        if stride is None:
+            stride = length
+        if length < 1 or stride < 1:
+            raise Exception('The length and the stride of the periods should be positive.')
+        D = len(data.timeSeries)
+        if D < length:
+            raise Exception('Periods of %s days are longer than the %s days of the data.' % (length, D))
+
+        self.data = data
+        self.length = length
+        self.stride = stride
+        self.labels = data.labels
+        self._days = list(data.days())
+        self._starts = np.arange(0, D - length + 1, stride)
+        self.timeSeries = _PeriodTimeSeries(self)
+
+    ## Cheap fingerprint of the periods based on the fingerprint of the data, the length and the stride.
+    # @return Fingerprint as an hexadecimal string.
+    def fingerprint(self):
+        return '%s-%s-%s' % (self.data.fingerprint(), self.length, self.stride)
+
+    ## Get the days of a period.
+    # @param period First day of the period.
+    # @return List of the days of the period.
+    def periodDays(self, period):
+        s = self._starts[self.timeSeries.index(period)]
+        return self._days[s:s + self.length]
+
+    ## Get the values of a label as flat arrays ordered by period.
+    # The values of the days shared by overlapping periods are copied in each period, the memory growing with
+    # length/stride. The duration curves use the values of the days and dayRanges instead.
+    # @param p Label index.
+    # @return Tuple (values, periodIndexes) with the values and the index of their period.
+    def labelValues(self, p):
+        values, dayIndexes = self.data.labelValues(p)
+        bounds = np.searchsorted(dayIndexes, np.arange(len(self._days) + 1))
+        firsts = bounds[self._starts]
+        lengths = bounds[self._starts + self.length] - firsts
+        periodIndexes = np.repeat(np.arange(len(self._starts)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return values[np.repeat(firsts, lengths) + offsets], periodIndexes
+
+    ## Get the days of each period as ranges of consecutive days.
+    # @return Tuple (days, ranges) with the data of the days and an array with the index of the first day and of the day
+    #         after the last one of each period.
+    def dayRanges(self):
+        return self.data, np.column_stack((self._starts, self._starts + self.length))
+
+    ## Get the time of each value of the periods.
+    # @return Array of datetime64 in seconds, ordered as the values of labelValues.
+    def periodTimes(self):
+        times = self.data.periodTimes()
+        if len(self.labels) == 0:
+            return times
+        bounds = np.searchsorted(self.data.labelValues(0)[1], np.arange(len(self._days) + 1))
+        return np.concatenate([times[bounds[s]:bounds[s + self.length]] for s in self._starts])
+
+    ## Get the time series of representative periods and their weights as arrays.
+    # The weights are scaled by stride/length to count days instead of overlapping windows, the exported values of a
+    # label weighted by their weight summing to about the total of the label over the data.
+    # @param representativeDays Dictionary with the first day of the representative periods as keys and their weights
+    #                           as values.
+    # @return Tuple (times, columns, weights) as Data.representativeSeries, the periods being in chronological order.
+    def representativeSeries(self, representativeDays):
+        times, columns, weights = [], [[] for p in self.labelRanges()], []
+        for period in sorted(representativeDays.keys()):
+            if period not in self.timeSeries:
+                raise Exception('Representative period %s is not part of the time series.' % period)
+            periodTimes, periodColumns, periodWeights = self.data.representativeSeries(
+                {day: representativeDays[period] * self.stride / self.length for day in self.periodDays(period)})
+            times.append(periodTimes)
+            weights.append(periodWeights)
+            for p in self.labelRanges():
+                columns[p].append(periodColumns[p])
+        return np.concatenate(times), [np.concatenate(c) for c in columns], np.concatenate(weights)
+
+    def appendDays(self, data):
+        raise Exception('Days cannot be appended to periods, append them to the data of the days.')
+
+    def resample(self, period, aggregation='mean'):
+        raise Exception('Periods cannot be resampled, resample the data of the days.')
+
+    ## @var data
+    # Data with the time series of the days.
+    ## @var length
+    # Number of days of a period.
+    ## @var stride
+    # Number of days between the first days of consecutive periods.
+    ## @var _days
+    # List of the days of the data.
+    ## @var _starts
+    # Array with the index of the first day of each period.
+
+
+## Read-only dictionary with the first day of each period as keys and the values of its days as values.
+# The values of a period are only gathered when requested.
+class _PeriodTimeSeries(collections.abc.Mapping):
+    ## Constructor.
+    # @param periodData Periods.
+    def __init__(self, periodData):
+        self._periodData = periodData
+        self._index = {periodData._days[s]: w for w, s in enumerate(periodData._starts)}
+
+    ## Get the index of a period.
+    # @param period First day of the period.
+    # @return Index of the period.
+    def index(self, period):
+        return self._index[period]
+
+    def __getitem__(self, period):
+        days = self._periodData.periodDays(period)
+        timeSeries = self._periodData.data.timeSeries
+        return {p: [v for day in days for v in timeSeries[day][p]] for p in self._periodData.labelRanges()}
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, period):
+        return period in self._index
+
+
+## Bins of periods derived from the bins of their days.
+# The occupancy of the periods is computed from windows of the occupancy of the days, which are strided views sharing
+# the memory of the bins of the days. The periods therefore share the bin edges of the days and overlapping periods
+# are never copied nor binned again.
+class PeriodBins(Bins):
+    ## Create bins of periods.
+    # @param bins Bins of the days.
+    # @param length Number of days of a period.
+    # @param stride Number of days between the first days of consecutive periods, by default the length.
+    def __init__(self, bins=None, length=7, stride=None):
+        Bins.__init__(self, None, bins.binsPerTimeSeries if bins is not None else 10)
+        self.windows = None
+        if bins is not None:
+            with metrics.timer('bins.' + type(self).__name__):
+                self._createPeriodBins(bins, length, length if stride is None else stride)
+
+    ## Create the bins of the periods from the bins of the days.
+    # @param bins Bins of the days.
+    # @param length Number of days of a period.
+    # @param stride Number of days between the first days of consecutive periods.
+    def _createPeriodBins(self, bins, length, stride):
+        self.labels = bins.labels
+        self.binStart = bins.binStart
+        self.binsNumber = bins.binsNumber
+        starts = range(0, len(bins.days) - length + 1, stride)
+        self.days = {w: bins.days[s] for w, s in enumerate(starts)}
+        self.dayIndex = {day: w for w, day in self.days.items()}
+
+        self.windows = []
+        self.A = []
+        self.binSize = []
+        for p in self.labelRanges():
+            self.windows.append(np.lib.stride_tricks.sliding_window_view(bins.A[p], length, axis=1)[:, ::stride])
+            self.A.append(self.windows[p].sum(axis=2))
+            self.binSize.append(self.A[p].sum(axis=1).tolist())
+        self._computeCumulatedBinSize()
+
+    def appendDays(self, data, days):
+        raise Exception('Days cannot be appended to the bins of periods, append them to the bins of the days.')
+
+    ## Pickle the bins without the views of the occupancy of the days, which would be copied.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['windows'] = None
+        return state
+
+    ## @var windows
+    # For each label, view of the occupancy of the days indexed by the bin, the period index and the day in the period.
@@ -0,0 +1,170 @@
+##@package portfoliodaysselector
+# @author Sebastien MATHIEU
+
+from __future__ import division
+
+import os, time, signal
+import multiprocessing
+from multiprocessing.connection import wait
+from pyomo.environ import *
+from pyomo.opt import SolverFactory
+
+from .mipdaysselector import MIPDaysSelector, solverAvailable, timeLimitArguments
+from .binscache import createBins
+from . import metrics
+
+
+## Selector of days racing several optimization solvers on the MIPDaysSelector formulation.
+# The model is built once and solved by each available solver in its own process under the same time limit. The first
+# proven optimum stops the race, otherwise the best solution found within the time limit is kept.
+class PortfolioMIPDaysSelector(MIPDaysSelector):
+    ## Constructor.
+    # @param binsPerTimeSeries Number of bins discretizing the time series.
+    # @param numberRepresentativeDays Number of representative days to select.
+    # @param timelimit Time limit for the optimization in seconds, shared by all the solvers.
+    # @param solverNames Names of the optimization solvers of the portfolio, the unavailable ones being skipped.
+    # @param grace Additional time in seconds given to the solvers to return their solution after the time limit.
+    # @param verbose Verbose boolean.
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40,
+                 solverNames=('cplex', 'gurobi', 'cbc', 'glpk', 'appsi_highs'), grace=5, verbose=False):
+        self.solverNames = list(solverNames)
+        self.grace = grace
+        self.solverResults = {name: {'status': 'unavailable', 'objective': None, 'seconds': None}
+                              for name in self.solverNames}
+        self.availableSolvers = [name for name in self.solverNames if solverAvailable(name)]
+        if len(self.availableSolvers) == 0:
+            raise Exception('None of the solvers %s is available.' % ", ".join(self.solverNames))
+
+        MIPDaysSelector.__init__(self, numberRepresentativeDays=numberRepresentativeDays, timelimit=timelimit,
+                                 binsPerTimeSeries=binsPerTimeSeries, solverName=self.availableSolvers[0],
+                                 verbose=verbose)
+
+    def configuration(self):
+        configuration = MIPDaysSelector.configuration(self)
+        configuration['solverName'] = ",".join(self.solverNames)
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
+        bins = createBins(data, self.binsPerTimeSeries)
+        model = self._buildModel(bins)
+
+        if self.verbose:
+            print('Racing the solvers %s...' % ", ".join(self.availableSolvers))
+        with metrics.timer('portfolio.race'):
+            best = self._race(model)
+        metrics.record('portfolio.solvers', self.solverResults)
+        if best is None:
+            raise Exception('No solution found:\n\t%s' % "\n\t".join(self.solverReport()))
+
+        # Load the best solution
+        for d in model.days:
+            model.u[d].set_value(best['u'][d], skip_validation=True)
+            model.w[d].set_value(best['w'][d], skip_validation=True)
+        self.objective = best['objective']
+        if self.verbose:
+            for line in self.solverReport():
+                print("\t" + line)
+            print("Best solution found by %s has an objective value of %.2f." % (best['solver'], self.objective))
+        return self._selection(model, bins)
+
+    ## Report of the solvers of the last race.
+    # @return List with a line per solver giving its status, its objective and its time.
+    def solverReport(self):
+        lines = []
+        for name, result in self.solverResults.items():
+            line = "%s: %s" % (name, result['status'])
+            if result['objective'] is not None:
+                line += ", objective of %.2f" % result['objective']
+            if result['seconds'] is not None:
+                line += " after %.2fs" % result['seconds']
+            lines.append(line)
+        return lines
+
+    ## Solve the model with each available solver in its own process.
+    # @param model Pyomo concrete model.
+    # @return Dictionary with the solution of the winning solver, None if no solver found a solution.
+    def _race(self, model):
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        tic = time.time()
+        running = {}
+        for name in self.availableSolvers:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_solve, args=(sender, model, name, self.timeLimit), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (name, process)
+            self.solverResults[name] = {'status': 'running', 'objective': None, 'seconds': None}
+
+        # Collect the solutions as they arrive
+        best = None
+        deadline = tic + self.timeLimit + self.grace
+        while len(running) > 0 and time.time() < deadline:
+            for receiver in wait(list(running.keys()), timeout=max(0.0, deadline - time.time())):
+                name, process = running.pop(receiver)
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    result = {'status': 'crashed'}
+                process.join()
+                self.solverResults[name] = {'status': result['status'], 'objective': result.get('objective'),
+                                            'seconds': time.time() - tic}
+                if 'error' in result:
+                    self.solverResults[name]['error'] = result['error']
+                if result.get('objective') is not None and (best is None or result['objective'] < best['objective']):
+                    best = dict(result, solver=name)
+                if result['status'] == 'optimal':
+                    deadline = 0
+
+        # Stop the remaining solvers
+        for receiver, (name, process) in running.items():
+            _terminate(process)
+            self.solverResults[name] = {'status': 'stopped', 'objective': None, 'seconds': time.time() - tic}
+        return best
+
+    ## @var solverNames
+    # Names of the optimization solvers of the portfolio.
+    ## @var availableSolvers
+    # Names of the available optimization solvers of the portfolio, racing in this order.
+    ## @var grace
+    # Additional time in seconds given to the solvers to return their solution after the time limit.
+    ## @var solverResults
+    # Dictionary with the name of the solvers as keys and dictionaries with their status ("optimal", "feasible",
+    # "infeasible", "error", "crashed", "stopped" or "unavailable"), objective and seconds as values.
+
+
+## Solve the model with a solver in a racing process.
+# The process leads its own process group so that the executables it launches are stopped with it.
+# @param connection Connection receiving the result, a dictionary with the status, the objective and the values of the
+#                   variables u and w.
+# @param model Pyomo concrete model.
+# @param solverName Name of the solver.
+# @param timelimit Time limit in seconds.
+def _solve(connection, model, solverName, timelimit):
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    try:
+        solver = SolverFactory(solverName)
+        results = solver.solve(model, **timeLimitArguments(solver, solverName, timelimit))
+
+        condition = str(results.solver.termination_condition)
+        if any(model.u[d].value is None for d in model.days):
+            connection.send({'status': 'infeasible' if condition == 'infeasible' else 'no solution'})
+        else:
+            connection.send({'status': 'optimal' if condition == 'optimal' else 'feasible', 'objective': value(model.obj),
+                             'u': {d: model.u[d].value for d in model.days},
+                             'w': {d: model.w[d].value for d in model.days}})
+    except Exception as e:
+        connection.send({'status': 'error', 'error': str(e) or type(e).__name__})
+    finally:
+        connection.close()
+
+
+## Stop a racing process and the executables it launched.
+# @param process Process.
+def _terminate(process):
+    if process.is_alive():
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (AttributeError, OSError):
+            process.terminate()
+    process.join()
@@ -0,0 +1,88 @@
+# @package quantilebins
+# @author Sebastien MATHIEU
+
+import numpy as np
+
+from .bins import Bins
+
+
+## Create bins for time series with edges derived from the quantiles of each label.
+# The bins are evenly populated by construction. Bins under the minimum population are merged and the most
+# populated bins are split, all estimated on the sorted values, before filling the bins in a single pass.
+class QuantileBins(Bins):
+    ## Create bins from data.
+    # @param data Data with the time series.
+    # @param binsPerTimeSeries Default number of bins per time series.
+    # @param minPop Minimum relative population of a bin in [0,1]. A value of 0 will still merge the 0 population bins.
+    # @param sampleSize Number of values sampled per label to estimate the quantiles, None to use all the values.
+    # @param seed Seed of the sampling.
+    def __init__(self, data=None, binsPerTimeSeries=10, minPop=0, sampleSize=None, seed=42):
+        self.minPop = minPop
+        self.sampleSize = sampleSize
+        self.seed = seed
+        Bins.__init__(self, data, binsPerTimeSeries)
+
+    def _createBins(self, data, binsPerTimeSeries):
+        self.labels = data.labels
+        random = np.random.default_rng(self.seed)
+
+        self.binsNumber = [binsPerTimeSeries] * len(self.labelRanges())
+        self.binStart = []
+        values = []
+        for p in self.labelRanges():
+            label = data.labels[p]
+            v, dayIndexes = data.labelValues(p)
+            values.append((v, dayIndexes))
+
+            # Sorted sample of the values
+            if self.sampleSize is not None and len(v) > self.sampleSize:
+                sample = np.sort(random.choice(v, self.sampleSize, replace=False))
+            else:
+                sample = np.sort(v)
+
+            # Distinct quantiles as starting values
+            quantiles = np.quantile(sample, np.linspace(0.0, 1.0, binsPerTimeSeries + 1)[0:-1])
+            quantiles[0] = label.min
+            starts = [float(s) for s in np.unique(quantiles)]
+
+            # Merge the bins with low population
+            minOccurences = self.minPop * len(sample)
+            sizes = self._sampleSizes(sample, starts)
+            b = 0
+            while b < len(starts) - 1:
+                if sizes[b] == 0 or (sizes[b] < minOccurences and sizes[b + 1] < minOccurences):
+                    del starts[b + 1]
+                    sizes[b] += sizes[b + 1]
+                    del sizes[b + 1]
+                else:
+                    b += 1
+
+            # Split the most populated at its median, or at the middle if its values are all equal
+            while len(starts) < binsPerTimeSeries:
+                b = int(np.argmax(sizes))
+                end = starts[b + 1] if b + 1 < len(starts) else label.max
+                lo, hi = np.searchsorted(sample, [starts[b], end], side='left')
+                median = float(sample[(lo + hi) // 2]) if hi > lo else starts[b]
+                starts.insert(b + 1, median if starts[b] < median < end else (starts[b] + end) / 2.0)
+                sizes = self._sampleSizes(sample, starts)
+
+            self.binStart.append(starts + [label.max])
+
+        # Populate the bins
+        self._createBinsFromStartValues(data, values)
+        self._computeCumulatedBinSize()
+
+    ## Number of values of a sorted sample in each bin.
+    # @param sample Sorted sample.
+    # @param starts Starting value of each bin.
+    # @return List with the number of values in each bin.
+    def _sampleSizes(self, sample, starts):
+        indexes = np.searchsorted(sample, starts, side='left')
+        return np.diff(np.append(indexes, len(sample))).tolist()
+
+    ## @var minPop
+    # Minimum relative population of a bin in [0,1].
+    ## @var sampleSize
+    # Number of values sampled per label to estimate the quantiles, None to use all the values.
+    ## @var seed
+    # Seed of the sampling.
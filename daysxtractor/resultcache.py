@@ -0,0 +1,112 @@
+##@package resultcache
+# @author Sebastien MATHIEU
+
+import os, pickle, hashlib
+
+
+## Cache of the representative days selected by days selectors, keyed by the data and the configuration of the selector.
+# A selection is reused by later selections with a time limit up to the one which found it. Selections with a longer
+# time limit either start over or continue from the cached selection.
+class ResultCache:
+    ## Constructor.
+    # @param folder Folder where the selections are stored between runs, None to keep them only in memory.
+    def __init__(self, folder=None):
+        self.folder = folder
+        self._results = {}
+
+    ## Select representative days, reusing the cached selection if any.
+    # @param data Data with the time series.
+    # @param selector Days selector.
+    # @param continueSelection True to continue from a cached selection found with a shorter time limit, False to start
+    #                          over.
+    # @return Tuple (representativeDays, hit) with the dictionary of the representative days and their weights, and True
+    #         if the selection has been taken from the cache.
+    def selectDays(self, data, selector, continueSelection=False):
+        result = self.get(data, selector)
+        if result is not None and result['timeLimit'] >= selector.timeLimit:
+            for name, value in result['attributes'].items():
+                setattr(selector, name, value)
+            return result['days'], True
+
+        if result is not None and continueSelection:
+            timeLimit = selector.timeLimit
+            selector.timeLimit = timeLimit - result['timeLimit']
+            try:
+                representativeDays = selector.selectDays(data, incumbent=result['days'])
+            finally:
+                selector.timeLimit = timeLimit
+            if selector.objective is not None and result['attributes'].get('objective') is not None \
+                    and result['attributes']['objective'] < selector.objective:
+                representativeDays = result['days']
+                for name, value in result['attributes'].items():
+                    setattr(selector, name, value)
+        else:
+            representativeDays = selector.selectDays(data)
+
+        self.put(data, selector, representativeDays)
+        return representativeDays, False
+
+    ## Get the cached selection of a selector.
+    # @param data Data with the time series.
+    # @param selector Days selector.
+    # @return Dictionary with the representative days ('days'), the time limit of the selection ('timeLimit') and the
+    #         attributes of the selector such as its objective ('attributes'), None if there is no cached selection.
+    def get(self, data, selector):
+        key = self.key(data, selector)
+        result = self._results.get(key)
+        path = self._path(key)
+        if result is None and path is not None and os.path.isfile(path):
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+            self._results[key] = result
+        return result
+
+    ## Put the selection of a selector in the cache.
+    # @param data Data with the time series.
+    # @param selector Days selector with its time limit and objective.
+    # @param representativeDays Dictionary with the selected representative days as keys and their weights as values.
+    def put(self, data, selector, representativeDays):
+        key = self.key(data, selector)
+        result = {'days': dict(representativeDays), 'timeLimit': selector.timeLimit,
+                  'attributes': {name: getattr(selector, name) for name in RESULT_ATTRIBUTES
+                                 if hasattr(selector, name)}}
+        self._results[key] = result
+
+        path = self._path(key)
+        if path is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            temporaryPath = '%s.%s.tmp' % (path, os.getpid())  # Folders shared by the processes of a batch
+            with open(temporaryPath, 'wb') as file:
+                pickle.dump(result, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporaryPath, path)
+
+    ## Key of a selection in the cache.
+    # @param data Data with the time series.
+    # @param selector Days selector.
+    # @return Key as an hexadecimal string.
+    def key(self, data, selector):
+        return selectionKey(data, selector)
+
+    ## Path of the file of a selection.
+    # @param key Key of the selection.
+    # @return Path or None if the selections are only kept in memory.
+    def _path(self, key):
+        return os.path.join(self.folder, key + '.pickle') if self.folder is not None else None
+
+    ## @var folder
+    # Folder where the selections are stored between runs, None to keep them only in memory.
+    ## @var _results
+    # Dictionary with the keys as keys and the cached selections as values.
+
+
+## Key of a selection, given by the data and the configuration of the selector.
+# @param data Data with the time series.
+# @param selector Days selector.
+# @return Key as an hexadecimal string.
+def selectionKey(data, selector):
+    description = repr((data.fingerprint(), sorted(selector.configuration().items())))
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+
+## Attributes of the selectors describing their last selection, restored with a cached selection.
+RESULT_ATTRIBUTES = ['objective', 'lowerBound']
@@ -3,10 +3,12 @@
 
 from __future__ import division
 
-import math, time, random
+import math, time, random, heapq
+import numpy as np
 
 from .daysselector import DaysSelector
-from .minpopbins import MinPopBins as Bins
+from .binscache import createBins
+from . import metrics
 
 
 ## Select representative days by random sampling.
@@ -15,105 +17,249 @@ class SamplingDaysSelector(DaysSelector):
     # @param binsPerTimeSeries Number of bins discretizing the time series.
     # @param numberRepresentativeDays Number of representative days to select.
     # @param timelimit Time limit for the process.
+    # @param seed Seed of the sampling.
+    # @param embedding Embedding of the day profiles in which the sampling is performed, None to sample on the full
+    #                  profiles, "pca" for a principal component analysis or "random" for a random projection.
+    # @param dimension Dimension of the embedding.
     # @param verbose Verbose boolean.
-    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40, verbose=False):
+    def __init__(self, numberRepresentativeDays=24, timelimit=60, binsPerTimeSeries=40, seed=42, embedding=None,
+                 dimension=16, verbose=False):
+        if embedding not in EMBEDDINGS:
+            raise Exception('Unknown embedding "%s", expected one of %s.'
+                            % (embedding, ', '.join(e for e in EMBEDDINGS if e is not None)))
+        if dimension < 1:
+            raise Exception('The dimension of the embedding should be positive.')
         self.binsPerTimeSeries = binsPerTimeSeries
         self.numberRepresentativeDays = numberRepresentativeDays
-        self.timelimit = timelimit
+        self.timeLimit = timelimit
+        self.seed = seed
+        self.embedding = embedding
+        self.dimension = dimension
         self.verbose = verbose
+        self.objective = None
+        self.checkpoint = None
 
-    def selectDays(self, data):
+    def configuration(self):
+        configuration = DaysSelector.configuration(self)
+        configuration['seed'] = self.seed
+        if self.embedding is not None:
+            configuration['embedding'] = self.embedding
+            configuration['dimension'] = self.dimension
+        return configuration
+
+    def selectDays(self, data, incumbent=None):
         # Prepare parameters
-        random.seed(42)
-        bins = Bins(data, self.binsPerTimeSeries)
+        bins = createBins(data, self.binsPerTimeSeries)
+        profiles, cumulatedBinSize = self._profiles(bins)
         D = len(data.days())
 
-        # Sample
-        samples = 0
+        # Search in the embedding of the profiles, keeping the best candidates to re-score them exactly
+        searchProfiles, searchTarget = self._searchSpace(bins, profiles, cumulatedBinSize)
+        candidates = []
+
+        # Start from the incumbent with a sampling differing from the one which found it
         bestObj = None
         bestSelection = None
-        tic = time.time()
+        if incumbent is None:
+            rand = random.Random(self.seed)
+        else:
+            for day in incumbent.keys():
+                if day not in bins.dayIndex:
+                    raise Exception('Representative day %s is not part of the time series.' % day)
+            bestObj, bestSelection = self._evaluateDays([bins.dayIndex[day] for day in incumbent.keys()], profiles,
+                                                        cumulatedBinSize)
+            rand = random.Random('%s-%s' % (self.seed, sorted(str(day) for day in incumbent.keys())))
+
+        # Resume from the checkpoint with the remaining time
+        samples = 0
+        elapsed = 0.0
+        state = self.checkpoint.load(data, self) if self.checkpoint is not None else None
+        if state is not None:
+            rand.setstate(state['random'])
+            bestObj, bestSelection = state['objective'], state['selection']
+            samples, elapsed, candidates = state['samples'], state['elapsed'], state['candidates']
+            if self.verbose:
+                print("Resuming after %s samples and %.2fs." % (samples, elapsed))
+
+        # Sample
+        tic = time.time() - elapsed
         if self.verbose:
             print("Random sampling of representative days...")
-        while time.time() - tic < self.timelimit:
-            # Select days
-            selectedDays = set()
-            while len(selectedDays) < self.numberRepresentativeDays:
-                selectedDays.add(random.randrange(0, D))
+        with metrics.timer('sampling.search'):
+            while time.time() - tic < self.timeLimit or (bestSelection is None and len(candidates) == 0):
+                # Select days
+                selectedDays = self._sampleDays(rand, D)
+
+                # Obtain weights & evaluate
+                objValue, selectedDaysWeights = self._evaluateDays(selectedDays, searchProfiles, searchTarget)
+                if self.embedding is not None:
+                    candidate = (-objValue, samples, selectedDays)
+                    if len(candidates) < RESCORED_CANDIDATES:
+                        heapq.heappush(candidates, candidate)
+                    elif candidate > candidates[0]:
+                        heapq.heapreplace(candidates, candidate)
+                elif bestObj is None or bestObj > objValue:
+                    bestObj = objValue
+                    bestSelection = selectedDaysWeights
 
-            # Obtain weights & evaluate
-            objValue, selectedDaysWeights = self._evaluateDays(list(selectedDays), bins)
-            if bestObj is None or bestObj > objValue:
-                bestObj = objValue
-                bestSelection = selectedDaysWeights
+                    # Print
+                    if self.verbose:
+                        print('\tNew incumbent with an objective value of %.2f.' % bestObj)
 
-                # Print
-                if self.verbose:
-                    print('\tNew incumbent with an objective value of %.2f.' % bestObj)
+                # Iterate
+                samples += 1
+                if self.checkpoint is not None and self.checkpoint.due():
+                    self._saveCheckpoint(data, rand, bestObj, bestSelection, samples, time.time() - tic, candidates)
+        if self.checkpoint is not None:
+            self._saveCheckpoint(data, rand, bestObj, bestSelection, samples, time.time() - tic, candidates)
 
-            # Iterate
-            samples += 1
+        # Re-score the best candidates of the embedding on the full profiles
+        bestObj, bestSelection = self._rescore([selectedDays for _, _, selectedDays in sorted(candidates, reverse=True)],
+                                               profiles, cumulatedBinSize, bestObj, bestSelection)
 
         if self.verbose:
             print("Best solution found has an objective value of %.2f after %s samples." % (bestObj, samples))
+        metrics.count('sampling.samples', samples)
+        metrics.record('sampling.objective', bestObj)
+        self.objective = bestObj
 
         # Reformat selection
         return {bins.days[d]: v for d, v in bestSelection.items()}
 
+    ## Get the profile of each day and the cumulated bin sizes as arrays.
+    # @param bins Bins of the time series.
+    # @return Tuple (profiles, cumulatedBinSize) with the profiles indexed by day and (label, bin), and the cumulated bin
+    #         sizes indexed by (label, bin).
+    def _profiles(self, bins):
+        profiles = np.concatenate([bins.A[p] for p in bins.labelRanges()], axis=0).T
+        cumulatedBinSize = np.concatenate([bins.cumulatedBinSize[p] for p in bins.labelRanges()])
+        return profiles, cumulatedBinSize
+
+    ## Write the state of the sampling in the checkpoint.
+    # @param data Data with the time series.
+    # @param rand Random generator.
+    # @param bestObj Objective value of the best selection, None if there is none.
+    # @param bestSelection Weights of the best selection by day index, None if there is none.
+    # @param samples Number of samples done.
+    # @param elapsed Time elapsed in seconds.
+    # @param candidates Best candidates of the embedding.
+    def _saveCheckpoint(self, data, rand, bestObj, bestSelection, samples, elapsed, candidates):
+        with metrics.timer('sampling.checkpoint'):
+            self.checkpoint.save(data, self, {'random': rand.getstate(), 'objective': bestObj,
+                                              'selection': bestSelection, 'samples': samples, 'elapsed': elapsed,
+                                              'candidates': candidates})
+
+    ## Profiles in which the days are sampled, the embedding of the profiles if any.
+    # @param bins Bins of the time series.
+    # @param profiles Profile of each day as returned by _profiles.
+    # @param cumulatedBinSize Cumulated bin sizes as returned by _profiles.
+    # @return Tuple (profiles, cumulatedBinSize) of the search.
+    def _searchSpace(self, bins, profiles, cumulatedBinSize):
+        if self.embedding is None:
+            return profiles, cumulatedBinSize
+        with metrics.timer('sampling.embedding'):
+            return self._embed(bins, profiles, cumulatedBinSize)
+
+    ## Sample distinct days.
+    # @param rand Random generator.
+    # @param D Number of days.
+    # @return List of the indexes of the selected days.
+    def _sampleDays(self, rand, D):
+        if self.numberRepresentativeDays > D:
+            raise Exception('Cannot sample %s distinct days among %s days.' % (self.numberRepresentativeDays, D))
+        selectedDays = set()
+        while len(selectedDays) < self.numberRepresentativeDays:
+            selectedDays.add(rand.randrange(0, D))
+        return list(selectedDays)
+
+    ## Re-score candidates found in the embedding on the full profiles.
+    # @param candidates List of candidate selections, each one a list of days index, from the best to the worst.
+    # @param profiles Profile of each day as returned by _profiles.
+    # @param cumulatedBinSize Cumulated bin sizes as returned by _profiles.
+    # @param bestObj Objective value of the best selection so far, None if there is none.
+    # @param bestSelection Weights of the best selection so far, None if there is none.
+    # @return Tuple (bestObj, bestSelection) of the best selection among the candidates and the best so far.
+    def _rescore(self, candidates, profiles, cumulatedBinSize, bestObj=None, bestSelection=None):
+        if len(candidates) == 0:
+            return bestObj, bestSelection
+        with metrics.timer('sampling.rescoring'):
+            for selectedDays in candidates:
+                objValue, selectedDaysWeights = self._evaluateDays(selectedDays, profiles, cumulatedBinSize)
+                if bestObj is None or bestObj > objValue:
+                    bestObj = objValue
+                    bestSelection = selectedDaysWeights
+        metrics.count('sampling.rescored', len(candidates))
+        if self.verbose:
+            print('\tBest of %s candidates re-scored on the full profiles.' % len(candidates))
+        return bestObj, bestSelection
+
+    ## Embed the profiles of the days in a space of lower dimension.
+    # The embedding is a linear map of the cumulated profiles of each label, such that distances between days reflect
+    # differences between their duration curves. The cumulated bin sizes are mapped likewise so that the objective of
+    # a selection can be estimated in the embedding.
+    # @param bins Bins of the time series.
+    # @param profiles Profile of each day as returned by _profiles.
+    # @param cumulatedBinSize Cumulated bin sizes as returned by _profiles.
+    # @return Tuple (profiles, cumulatedBinSize) of the embedding.
+    def _embed(self, bins, profiles, cumulatedBinSize):
+        # Cumulate the bins of each label
+        offsets = np.cumsum([0] + [bins.A[p].shape[0] for p in bins.labelRanges()])
+
+        def cumulate(x):
+            return np.concatenate([np.cumsum(x[..., offsets[i]:offsets[i + 1]], axis=-1)
+                                   for i in range(len(offsets) - 1)], axis=-1).astype(float)
+
+        cumulatedProfiles = cumulate(profiles)
+        target = cumulatedBinSize.astype(float) # Already cumulated
+        dimension = min(self.dimension, cumulatedProfiles.shape[1])
+
+        if self.embedding == 'pca':
+            centered = cumulatedProfiles - cumulatedProfiles.mean(axis=0)
+            components = np.linalg.svd(centered, full_matrices=False)[2][:dimension].T
+        else:
+            rand = np.random.RandomState(self.seed)
+            components = rand.standard_normal((cumulatedProfiles.shape[1], dimension)) / math.sqrt(dimension)
+        return cumulatedProfiles.dot(components), target.dot(components)
+
     ## Evaluate a set of selected days.
     # @param selectedDays List of selected days index.
-    # @param bins Bins of the time series.
+    # @param profiles Profile of each day as returned by _profiles.
+    # @param cumulatedBinSize Cumulated bin sizes as returned by _profiles.
     # @return (objValue,selectedDaysWeights) The objective value of the selected days and their weights in a dictionary.
-    def _evaluateDays(self, selectedDays, bins):
-        # Allocate results
-        objValue = 0.0
-        selectedDaysWeights = {d: 0 for d in selectedDays}
-
-        # Assign each original day to one selected day
-        pRange = range(len(bins.labels))
-        bRange = range(self.binsPerTimeSeries)
-        for j in range(len(bins.days)):
-            # Find the closest day
-            dCandidate = 0
-            candidateDist = len(bins.days) * self.binsPerTimeSeries * len(bins.labels)
-            for i in range(len(selectedDays)):
-                dDist = self._daysDistance(i, j, pRange, bRange, bins.A)
-                if dDist < candidateDist:
-                    dCandidate = i
-                    candidateDist = dDist
-
-            # Assign weight
-            selectedDaysWeights[selectedDays[dCandidate]] += 1
+    def _evaluateDays(self, selectedDays, profiles, cumulatedBinSize):
+        # Assign each original day to the closest selected day
+        distances = np.empty((len(profiles), len(selectedDays)), dtype=profiles.dtype)
+        for i, d in enumerate(selectedDays):
+            distances[:, i] = np.abs(profiles - profiles[d]).sum(axis=1)
+        closest = np.bincount(distances.argmin(axis=1), minlength=len(selectedDays))
+        selectedDaysWeights = {d: int(closest[i]) for i, d in enumerate(selectedDays)}
 
         # Compute objective value
-        for p in pRange:
-            for b in bRange:
-                error = bins.cumulatedBinSize[p][b]
-                for d in selectedDays:
-                    error -= bins.A[p][b][d]
-                objValue += abs(error)
+        objValue = float(np.abs(cumulatedBinSize - profiles[selectedDays].sum(axis=0)).sum())
 
         return objValue, selectedDaysWeights
 
-    ## Compute the distance between two days.
-    # @param d1 First day.
-    # @param d2 Second day.
-    # @param pRange Range of the parameters.
-    # @param bRange Range of the bins.
-    # @param A Number of periods in each bin of a given day.
-    # @return Distance.
-    def _daysDistance(self, d1, d2, pRange, bRange, A):
-        dist = 0
-        for p in pRange:
-            for b in bRange:
-                dist += abs(A[p][b][d1] - A[p][b][d2])
-        return dist
-
     ## @var binsPerTimeSeries
     # Number of bins discretizing the time series.
     ## @var numberRepresentativeDays
     # Number of representative days to select.
     ## @var timeLimit
     # Time limit for the optimization in seconds.
+    ## @var seed
+    # Seed of the sampling.
+    ## @var embedding
+    # Embedding of the day profiles in which the sampling is performed, None to sample on the full profiles.
+    ## @var dimension
+    # Dimension of the embedding.
     ## @var verbose
     # Verbose (True or False).
+    ## @var objective
+    # Objective value of the last selection, None before any selection.
+    ## @var checkpoint
+    # Checkpoint of the sampling, None to sample without checkpoint.
+
+
+## Embeddings of the day profiles, None for the full profiles.
+EMBEDDINGS = (None, 'pca', 'random')
+## Number of the best candidates of an embedding re-scored on the full profiles.
+RESCORED_CANDIDATES = 10
@@ -0,0 +1,446 @@
+##@package service
+# @author Sebastien MATHIEU
+#
+# Local HTTP service keeping the parsed data and their bins in memory between requests.
+# Usage: python -m daysxtractor.service [options]
+#
+# The requests and the responses are JSON objects:
+#   GET  /datasets  Datasets in memory.
+#   POST /load      {"path": "data.csv", "units": false} Parse a dataset and give its labels.
+#   POST /select    {"path": ..., "number": 12, "timelimit": 60, "solver": null, "rounding": null, "decompose": null,
+#                    "bins": 40, "seed": 42} Select representative days and give their weights and errors.
+#   POST /check     {"path": ..., "days": {"2018-01-01": 365}} or {"path": ..., "check": "days.csv"} Give the errors
+#                   of representative days.
+#   POST /plot      {"path": ..., "label": "Load", "days": {...}, "output": "folder/", "format": "pdf"} Plot a label.
+
+import sys, os, io, json, getopt, asyncio, contextlib, datetime, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import http.client
+
+from . import csv_interface, excel_interface, columnar_interface, evaluation, binscache
+from .durationcurves import DurationCurves
+
+## Maximum size of the body of a request in bytes.
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+## Service selecting representative days with the data and their bins kept in memory.
+# Each dataset is parsed and kept resident in its own worker process, which also creates its bins, selects the days,
+# evaluates and plots them. The requests thus only exchange their parameters and results with the workers, and the
+# event loop keeps answering the other requests. The requests on a dataset are serialized by its single worker, a
+# selection waiting for the previous ones, while the requests on different datasets run in parallel. Running them
+# concurrently would take a copy of the data in each worker.
+class DaysService:
+    ## Constructor.
+    # @param maxDatasets Maximum number of datasets kept in memory, the least recently used being evicted with its
+    #                    worker.
+    # @param processes Maximum number of workers running at the same time, None to use the number of processors.
+    def __init__(self, maxDatasets=4, processes=None):
+        self.maxDatasets = maxDatasets
+        self.processes = processes
+        self._datasets = OrderedDict()
+        self._running = None
+        self._server = None
+
+    ## Start listening.
+    # @param host Host of the HTTP server.
+    # @param port Port of the HTTP server, 0 to take any free port.
+    # @param socketPath Path of a Unix socket to listen to instead of a TCP port.
+    # @return The asyncio server.
+    async def start(self, host='127.0.0.1', port=8080, socketPath=None):
+        self._running = asyncio.Semaphore(self.processes or os.cpu_count() or 1)
+        if socketPath is not None:
+            self._server = await asyncio.start_unix_server(self._handleConnection, path=socketPath)
+        else:
+            self._server = await asyncio.start_server(self._handleConnection, host, port)
+        return self._server
+
+    ## Port on which the service listens, None if it listens to a Unix socket.
+    # @return Port number.
+    def port(self):
+        address = self._server.sockets[0].getsockname()
+        return address[1] if isinstance(address, tuple) else None
+
+    ## Stop listening and stop the workers.
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        while len(self._datasets) > 0:
+            self._datasets.popitem(last=False)[1]['worker'].shutdown(wait=True)
+
+    ## Answer a request.
+    # @param method HTTP method.
+    # @param path Path of the request.
+    # @param request Dictionary with the parameters of the request.
+    # @return Tuple (status, response) with the HTTP status and the dictionary of the response.
+    async def handle(self, method, path, request):
+        handlers = {('GET', '/datasets'): self._datasetsRequest,
+                    ('POST', '/load'): self._loadRequest,
+                    ('POST', '/select'): self._selectRequest,
+                    ('POST', '/check'): self._checkRequest,
+                    ('POST', '/plot'): self._plotRequest}
+        handler = handlers.get((method, path))
+        if handler is None:
+            return 404, {'error': 'Unknown request %s %s.' % (method, path)}
+        try:
+            return 200, await handler(request)
+        except Exception as e:
+            return 400, {'error': str(e) or type(e).__name__}
+
+    ## Answer GET /datasets.
+    # @param request Dictionary with the parameters of the request.
+    # @return Dictionary of the response.
+    async def _datasetsRequest(self, request):
+        return {'datasets': [{'path': key[0], 'units': key[1], 'days': dataset['summary']['days']}
+                             for key, dataset in self._datasets.items() if dataset['summary'] is not None]}
+
+    ## Answer POST /load.
+    # @param request Dictionary with the parameters of the request.
+    # @return Dictionary of the response.
+    async def _loadRequest(self, request):
+        return (await self._dataset(request))['summary']
+
+    ## Answer POST /select.
+    # @param request Dictionary with the parameters of the request.
+    # @return Dictionary of the response.
+    async def _selectRequest(self, request):
+        dataset = await self._dataset(request)
+        parameters = {'numberRepresentativeDays': int(request.get('number', 12)),
+                      'timelimit': float(request.get('timelimit', 60)),
+                      'binsPerTimeSeries': int(request.get('bins', 40))}
+        for name in ('solver', 'rounding', 'decompose', 'seed'):
+            if request.get(name) is not None:
+                parameters[name] = request[name]
+
+        tic = time.time()
+        representativeDays, objective, errors = await self._run(dataset, _selectDays, parameters,
+                                                                bool(request.get('binned', False)))
+        return {'errors': errors, 'days': _formatDays(representativeDays), 'objective': objective,
+                'seconds': time.time() - tic}
+
+    ## Answer POST /check.
+    # @param request Dictionary with the parameters of the request.
+    # @return Dictionary of the response.
+    async def _checkRequest(self, request):
+        dataset = await self._dataset(request)
+        if request.get('check') is not None:
+            representativeDays = evaluation.parseRepresentativeDays(request['check'])
+        else:
+            representativeDays = _parseDays(request.get('days', {}))
+        errors = await self._run(dataset, _evaluateDays, int(request.get('bins', 40)), representativeDays,
+                                 bool(request.get('binned', False)))
+        return {'errors': errors, 'days': _formatDays(representativeDays)}
+
+    ## Answer POST /plot.
+    # @param request Dictionary with the parameters of the request.
+    # @return Dictionary of the response.
+    async def _plotRequest(self, request):
+        dataset = await self._dataset(request)
+        names = [l['name'] for l in dataset['summary']['labels']]
+        if request.get('label') not in names:
+            raise Exception('Unknown label "%s", expected one of %s.' % (request.get('label'), ", ".join(names)))
+        representativeDays = _parseDays(request['days']) if request.get('days') is not None else None
+        pathPrefix = request.get('output', '')
+        fileFormat = request.get('format', 'pdf')
+        await self._run(dataset, _plot, request['label'], representativeDays, pathPrefix, fileFormat)
+        return {'file': pathPrefix + request['label'] + "." + fileFormat}
+
+    ## Get a dataset, starting its worker and parsing it if it is not in memory.
+    # Concurrent requests of a dataset being parsed wait for the same parsing.
+    # @param request Dictionary with the path of the data and whether its second row contains the units.
+    # @return Dictionary with the worker keeping the data ('worker') and the summary of the data ('summary').
+    async def _dataset(self, request):
+        if request.get('path') is None:
+            raise Exception('The path of the data is missing.')
+        path = os.path.abspath(request['path'])
+        stat = os.stat(path)
+        key = (path, bool(request.get('units', False)))
+
+        dataset = self._datasets.get(key)
+        if dataset is None or dataset['stat'] != (stat.st_mtime_ns, stat.st_size):
+            if dataset is not None:
+                self._evict(key)
+            dataset = self._startDataset(key, (stat.st_mtime_ns, stat.st_size))
+        self._datasets.move_to_end(key)
+
+        try:
+            await asyncio.shield(dataset['loading'])
+        except Exception:
+            if self._datasets.get(key) is dataset:
+                self._evict(key)
+            raise
+        return dataset
+
+    ## Start the worker of a dataset and the parsing of its data.
+    # @param key Tuple (path, units) of the dataset.
+    # @param stat Tuple (modification time, size) of the file.
+    # @return Dataset.
+    def _startDataset(self, key, stat):
+        dataset = {'worker': ProcessPoolExecutor(max_workers=1), 'stat': stat, 'summary': None}
+        self._datasets[key] = dataset
+        while len(self._datasets) > self.maxDatasets:
+            self._evict(next(iter(self._datasets)))
+
+        async def load():
+            dataset['summary'] = await self._run(dataset, _loadData, key[0], key[1])
+        dataset['loading'] = asyncio.ensure_future(load())
+        return dataset
+
+    ## Evict a dataset and stop its worker once its running requests are answered.
+    # @param key Tuple (path, units) of the dataset.
+    def _evict(self, key):
+        self._datasets.pop(key)['worker'].shutdown(wait=False)
+
+    ## Run a function in the worker of a dataset, after the functions already submitted to this worker.
+    # @param dataset Dataset.
+    # @param function Function.
+    # @param args Arguments of the function.
+    # @return Value returned by the function.
+    async def _run(self, dataset, function, *args):
+        async with self._running:
+            return await asyncio.get_running_loop().run_in_executor(dataset['worker'], function, *args)
+
+    ## Read a HTTP request from a connection and write the response.
+    # @param reader Stream reader.
+    # @param writer Stream writer.
+    async def _handleConnection(self, reader, writer):
+        try:
+            requestLine = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if line == '':
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length', 0))
+            if len(requestLine) < 2:
+                status, response = 400, {'error': 'Invalid request.'}
+            elif length > MAX_BODY_SIZE:
+                status, response = 413, {'error': 'Request of %s bytes is too large.' % length}
+            else:
+                body = await reader.readexactly(length) if length > 0 else b''
+                try:
+                    request = json.loads(body.decode('utf-8')) if body else {}
+                except ValueError as e:
+                    status, response = 400, {'error': 'Invalid JSON: %s' % e}
+                else:
+                    status, response = await self.handle(requestLine[0], requestLine[1].split('?')[0], request)
+
+            content = json.dumps(response, default=str).encode('utf-8')
+            writer.write(('HTTP/1.1 %s %s\r\nContent-Type: application/json\r\nContent-Length: %s\r\n'
+                          'Connection: close\r\n\r\n' % (status, http.client.responses.get(status, ''), len(content)))
+                         .encode('latin-1') + content)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    ## @var maxDatasets
+    # Maximum number of datasets kept in memory.
+    ## @var processes
+    # Maximum number of workers running at the same time, None to use the number of processors.
+    ## @var _datasets
+    # Ordered dictionary with the (path, units) as keys and the datasets as values, from the least to the most recently
+    # used.
+    ## @var _running
+    # Semaphore limiting the number of workers running at the same time.
+
+
+## Client of the service, mostly for tests and scripts.
+class ServiceClient:
+    ## Constructor.
+    # @param host Host of the service.
+    # @param port Port of the service.
+    # @param timeout Timeout of the requests in seconds.
+    def __init__(self, host='127.0.0.1', port=8080, timeout=600):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    ## Send a request.
+    # @param path Path of the request, e.g. /select.
+    # @param request Dictionary with the parameters, None for a GET request.
+    # @return Tuple (status, response) with the HTTP status and the dictionary of the response.
+    def request(self, path, request=None):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            if request is None:
+                connection.request('GET', path)
+            else:
+                connection.request('POST', path, json.dumps(request), {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode('utf-8'))
+        finally:
+            connection.close()
+
+
+## Data kept resident in the worker process of a dataset, with its exact duration curves once computed.
+_resident = {'data': None, 'curves': None}
+
+
+## Parse the data of a dataset and keep them in its worker process.
+# @param path Path of a CSV, XLS or columnar file.
+# @param units True if the second row of a CSV or XLS file contains the units.
+# @return Dictionary with the number of days and the labels of the data.
+def _loadData(path, units):
+    ext = path[-3:].lower()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if ext == "xls":
+            data = excel_interface.parseFile(path, units)
+        elif ext == "csv":
+            data = csv_interface.parseFile(path, units)
+        elif columnar_interface.isColumnar(path):
+            data = columnar_interface.parseFile(path)
+        else:
+            raise Exception('Unknown input format "%s" of file "%s".' % (ext, path))
+    _resident.update(data=data, curves=None)
+    return {'days': len(data.timeSeries),
+            'labels': [{'name': l.name, 'units': l.units, 'min': l.min, 'max': l.max, 'average': l.average,
+                        'datapoints': l.datapoints} for l in data.labels]}
+
+
+## Select representative days of the resident data and evaluate them.
+# The bins are kept in the default cache of the worker, where the selectors find them.
+# @param parameters Dictionary with the parameters of the selector and optionally its solver, rounding, decomposition
+#                   and seed.
+# @param binned True to measure the errors at the resolution of the bins.
+# @return Tuple (representativeDays, objective, errors) with the errors given by _evaluateDays.
+def _selectDays(parameters, binned):
+    data = _resident['data']
+    parameters = dict(parameters)
+    solver = parameters.pop('solver', None)
+    rounding = parameters.pop('rounding', None)
+    decomposition = parameters.pop('decompose', None)
+    if solver is None:
+        from .samplingdaysselector import SamplingDaysSelector
+        selector = SamplingDaysSelector(**parameters)
+    else:
+        parameters.pop('seed', None)
+        if rounding is not None:
+            from .lproundingdaysselector import LPRoundingDaysSelector
+            selector = LPRoundingDaysSelector(solverName=solver, rounding=rounding, **parameters)
+        elif decomposition is not None:
+            from .decomposeddaysselector import DecomposedMIPDaysSelector
+            selector = DecomposedMIPDaysSelector(solverName=solver, blocks=decomposition, processes=1, **parameters)
+        else:
+            from .mipdaysselector import MIPDaysSelector
+            selector = MIPDaysSelector(solverName=solver, **parameters)
+    representativeDays = selector.selectDays(data)
+    errors = _evaluateDays(parameters['binsPerTimeSeries'], representativeDays, binned)
+    return representativeDays, selector.objective, errors
+
+
+## Evaluate representative days of the resident data.
+# @param binsPerTimeSeries Number of bins per time series.
+# @param representativeDays Dictionary with the representative days and their weights.
+# @param binned True to measure the errors at the resolution of the bins instead of the exact duration curves.
+# @return Dictionary with the names of the labels as keys and their measures given by evaluation.evaluateDays as values.
+def _evaluateDays(binsPerTimeSeries, representativeDays, binned):
+    bins = binscache.createBins(_resident['data'], binsPerTimeSeries)
+    curves = None
+    if not binned:
+        if _resident['curves'] is None:
+            _resident['curves'] = DurationCurves(_resident['data'])
+        curves = _resident['curves']
+    results = evaluation.evaluateDays(bins, representativeDays, curves)
+    return {bins.labels[p].name: results[p] for p in bins.labelRanges()}
+
+
+## Plot a label of the resident data.
+# @param labelName Name of the label.
+# @param representativeDays Dictionary with the representative days and their weights, None to plot only the original.
+# @param pathPrefix Prefix of the output file.
+# @param fileFormat Format of the output file.
+def _plot(labelName, representativeDays, pathPrefix, fileFormat):
+    from .data import plotLabels
+    data = _resident['data']
+    label = [l for l in data.labels if l.name == labelName][0]
+    plotLabels(data, [label], representativeDays, pathPrefix=pathPrefix, fileFormat=fileFormat, processes=1)
+
+
+## Representative days in JSON.
+# @param representativeDays Dictionary with the representative days and their weights.
+# @return Dictionary with the days in ISO format as keys and their weights as values.
+def _formatDays(representativeDays):
+    return {day.isoformat() if hasattr(day, 'isoformat') else str(day): w for day, w in representativeDays.items()}
+
+
+## Representative days from JSON.
+# @param days Dictionary with the days in ISO format as keys and their weights as values.
+# @return Dictionary with the representative days and their weights.
+def _parseDays(days):
+    try:
+        return {datetime.date.fromisoformat(day): float(w) for day, w in days.items()}
+    except (ValueError, AttributeError) as e:
+        raise Exception('Invalid representative days: %s' % e)
+
+
+## Run the service until it is interrupted.
+# @param host Host of the HTTP server.
+# @param port Port of the HTTP server.
+# @param socketPath Path of a Unix socket to listen to instead of a TCP port.
+# @param maxDatasets Maximum number of datasets kept in memory.
+# @param processes Maximum number of workers running at the same time, None to use the number of processors.
+async def serve(host='127.0.0.1', port=8080, socketPath=None, maxDatasets=4, processes=None):
+    service = DaysService(maxDatasets, processes)
+    server = await service.start(host, port, socketPath)
+    print("Serving on %s." % (socketPath if socketPath is not None else "http://%s:%s" % (host, service.port())))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+## Entry point of the service.
+# @param argv Program parameters.
+def main(argv):
+    parameters = {}
+    try:
+        opts, args = getopt.getopt(argv, 'H:p:s:c:j:', ['host=', 'port=', 'socket=', 'cache=', 'jobs='])
+    except getopt.GetoptError as err:
+        displayHelp()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-H', '--host'):
+            parameters['host'] = arg
+        elif opt in ('-p', '--port'):
+            parameters['port'] = int(arg)
+        elif opt in ('-s', '--socket'):
+            parameters['socketPath'] = arg
+        elif opt in ('-c', '--cache'):
+            parameters['maxDatasets'] = int(arg)
+        elif opt in ('-j', '--jobs'):
+            parameters['processes'] = int(arg)
+
+    try:
+        asyncio.run(serve(**parameters))
+    except KeyboardInterrupt:
+        pass
+
+
+## Display help of the service.
+def displayHelp():
+    text = ''
+    text += 'Usage :\n\tpython -m daysxtractor.service [options]\n'
+    text += 'Serve the selection of representative days over HTTP, keeping the data and their bins in memory.\n'
+
+    text += 'Options:\n'
+    text += '   -H 127.0.0.1 --host 127.0.0.1 Host of the server.\n'
+    text += '   -p 8080     --port 8080       Port of the server.\n'
+    text += '   -s path     --socket path     Listen to a Unix socket instead of a TCP port.\n'
+    text += '   -c 4        --cache 4         Number of datasets kept in memory.\n'
+    text += '   -j 4        --jobs 4          Number of workers running at the same time, by default the number of\n'
+    text += '                                 processors.\n'
+
+    print(text)
+
+
+# Starting point from python #
+if __name__ == "__main__":
+    main(sys.argv[1:])
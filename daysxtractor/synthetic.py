@@ -0,0 +1,41 @@
+##@package synthetic
+# @author Sebastien MATHIEU
+
+import datetime
+import numpy as np
+
+from .data import Data, TimeSeriesLabel
+
+
+## Generate seeded synthetic time series with daily and seasonal patterns.
+# Each label combines a seasonal cycle, a daily cycle with a random phase and amplitude, and noise.
+# @param years Number of years of data.
+# @param periodsPerDay Number of periods in each day.
+# @param labels Number of labels.
+# @param seed Seed of the generator.
+# @param start First day of the data.
+# @return Data with the time series.
+def generateData(years=1, periodsPerDay=24, labels=3, seed=42, start=datetime.date(2018, 1, 1)):
+    random = np.random.default_rng(seed)
+    D = int(round(365 * years))
+
+    data = Data()
+    for p in range(labels):
+        label = TimeSeriesLabel("Series %s" % (p + 1))
+        label.units = "MW"
+        data.labels.append(label)
+
+    # Generate each label for all the periods at once
+    t = np.arange(D * periodsPerDay) / periodsPerDay  # Time in days
+    series = []
+    for p in range(labels):
+        level = random.uniform(10, 1000)
+        seasonal = random.uniform(0.1, 0.5) * np.cos(2 * np.pi * (t / 365.0 + random.uniform()))
+        daily = random.uniform(0.1, 0.5) * np.sin(2 * np.pi * (t + random.uniform()))
+        noise = random.normal(0.0, random.uniform(0.02, 0.2), len(t))
+        series.append((level * (1.0 + seasonal + daily + noise)).reshape(D, periodsPerDay))
+
+    for d in range(D):
+        data.timeSeries[start + datetime.timedelta(days=d)] = {p: series[p][d].tolist() for p in range(labels)}
+    data.computeLabelStatistics()
+    return data
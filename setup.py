@@ -6,5 +6,6 @@ setup(name='daysxtractor',
       url='https://github.com/sebMathieu/daysxtractor',
       author='Sebastien Mathieu',
       packages=find_packages(),
-      install_requires=['pyomo', 'xlrd', 'xlwt', 'python-dateutil'],
+      install_requires=['numpy', 'pyomo', 'xlrd', 'xlwt', 'python-dateutil'],
+      extras_require={'columnar': ['pyarrow']},
       zip_safe=False)
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor.__main__ import main
+from daysxtractor.autodaysselector import AutoDaysSelector, ENGINES
+from daysxtractor.csv_interface import writeData
+from daysxtractor.synthetic import generateData
+
+
+## Test the automatic choice of the engine.
+class TestAuto(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.3, periodsPerDay=4, labels=2, seed=23)
+
+    ## Test that the sampling engine with the most expected samples is chosen without solver.
+    def testWithoutSolver(self):
+        selector = AutoDaysSelector(numberRepresentativeDays=4, timelimit=0.5, binsPerTimeSeries=10,
+                                    solverNames=['missing'], processes=1)
+        days = selector.selectDays(self.data)
+        self.assertEqual(len(days), 4)
+        self.assertIsNotNone(selector.objective)
+
+        plan = selector.plan
+        self.assertIsNone(plan['solver'])
+        self.assertEqual(plan['days'], len(self.data.days()))
+        self.assertEqual(plan['bins'], 20)
+        self.assertIn(plan['engine'], ('sampling', 'embedding'))
+        estimates = plan['estimates']
+        self.assertNotIn('mip', estimates)
+        self.assertEqual(estimates[plan['engine']]['samples'],
+                         max(estimate['samples'] for estimate in estimates.values()))
+
+    ## Test that a forced engine is used without calibration.
+    def testForced(self):
+        selector = AutoDaysSelector(numberRepresentativeDays=4, timelimit=0.2, binsPerTimeSeries=10,
+                                    engine='sampling')
+        self.assertEqual(len(selector.selectDays(self.data)), 4)
+        self.assertEqual(selector.plan['reason'], 'forced')
+        self.assertEqual(selector.plan['estimates'], {})
+
+        self.assertRaises(Exception, AutoDaysSelector, engine='annealing')
+        self.assertRaises(Exception, AutoDaysSelector(engine='mip', solverNames=['missing']).selectDays, self.data)
+        self.assertEqual(ENGINES[-1], 'sampling')
+
+
+    ## Test that --engine requires -s auto, that -s auto refuses -r and -d and that -s auto:solvers gives the solvers of
+    # the automatic mode.
+    def testOptions(self):
+        self.assertRaises(Exception, main, ['--engine', 'rounding', 'data.csv'])
+        self.assertRaises(Exception, main, ['--engine', 'rounding', '-s', 'cbc', 'data.csv'])
+        self.assertRaises(Exception, main, ['-s', 'auto:', 'data.csv'])
+        with self.assertRaisesRegex(Exception, '--engine'):
+            main(['-s', 'auto', '-r', 'top', 'data.csv'])
+        with self.assertRaisesRegex(Exception, '--engine'):
+            main(['-s', 'auto:cbc', '-d', 'season', 'data.csv'])
+
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'data.csv')
+            writeData(self.data, path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaisesRegex(Exception, 'missing, unknown'):
+                    main(['-s', 'auto:missing,unknown', '--engine', 'mip', '-o', folder, path])
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
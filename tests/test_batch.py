@@ -0,0 +1,76 @@
+import contextlib
+import csv
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import batch, datastore, parseFile
+from daysxtractor.__main__ import main
+from daysxtractor.csv_interface import writeData
+from daysxtractor.synthetic import generateData
+
+
+## Test the batch of datasets.
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.paths = []
+        for seed in (1, 2):
+            path = os.path.join(self.folder, 'region%s.csv' % seed)
+            writeData(generateData(years=0.2, periodsPerDay=4, labels=2, seed=seed), path)
+            self.paths.append(path)
+        self.paths.append(os.path.join(self.folder, 'missing.csv'))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test the manifest with comments and relative paths.
+    def testManifest(self):
+        path = os.path.join(self.folder, 'manifest.txt')
+        with open(path, 'w') as file:
+            file.write('# Regions\n\nregion1.csv\n%s\n' % self.paths[1])
+        self.assertEqual(batch.parseManifest(path), self.paths[:2])
+
+    ## Test that each dataset gets its own folder and that a failure does not stop the batch.
+    def testBatch(self):
+        outputFolder = os.path.join(self.folder, 'output')
+        runs = batch.runBatch(self.paths + [self.paths[0]], ['-n', '3', '-t', '0.2'], outputFolder, processes=2)
+        self.assertEqual([run[0] for run in runs], self.paths + [self.paths[0]])
+        self.assertEqual(len(set(run[1] for run in runs)), 4)
+        for path, folder, seconds, results, error in runs[:2] + runs[3:]:
+            self.assertIsNone(error)
+            self.assertEqual(sorted(results), ['Series 1', 'Series 2'])
+            self.assertTrue(os.path.isfile(os.path.join(folder, 'days.csv')))
+            self.assertTrue(os.path.isfile(os.path.join(folder, 'metrics.json')))
+        self.assertIsNotNone(runs[2][4])
+
+        with open(os.path.join(outputFolder, 'summary.csv'), newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(len(rows), 1 + 3 * 2 + 1)
+
+    ## Test that each dataset writes its own store and that the distributed sampling is refused.
+    def testDatasetFiles(self):
+        self.assertEqual(batch.datasetNames(['a/region.csv', 'b/region.csv', 'other.xls']),
+                         ['region', 'region-2', 'other'])
+        self.assertEqual(batch.datasetOptions(['-n', '3', '--store', 'x/store.pickle', '--checkpoint', 'sel.ckpt'],
+                                              'region-2'),
+                         ['-n', '3', '--store', 'x/store-region-2.pickle', '--checkpoint', 'sel-region-2.ckpt'])
+
+        store = os.path.join(self.folder, 'store.pickle')
+        outputFolder = os.path.join(self.folder, 'output')
+        runs = batch.runBatch(self.paths[:2], ['-n', '3', '-t', '0.1', '--store', store], outputFolder, processes=2)
+        self.assertEqual([run[4] for run in runs], [None, None])
+        self.assertFalse(os.path.exists(store))
+        for seed, path in zip((1, 2), self.paths):
+            data, bins = datastore.load(os.path.join(self.folder, 'store-region%s.pickle' % seed))
+            self.assertEqual(data.fingerprint(), parseFile(path).fingerprint())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertRaises(Exception, main, ['--coordinator', 'localhost:50000'] + self.paths[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
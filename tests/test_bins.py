@@ -1,7 +1,10 @@
 import unittest
 
+import numpy as np
+
 from daysxtractor import parseFile
 from daysxtractor import Bins
+from daysxtractor.synthetic import generateData
 
 
 ## Test the bins.
@@ -16,4 +19,47 @@ class TestBins(unittest.TestCase):
         maxPopulations = {'Wind power': 35.72, 'Load': 9.07, 'Energy prices': 23.52}  # Maximum populations in %
         for p in self.bins.labelRanges():
             populationMin, populationMax = self.bins.population(p)
-            self.assertAlmostEqual(populationMax*100, maxPopulations[self.bins.labels[p].name], 2)
\ No newline at end of file
+            self.assertAlmostEqual(populationMax*100, maxPopulations[self.bins.labels[p].name], 2)
+
+## Test the indexing of the days and the vectorized occupancy of the bins.
+class TestBinsArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.1, periodsPerDay=6, labels=2, seed=7)
+        self.bins = Bins(self.data, 8)
+
+    ## Test that the occupancy of the bins is the one of a scan of the values.
+    def testOccupancy(self):
+        days = list(self.data.days())
+        self.assertEqual(self.bins.days, dict(enumerate(days)))
+        self.assertEqual(self.bins.dayIndex, {day: d for d, day in enumerate(days)})
+        for p in self.bins.labelRanges():
+            binStart = self.bins.binStart[p]
+            A = np.zeros((8, len(days)), dtype=int)
+            for d, day in enumerate(days):
+                for v in self.data.timeSeries[day][p]:
+                    b = 1
+                    while b < len(binStart) - 1 and binStart[b] <= v:
+                        b += 1
+                    A[b - 1, d] += 1
+            self.assertEqual(self.bins.A[p].shape, (8, len(days)))
+            self.assertTrue(np.array_equal(self.bins.A[p], A))
+            self.assertEqual(self.bins.binSize[p], A.sum(axis=1).tolist())
+            self.assertEqual(self.bins.cumulatedBinSize[p][-1], self.data.labels[p].datapoints)
+
+    ## Test the bins of representative days.
+    def testRepresentativeDays(self):
+        days = list(self.data.days())
+        representativeDays = {days[5]: 10.0, days[2]: 20.0, days[30]: 6.5}
+        representativeBins = Bins()
+        representativeBins.createFromRepresentativeDays(self.bins, representativeDays)
+        self.assertEqual(list(representativeBins.days.values()), [days[5], days[2], days[30]])
+        self.assertEqual(representativeBins.dayIndex[days[30]], 2)
+        for p in self.bins.labelRanges():
+            A = self.bins.A[p]
+            self.assertTrue(np.array_equal(representativeBins.A[p], A[:, [5, 2, 30]]))
+            expected = 10.0 * A[:, 5] + 20.0 * A[:, 2] + 6.5 * A[:, 30]
+            self.assertTrue(np.allclose(representativeBins.binSize[p], expected))
+
+        representativeBins = Bins()
+        self.assertRaises(Exception, representativeBins.createFromRepresentativeDays, self.bins, {'missing': 1.0})
@@ -0,0 +1,93 @@
+import copy
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import MinPopBins
+from daysxtractor.binscache import BinsCache, FORMAT_VERSION
+from daysxtractor.synthetic import generateData
+
+
+## Test the cache of the bins.
+class TestBinsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=13)
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test that the fingerprint changes with any value of the time series.
+    def testFingerprint(self):
+        fingerprint = self.data.fingerprint()
+        self.assertEqual(fingerprint, copy.deepcopy(self.data).fingerprint())
+        self.assertEqual(fingerprint, pickle.loads(pickle.dumps(self.data)).fingerprint())
+
+        # Swap the values of two inner days, which keeps the statistics of the labels
+        swapped = copy.deepcopy(self.data)
+        days = list(swapped.days())
+        swapped.timeSeries[days[3]], swapped.timeSeries[days[4]] = swapped.timeSeries[days[4]], swapped.timeSeries[days[3]]
+        self.assertNotEqual(swapped.fingerprint(), fingerprint)
+
+        # Modify a value in place
+        self.data.timeSeries[days[5]][1][2] += 1.0
+        self.assertEqual(self.data.fingerprint(), fingerprint)
+        self.data.computeLabelStatistics()
+        self.assertNotEqual(self.data.fingerprint(), fingerprint)
+
+    ## Test the hits and misses in memory.
+    def testMemory(self):
+        cache = BinsCache(maxSize=2)
+        bins = cache.get(self.data, 5)
+        self.assertIs(cache.get(self.data, 5), bins)
+        self.assertIs(cache.get(copy.deepcopy(self.data), 5), bins)
+        self.assertIsNot(cache.get(self.data, 6), bins)
+
+        # A modified copy misses the cache
+        modified = copy.deepcopy(self.data)
+        modified.timeSeries[list(modified.days())[3]][0][0] += 1.0
+        self.assertIsNone(cache.lookup(modified, 5))
+        self.assertIsNot(cache.get(modified, 5), bins)
+
+        # The least recently used bins are evicted
+        self.assertIsNone(cache.lookup(self.data, 5))
+        self.assertIsNotNone(cache.lookup(self.data, 6))
+        self.assertIsNot(cache.get(self.data, 5), bins)
+
+    ## Test the hits and misses in the folder.
+    def testDisk(self):
+        bins = BinsCache(folder=self.folder).get(self.data, 5)
+        paths = os.listdir(self.folder)
+        self.assertEqual(len(paths), 1)
+
+        cached = BinsCache(folder=self.folder).lookup(self.data, 5)
+        self.assertIsInstance(cached, MinPopBins)
+        self.assertEqual(cached.days, bins.days)
+        self.assertIsNone(BinsCache(folder=self.folder).lookup(self.data, 5, minPop=2))
+
+        modified = copy.deepcopy(self.data)
+        modified.timeSeries[list(modified.days())[3]][0][0] += 1.0
+        self.assertIsNone(BinsCache(folder=self.folder).lookup(modified, 5))
+
+        # Files of another version or holding bare bins are ignored, then overwritten
+        path = os.path.join(self.folder, paths[0])
+        for content in ({'version': FORMAT_VERSION + 1, 'key': paths[0][:-7], 'bins': bins}, bins):
+            with open(path, 'wb') as file:
+                pickle.dump(content, file)
+            self.assertIsNone(BinsCache(folder=self.folder).lookup(self.data, 5))
+        BinsCache(folder=self.folder).get(self.data, 5)
+        self.assertIsNotNone(BinsCache(folder=self.folder).lookup(self.data, 5))
+
+        # Bins put without persistence are only kept in memory
+        cache = BinsCache(folder=self.folder)
+        cache.put(modified, bins, persist=False)
+        self.assertIs(cache.lookup(modified, 5), bins)
+        self.assertEqual(len(os.listdir(self.folder)), 1)
+        self.assertIsNone(BinsCache(folder=self.folder).lookup(modified, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
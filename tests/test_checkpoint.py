@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.checkpoint import Checkpoint
+from daysxtractor.synthetic import generateData
+
+
+## Test the checkpoints of the selections.
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.3, periodsPerDay=4, labels=2, seed=19)
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'selection.ckpt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test that a resumed sampling continues with the state and the remaining time of the checkpoint.
+    def testResume(self):
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.2)
+        selector.checkpoint = Checkpoint(self.path, interval=0.05)
+        selector.selectDays(self.data)
+        self.assertTrue(os.path.isfile(self.path))
+        state = Checkpoint(self.path, resume=True).load(self.data, selector)
+        self.assertGreaterEqual(state['elapsed'], 0.2)
+        self.assertEqual(state['objective'], selector.objective)
+
+        # Resume with a longer time limit
+        resumed = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.4)
+        resumed.checkpoint = Checkpoint(self.path, resume=True)
+        days = resumed.selectDays(self.data)
+        self.assertEqual(len(days), 4)
+        self.assertLessEqual(resumed.objective, selector.objective)
+        self.assertGreater(Checkpoint(self.path, resume=True).load(self.data, resumed)['samples'], state['samples'])
+
+        # The budget is already spent
+        finished = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.1)
+        finished.checkpoint = Checkpoint(self.path, resume=True)
+        finished.selectDays(self.data)
+        self.assertEqual(finished.objective, resumed.objective)
+
+    ## Test that a checkpoint is refused for other data or another configuration.
+    def testKey(self):
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.05)
+        selector.checkpoint = Checkpoint(self.path)
+        selector.selectDays(self.data)
+
+        other = SamplingDaysSelector(numberRepresentativeDays=5, timelimit=0.05)
+        other.checkpoint = Checkpoint(self.path, resume=True)
+        self.assertRaises(Exception, other.selectDays, self.data)
+
+        selector.checkpoint = Checkpoint(self.path, resume=True)
+        self.assertRaises(Exception, selector.selectDays, generateData(years=0.3, periodsPerDay=4, labels=2, seed=20))
+
+
+if __name__ == '__main__':
+    unittest.main()
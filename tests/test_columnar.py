@@ -0,0 +1,118 @@
+import contextlib
+import csv
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from daysxtractor import columnar_interface, csv_interface
+from daysxtractor.synthetic import generateData
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+## Test the columnar files.
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.1, periodsPerDay=24, labels=2, seed=9)
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Write the data, parse it again and compare it with the original.
+    # @param extension Extension of the file.
+    def roundTrip(self, extension):
+        path = os.path.join(self.folder, 'data' + extension)
+        columnar_interface.writeData(self.data, path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = columnar_interface.parseFile(path)
+        self.assertEqual(list(data.days()), list(self.data.days()))
+        for day, dayData in data.timeSeries.items():
+            self.assertEqual(dayData.keys(), self.data.timeSeries[day].keys())
+            for p, values in dayData.items():
+                self.assertIsInstance(values, np.ndarray) # Slice of the column, not a list
+                np.testing.assert_array_equal(values, self.data.timeSeries[day][p])
+        for p in data.labelRanges():
+            self.assertEqual(data.labels[p].name, self.data.labels[p].name)
+            self.assertEqual(data.labels[p].units, 'MW')
+            self.assertEqual(data.labels[p].datapoints, self.data.labels[p].datapoints)
+            self.assertAlmostEqual(data.labels[p].average, self.data.labels[p].average)
+
+    ## Test the NumPy archives.
+    def testNumpy(self):
+        self.roundTrip('.npz')
+
+    ## Test a NumPy archive with the times as strings and without units.
+    def testNumpyStrings(self):
+        path = os.path.join(self.folder, 'data.npz')
+        np.savez(path, time=np.array(['2018-01-01T00:00', '2018-01-01T12:00', '2018-01-02T00:00']),
+                 values=np.array([1.0, 2.0, 3.0]), labels=np.array(['Load']))
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = columnar_interface.parseFile(path)
+        self.assertEqual([len(dayData[0]) for dayData in data.timeSeries.values()], [2, 1])
+        self.assertEqual(data.labels[0].units, '')
+        self.assertEqual((data.labels[0].min, data.labels[0].average, data.labels[0].max), (1.0, 2.0, 3.0))
+
+    ## Test that missing values are rejected as by the text parsers.
+    def testMissingValues(self):
+        path = os.path.join(self.folder, 'missing.npz')
+        np.savez(path, time=np.array(['2018-01-01T00:00', '2018-01-01T12:00']), values=np.array([1.0, np.nan]),
+                 labels=np.array(['Load']))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertRaises(Exception, columnar_interface.parseFile, path)
+
+    ## Test the export of the time series of representative days.
+    def testRepresentativeSeries(self):
+        days = list(self.data.days())
+        representativeDays = {days[5]: 20.0, days[1]: 16.5}
+        path = os.path.join(self.folder, 'representative.npz')
+        columnar_interface.writeRepresentativeSeries(self.data, representativeDays, path)
+        with np.load(path) as archive:
+            self.assertEqual(archive['values'].shape, (48, 2))
+            np.testing.assert_array_equal(archive['weights'], [16.5] * 24 + [20.0] * 24)
+            np.testing.assert_array_equal(archive['values'][24:, 1], self.data.timeSeries[days[5]][1])
+            self.assertEqual(str(archive['time'][24]), str(days[5]) + 'T00:00:00')
+
+        path = os.path.join(self.folder, 'representative.csv')
+        csv_interface.writeRepresentativeSeries(self.data, representativeDays, path, with_units=True)
+        with open(path, newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ['DateTime', 'Series 1', 'Series 2', 'Weight'])
+        self.assertEqual(len(rows), 2 + 48)
+        self.assertEqual(float(rows[2][1]), self.data.timeSeries[days[1]][0][0])
+        self.assertEqual(float(rows[-1][3]), 20.0)
+
+    ## Test the Parquet files.
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def testParquet(self):
+        self.roundTrip('.parquet')
+
+    ## Test the Arrow IPC files.
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def testArrow(self):
+        self.roundTrip('.arrow')
+
+
+    ## Test that the null values of an Arrow file are rejected.
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def testArrowNulls(self):
+        path = os.path.join(self.folder, 'nulls.arrow')
+        table = pyarrow.table({'DateTime': pyarrow.array(np.array(['2018-01-01T00', '2018-01-01T12'],
+                                                                  dtype='datetime64[s]')),
+                               'Load': pyarrow.array([1.0, None], type=pyarrow.float64())})
+        with pyarrow.OSFile(path, 'wb') as file, pyarrow.ipc.new_file(file, table.schema) as writer:
+            writer.write_table(table)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertRaises(Exception, columnar_interface.parseFile, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from daysxtractor import MinPopBins
+from daysxtractor import datastore
+from daysxtractor.synthetic import generateData
+
+
+## Test the incremental append of days to the data, the bins and the store.
+class TestDataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=3)
+        self.days = list(self.data.days())
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test that appending days gives the statistics of the full data.
+    def testDataStatistics(self):
+        data = self.data.subset(self.days[:40])
+        data.appendDays(self.data.subset(self.days[40:]))
+        self.assertEqual(list(data.days()), self.days)
+        for p in data.labelRanges():
+            self.assertEqual(data.labels[p].min, self.data.labels[p].min)
+            self.assertEqual(data.labels[p].max, self.data.labels[p].max)
+            self.assertEqual(data.labels[p].datapoints, self.data.labels[p].datapoints)
+            self.assertAlmostEqual(data.labels[p].average, self.data.labels[p].average)
+        self.assertRaises(Exception, data.appendDays, self.data.subset(self.days[:1]))
+
+    ## Test that only days following the last day are appended, in chronological order.
+    def testChronologicalOrder(self):
+        data = self.data.subset(self.days[:10] + self.days[20:30])
+        self.assertRaises(Exception, data.appendDays, self.data.subset(self.days[10:20]))
+        self.assertRaises(Exception, data.appendDays, self.data.subset([self.days[31], self.days[30]]))
+        self.assertEqual(list(data.days()), self.days[:10] + self.days[20:30])
+
+        path = os.path.join(self.folder, 'store.pickle')
+        datastore.append(path, data, lambda d: MinPopBins(d))
+        self.assertRaises(Exception, datastore.append, path, self.data, lambda d: MinPopBins(d))
+        datastore.append(path, self.data.subset(self.days[25:]), lambda d: MinPopBins(d))
+        self.assertEqual(list(datastore.load(path)[0].days()), self.days[:10] + self.days[20:])
+
+    ## Test that bins extended with days in their range match bins created from all the days.
+    def testBinsExtended(self):
+        data = self.data.subset(self.days[:40])
+        bins = MinPopBins(data, 10)
+        newDays = [day for day in self.days[40:] if all(
+            bins.binStart[p][0] <= v <= bins.binStart[p][-1] for p in data.labelRanges()
+            for v in self.data.timeSeries[day][p])]
+        self.assertGreater(len(newDays), 0)
+
+        data.appendDays(self.data.subset(newDays))
+        self.assertFalse(bins.appendDays(data, newDays))
+        reference = MinPopBins()
+        reference.binStart = bins.binStart
+        reference._createBinsFromStartValues(data)
+        for p in bins.labelRanges():
+            np.testing.assert_array_equal(bins.A[p], reference.A[p])
+            self.assertEqual(bins.binSize[p], reference.binSize[p])
+        self.assertEqual(list(bins.dayIndex), list(data.days()))
+
+    ## Test that the bins are created again when new values are out of their range.
+    def testBinsRebuilt(self):
+        data = self.data.subset(self.days[:10])
+        bins = MinPopBins(data, 10)
+        data.appendDays(self.data.subset(self.days[10:]))
+        self.assertTrue(bins.appendDays(data, self.days[10:]))
+        expected = MinPopBins(data, 10)
+        self.assertEqual(bins.binStart, expected.binStart)
+        self.assertEqual(bins.binSize, expected.binSize)
+
+    ## Test that the store keeps the days of the successive inputs.
+    def testStore(self):
+        path = os.path.join(self.folder, 'store.pickle')
+        data, bins, days, rebuilt = datastore.append(path, self.data.subset(self.days[:40]), lambda d: MinPopBins(d))
+        self.assertEqual(len(days), 40)
+
+        data, bins, days, rebuilt = datastore.append(path, self.data, lambda d: MinPopBins(d))
+        self.assertEqual(days, self.days[40:])
+        data, bins = datastore.load(path)
+        self.assertEqual(list(data.days()), self.days)
+        self.assertEqual(len(bins.days), len(self.days))
+        self.assertEqual(sum(bins.binSize[0]), self.data.labels[0].datapoints)
+
+
+if __name__ == '__main__':
+    unittest.main()
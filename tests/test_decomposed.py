@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pyomo.environ import value
+
+from daysxtractor import MinPopBins
+from daysxtractor.checkpoint import Checkpoint
+from daysxtractor.synthetic import generateData
+from daysxtractor.decomposeddaysselector import DecomposedMIPDaysSelector, MIN_TIME_LIMIT
+from daysxtractor.mipdaysselector import MIPDaysSelector
+from daysxtractor.mipdaysselector import solverAvailable
+
+SOLVER = 'appsi_highs' if solverAvailable('appsi_highs') else 'glpk' if solverAvailable('glpk') else None
+
+
+## Test the decomposition of the MIP in blocks of days.
+class TestDecomposed(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.5, periodsPerDay=4, labels=2, seed=5)
+        self.bins = MinPopBins(self.data, 5)
+
+    ## Test the seasonal, monthly, custom and consecutive blocks.
+    def testDecompose(self):
+        D = len(self.bins.days)
+        for blocks, expected in (('season', ['winter', 'spring', 'summer']), ('month', [1, 2, 3, 4, 5, 6, 7]),
+                                 (lambda day: day.day <= 15, [True, False])):
+            decomposition = DecomposedMIPDaysSelector(solverName='glpk', blocks=blocks)._decompose(self.bins)
+            self.assertEqual(sorted(decomposition.keys(), key=expected.index), expected)
+            self.assertEqual(sorted(d for days in decomposition.values() for d in days), list(range(D)))
+
+        self.bins.days = {d: 'day %s' % d for d in self.bins.days}
+        decomposition = DecomposedMIPDaysSelector(solverName='glpk')._decompose(self.bins)
+        self.assertEqual(list(decomposition.keys()), [0, 1, 2, 3])
+        self.assertEqual(decomposition[0], list(range(len(decomposition[0]))))
+        self.assertRaises(Exception, DecomposedMIPDaysSelector, blocks='week')
+
+    ## Test that the representative days are allocated to every block, in proportion to their error.
+    def testAllocate(self):
+        selector = DecomposedMIPDaysSelector(numberRepresentativeDays=12, solverName='glpk', blocks='month')
+        blocks = selector._decompose(self.bins)
+        allocation = selector._allocate(blocks, self.bins)
+        self.assertEqual(sum(allocation.values()), 12)
+        for k, days in blocks.items():
+            self.assertGreaterEqual(allocation[k], 1)
+            self.assertLessEqual(allocation[k], len(days))
+
+        # A block of identical days has no error and only gets its guaranteed day
+        for p in self.bins.labelRanges():
+            self.bins.A[p][:, blocks[1]] = self.bins.A[p][:, [blocks[1][0]]]
+        allocation = selector._allocate(blocks, self.bins)
+        self.assertEqual(allocation[1], 1)
+        self.assertEqual(sum(allocation.values()), 12)
+
+        # Fewer representative days than blocks
+        selector.numberRepresentativeDays = 3
+        allocation = selector._allocate(blocks, self.bins)
+        self.assertEqual(sorted(allocation.values()), [0, 0, 0, 0, 1, 1, 1])
+        self.assertEqual(allocation[1], 0)
+
+    ## Test that a single representative day may carry the weight of all the days, even for less than 50 days.
+    def testSingleDay(self):
+        bins = MinPopBins(self.data.subset(sorted(self.data.days())[0:30]), 5)
+        model = MIPDaysSelector(numberRepresentativeDays=1, solverName='glpk')._buildModel(bins)
+        D = len(bins.days)
+        model.u[0].fix(1)
+        model.w[0].fix(D)
+        self.assertGreaterEqual(value(model.weightActivation[0].upper) - value(model.weightActivation[0].body), 0)
+
+    ## Test that the merged selection is fitted on all the days.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testSelect(self):
+        data = self.data.subset(sorted(self.data.days())[0:90])
+        selector = DecomposedMIPDaysSelector(numberRepresentativeDays=6, timelimit=10, binsPerTimeSeries=5,
+                                             solverName=SOLVER, blocks='month', processes=1)
+        representativeDays = selector.selectDays(data)
+        self.assertEqual(len(representativeDays), 6)
+        self.assertAlmostEqual(sum(representativeDays.values()), 90, 4)
+        self.assertEqual({day.month for day in representativeDays}, {1, 2, 3})
+        self.assertIsNotNone(selector.objective)
+
+        single = MIPDaysSelector(numberRepresentativeDays=1, timelimit=10, binsPerTimeSeries=5, solverName=SOLVER)
+        data = self.data.subset(sorted(self.data.days())[0:30])
+        self.assertAlmostEqual(list(single.selectDays(data).values())[0], 30, 4)
+
+    ## Test that a resumed selection keeps the solved blocks and only has the remaining time.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testResume(self):
+        data = self.data.subset(sorted(self.data.days())[0:90])
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'decomposed.ckpt')
+            selector = DecomposedMIPDaysSelector(numberRepresentativeDays=6, timelimit=10, binsPerTimeSeries=5,
+                                                 solverName=SOLVER, blocks='month', processes=1)
+            selector.checkpoint = Checkpoint(path, interval=0)
+            representativeDays = selector.selectDays(data)
+            state = Checkpoint(path, resume=True).load(data, selector)
+            self.assertEqual(sorted(state['blocks'].keys()), [1, 2, 3])
+
+            # The budget is spent: no block is solved again and the fit only has the minimum time limit
+            state['elapsed'] = 20
+            Checkpoint(path).save(data, selector, state)
+            resumed = DecomposedMIPDaysSelector(numberRepresentativeDays=6, timelimit=10, binsPerTimeSeries=5,
+                                                solverName=SOLVER, blocks='month', processes=1)
+            resumed.checkpoint = Checkpoint(path, resume=True)
+            timeLimits = []
+            fitWeights = resumed._fitWeights
+            resumed._fitWeights = lambda model, days, timeLimit=None: timeLimits.append(timeLimit) or \
+                fitWeights(model, days, timeLimit)
+            with mock.patch('daysxtractor.decomposeddaysselector._selectBlockDays', side_effect=AssertionError):
+                self.assertEqual(resumed.selectDays(data).keys(), representativeDays.keys())
+            self.assertEqual(timeLimits, [MIN_TIME_LIMIT])
+        finally:
+            shutil.rmtree(folder)
+
+    ## Test that the blocks and the fit keep within the time limit of the selection.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testTimeLimit(self):
+        data = generateData(years=0.5, periodsPerDay=24, labels=2, seed=1)
+        selector = DecomposedMIPDaysSelector(numberRepresentativeDays=12, timelimit=6, binsPerTimeSeries=40,
+                                             solverName=SOLVER, blocks='month', processes=2)
+        tic = time.time()
+        representativeDays = selector.selectDays(data)
+        self.assertLess(time.time() - tic, 6 + 4)
+        self.assertEqual(len(representativeDays), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.binscache import createBins
+from daysxtractor.distributeddaysselector import DistributedSamplingDaysSelector, runWorker
+from daysxtractor.synthetic import generateData
+
+
+## Test the sampling distributed on workers of the local host.
+class TestDistributed(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.3, periodsPerDay=4, labels=2, seed=17)
+
+    ## Test that a selection bounded by a number of samples does not depend on the workers.
+    def testReproducible(self):
+        selections = []
+        for workers in (1, 3):
+            with DistributedSamplingDaysSelector(numberRepresentativeDays=4, binsPerTimeSeries=10,
+                                                 address=('127.0.0.1', 0), localWorkers=workers, samples=600,
+                                                 samplesPerTask=50) as selector:
+                selections.append((selector.selectDays(self.data), selector.objective))
+        self.assertEqual(selections[0], selections[1])
+
+        days, objective = selections[0]
+        self.assertEqual(len(days), 4)
+        self.assertEqual(sum(days.values()), len(self.data.days()))
+
+        # The objective is exact
+        bins = createBins(self.data, 10)
+        sampling = SamplingDaysSelector(numberRepresentativeDays=4, binsPerTimeSeries=10)
+        profiles, cumulatedBinSize = sampling._profiles(bins)
+        self.assertAlmostEqual(sampling._evaluateDays([bins.dayIndex[d] for d in days], profiles, cumulatedBinSize)[0],
+                               objective)
+
+    ## Test a selection with a time limit and a worker connecting to the coordinator.
+    def testWorker(self):
+        with DistributedSamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.5, binsPerTimeSeries=10,
+                                             address=('127.0.0.1', 0), embedding='pca',
+                                             dimension=4) as selector:
+            worker = multiprocessing.Process(target=runWorker, args=(selector.address, selector.authkey))
+            worker.start()
+            days = selector.selectDays(self.data)
+            self.assertEqual(len(days), 4)
+            self.assertIsNotNone(selector.objective)
+        worker.join(10)
+        self.assertFalse(worker.is_alive())
+
+
+    ## Test that a selection without any worker fails after the time limit and the grace period instead of waiting.
+    def testNoWorker(self):
+        for samples in (None, 100):
+            with DistributedSamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.2, binsPerTimeSeries=10,
+                                                 address=('127.0.0.1', 0), samples=samples) as selector:
+                selector.grace = 0.2
+                with self.assertRaisesRegex(Exception, 'No worker returned a result'):
+                    selector.selectDays(self.data)
+
+    ## Test that a coordinator accepting other hosts requires a shared authentication key.
+    def testAuthkey(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DAYSXTRACTOR_AUTHKEY', None)
+            self.assertRaises(Exception, DistributedSamplingDaysSelector, address=('0.0.0.0', 0))
+            self.assertRaises(Exception, runWorker, ('127.0.0.1', 0))
+            keys = [DistributedSamplingDaysSelector(address=('127.0.0.1', 0)).authkey for _ in range(2)]
+            self.assertNotEqual(keys[0], keys[1])
+
+            os.environ['DAYSXTRACTOR_AUTHKEY'] = 'secret'
+            self.assertEqual(DistributedSamplingDaysSelector(address=('0.0.0.0', 0)).authkey, b'secret')
+
+
+if __name__ == '__main__':
+    unittest.main()
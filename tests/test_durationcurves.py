@@ -0,0 +1,36 @@
+import unittest
+
+from daysxtractor.data import Data, TimeSeriesLabel
+from daysxtractor.durationcurves import DurationCurves
+
+
+## Test the exact duration curves.
+class TestDurationCurves(unittest.TestCase):
+
+    def setUp(self):
+        self.data = Data()
+        self.data.labels.append(TimeSeriesLabel('Load'))
+        self.data.timeSeries = {1: {0: [1.0, 2.0, 3.0]}, 2: {0: [1.0, 2.0, 3.0]}, 3: {0: [4.0, 5.0, 6.0]}}
+        self.data.computeLabelStatistics()
+        self.curves = DurationCurves(self.data)
+
+    ## Test the duration curve of the time series.
+    def testCurve(self):
+        self.assertEqual(self.curves.curve(0).tolist(), [6.0, 5.0, 4.0, 3.0, 3.0, 2.0, 2.0, 1.0, 1.0])
+
+    ## Test that representative days equivalent to the time series have no error.
+    def testExactRepresentation(self):
+        for days in [{1: 1, 2: 1, 3: 1}, {1: 2, 3: 1}]:
+            self.assertAlmostEqual(self.curves.nrmsError(0, days), 0.0)
+            self.assertAlmostEqual(self.curves.relativeAreaError(0, days), 0.0)
+
+    ## Test the errors of an approximation.
+    def testErrors(self):
+        days = {1: 3}
+        self.assertEqual(self.curves.representativeCurve(0, days).tolist(), [3.0, 3.0, 3.0, 2.0, 2.0, 2.0, 1.0, 1.0, 1.0])
+        self.assertAlmostEqual(self.curves.relativeAreaError(0, days), 9.0 / 27.0)
+        self.assertAlmostEqual(self.curves.nrmsError(0, days), (17.0 / 9.0) ** 0.5 / 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+import numpy as np
+
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.binscache import createBins
+from daysxtractor.synthetic import generateData
+
+
+## Test the sampling in an embedding of the day profiles.
+class TestEmbedding(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.5, periodsPerDay=24, labels=3, seed=5)
+
+    ## Test the dimension of the embedding.
+    def testEmbed(self):
+        for embedding in ('pca', 'random'):
+            selector = SamplingDaysSelector(binsPerTimeSeries=10, embedding=embedding, dimension=4)
+            bins = createBins(self.data, 10)
+            profiles, cumulatedBinSize = selector._profiles(bins)
+            embedded, target = selector._embed(bins, profiles, cumulatedBinSize)
+            self.assertEqual(embedded.shape, (len(self.data.days()), 4))
+            self.assertEqual(target.shape, (4,))
+            self.assertTrue(np.all(np.isfinite(embedded)))
+
+        # The dimension is limited to the number of bins
+        selector = SamplingDaysSelector(binsPerTimeSeries=2, embedding='pca', dimension=100)
+        bins = createBins(self.data, 2)
+        embedded, target = selector._embed(bins, *selector._profiles(bins))
+        self.assertLessEqual(embedded.shape[1], 3 * 2)
+
+    ## Test that the objective in the embedding orders the selections as the exact objective, the error between the
+    # cumulated bin sizes and the cumulated profiles of the selected days weighted to represent all the days.
+    def testOrdering(self):
+        bins = createBins(self.data, 10)
+        offsets = np.cumsum([0] + [bins.A[p].shape[0] for p in bins.labelRanges()])
+        for embedding in ('pca', 'random'):
+            selector = SamplingDaysSelector(numberRepresentativeDays=5, binsPerTimeSeries=10, embedding=embedding,
+                                            dimension=4)
+            profiles, cumulatedBinSize = selector._profiles(bins)
+            embedded, target = selector._embed(bins, profiles, cumulatedBinSize)
+            D = len(profiles)
+            rand = random.Random(1)
+            exact = []
+            estimated = []
+            for s in range(200):
+                selectedDays = selector._sampleDays(rand, D)
+                approximation = profiles[selectedDays].sum(axis=0) * D / 5
+                cumulatedApproximation = np.concatenate([np.cumsum(approximation[offsets[i]:offsets[i + 1]])
+                                                         for i in range(len(offsets) - 1)])
+                exact.append(np.abs(cumulatedBinSize - cumulatedApproximation).sum())
+                estimated.append(np.abs(target - embedded[selectedDays].sum(axis=0) * D / 5).sum())
+
+            # Rank correlation
+            ranks = [np.argsort(np.argsort(values)) for values in (exact, estimated)]
+            self.assertGreater(np.corrcoef(ranks[0], ranks[1])[0, 1], 0.8)
+
+    ## Test that the selection is exactly scored and reproducible.
+    def testSelectDays(self):
+        for embedding in ('pca', 'random'):
+            selector = SamplingDaysSelector(numberRepresentativeDays=5, timelimit=0.2, binsPerTimeSeries=10,
+                                            embedding=embedding, dimension=3)
+            days = selector.selectDays(self.data)
+            self.assertEqual(len(days), 5)
+            self.assertEqual(sum(days.values()), len(self.data.days()))
+
+            bins = createBins(self.data, 10)
+            profiles, cumulatedBinSize = selector._profiles(bins)
+            objective = selector._evaluateDays([bins.dayIndex[d] for d in days], profiles, cumulatedBinSize)[0]
+            self.assertAlmostEqual(selector.objective, objective)
+            self.assertIn('embedding', selector.configuration())
+
+    ## Test that unknown embeddings are rejected.
+    def testUnknown(self):
+        self.assertRaises(Exception, SamplingDaysSelector, embedding='tsne')
+        self.assertRaises(Exception, SamplingDaysSelector, embedding='pca', dimension=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
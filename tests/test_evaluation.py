@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import MinPopBins, evaluation, parseFile
+from daysxtractor.__main__ import main
+from daysxtractor.csv_interface import writeData, writeDays
+from daysxtractor.durationcurves import DurationCurves
+from daysxtractor.synthetic import generateData
+
+
+## Test the evaluation of files of representative days.
+class TestEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=29)
+        self.dataPath = os.path.join(self.folder, 'data.csv')
+        writeData(self.data, self.dataPath)
+        days = sorted(self.data.days())
+        self.daysFolder = os.path.join(self.folder, 'days')
+        os.makedirs(self.daysFolder)
+        self.daysPath = os.path.join(self.daysFolder, 'days[1].csv')
+        writeDays({days[3]: 30, days[40]: 43}, self.daysPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test the recognition of the batches.
+    def testBatch(self):
+        self.assertTrue(evaluation.isBatch(self.daysFolder))
+        self.assertTrue(evaluation.isBatch(os.path.join(self.daysFolder, '*.csv')))
+        self.assertFalse(evaluation.isBatch(self.daysPath))
+        self.assertFalse(evaluation.isBatch(os.path.join(self.daysFolder, 'other.csv')))
+        self.assertEqual(evaluation.expandPaths(self.daysFolder), [self.daysPath])
+
+    ## Test that the command line and the evaluation of a folder give the same measures.
+    def testSameMeasures(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = main(['-c', self.daysPath, '-o', self.folder, '-j', '1', self.dataPath])
+
+        data = parseFile(self.dataPath)
+        bins = MinPopBins(data, 40)
+        evaluations = evaluation.evaluateFiles(bins, [self.daysPath], DurationCurves(data), processes=1)
+        path, measures, error = evaluations[0]
+        self.assertIsNone(error)
+        for p in bins.labelRanges():
+            self.assertEqual(results[bins.labels[p].name], (measures[p]['nrmsError'], measures[p]['relativeAreaError']))
+            self.assertEqual((measures[p]['populationMin'], measures[p]['populationMax']), bins.population(p))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+
+## Maximum time in seconds to import the package.
+IMPORT_BUDGET = 1.0
+
+## Modules which must only be imported when a solver, a plot or an Excel file is used.
+HEAVY_MODULES = ['pyomo', 'matplotlib', 'xlrd', 'xlwt']
+
+
+## Test the import time of the package.
+class TestImports(unittest.TestCase):
+
+    ## Run python code in a fresh interpreter and return its output.
+    def runPython(self, code):
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        return subprocess.check_output([sys.executable, '-c', code], cwd=root, universal_newlines=True)
+
+    ## Test that the heavy dependencies are not imported with the package.
+    def testLazyImports(self):
+        output = self.runPython('import sys, daysxtractor, daysxtractor.__main__\n'
+                                 'print(" ".join(m for m in %r if m in sys.modules))' % HEAVY_MODULES)
+        self.assertEqual(output.strip(), '')
+
+    ## Test that the lazy attributes are available.
+    def testLazyAttributes(self):
+        output = self.runPython('import sys, daysxtractor\n'
+                                 'print(daysxtractor.MIPDaysSelector.__name__, "pyomo" in sys.modules)')
+        self.assertEqual(output.strip(), 'MIPDaysSelector True')
+
+    ## Test the import time of the package against the budget.
+    def testImportTime(self):
+        output = self.runPython('import time\n'
+                                 'tic = time.perf_counter()\n'
+                                 'import daysxtractor, daysxtractor.__main__\n'
+                                 'print(time.perf_counter() - tic)')
+        self.assertLess(float(output), IMPORT_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import metrics, binscache
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.synthetic import generateData
+from daysxtractor.mipdaysselector import solverAvailable
+
+SOLVER = 'appsi_highs' if solverAvailable('appsi_highs') else 'glpk' if solverAvailable('glpk') else None
+
+
+## Test the registry of the metrics.
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.folder = tempfile.mkdtemp()
+        self.defaultCache = binscache.defaultCache
+        binscache.defaultCache = binscache.BinsCache() # The bins are created by the tests, not found in the cache
+
+    def tearDown(self):
+        binscache.defaultCache = self.defaultCache
+        metrics.enable(False)
+        metrics.reset()
+        shutil.rmtree(self.folder)
+
+    ## Test that nothing is recorded while the metrics are disabled.
+    def testDisabled(self):
+        with metrics.timer('stage') as timer:
+            metrics.count('counter')
+            metrics.record('value', 1)
+        self.assertIsNone(timer)
+        self.assertEqual(metrics.report(), {'stages': {}, 'counters': {}, 'values': {}})
+
+    ## Test the timers, the counters, the values and the report.
+    def testReport(self):
+        metrics.enable()
+        for i in range(3):
+            with metrics.timer('stage'):
+                metrics.count('counter', 2)
+                metrics.count('seconds', 0.5)
+        metrics.record('value', 1)
+        metrics.record('value', 2)
+
+        report = metrics.report()
+        stage = report['stages']['stage']
+        self.assertEqual(stage['calls'], 3)
+        self.assertGreater(stage['seconds'], 0.0)
+        if metrics.peakMemory() is not None:
+            self.assertLessEqual(stage['processPeakMemory'], metrics.peakMemory())
+            self.assertGreaterEqual(stage['peakMemoryIncrease'], 0)
+        self.assertEqual(report['counters'], {'counter': 6, 'seconds': 1.5})
+        self.assertEqual(report['values'], {'value': 2})
+
+        path = os.path.join(self.folder, 'metrics.json')
+        metrics.dump(path)
+        with open(path) as file:
+            self.assertEqual(json.load(file), report)
+        metrics.reset()
+        self.assertEqual(metrics.report(), {'stages': {}, 'counters': {}, 'values': {}})
+
+    ## Test the metrics of a sampling.
+    def testSampling(self):
+        metrics.enable()
+        data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=37)
+        selector = SamplingDaysSelector(numberRepresentativeDays=3, timelimit=0.1, binsPerTimeSeries=8)
+        selector.selectDays(data)
+        report = metrics.report()
+        self.assertEqual(report['stages']['bins.MinPopBins']['calls'], 1)
+        # The bins are filled before and after merging the bins with a low population
+        self.assertEqual(report['counters']['bins.values'], 2 * (2 * len(data.days()) * 4))
+        self.assertGreater(report['counters']['sampling.samples'], 0)
+        self.assertEqual(report['values']['sampling.objective'], selector.objective)
+
+    ## Test that the solves of the LP rounding are all counted.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testSolves(self):
+        from daysxtractor.lproundingdaysselector import LPRoundingDaysSelector
+
+        metrics.enable()
+        data = generateData(years=0.1, periodsPerDay=4, labels=2, seed=37)
+        LPRoundingDaysSelector(numberRepresentativeDays=3, binsPerTimeSeries=5, solverName=SOLVER).selectDays(data)
+        report = metrics.report()
+        self.assertEqual(report['counters']['mip.solves'], 2)
+        self.assertEqual(report['stages']['mip.solve']['calls'], 2)
+        self.assertGreater(report['values']['mip.variables'], 0)
+        self.assertNotIn('mip.solverTime', report['values'])
+
+
+if __name__ == '__main__':
+    unittest.main()
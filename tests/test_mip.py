@@ -0,0 +1,32 @@
+import time
+import unittest
+
+from pyomo.environ import TerminationCondition
+
+from daysxtractor.binscache import createBins
+from daysxtractor.mipdaysselector import MIPDaysSelector, solverAvailable
+from daysxtractor.synthetic import generateData
+
+SOLVER = 'appsi_highs' if solverAvailable('appsi_highs') else 'glpk' if solverAvailable('glpk') else None
+
+
+## Test the MIP selector.
+class TestMIP(unittest.TestCase):
+
+    ## Test that a MIP which cannot be solved in the time limit stops at the time limit with its incumbent.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testTimeLimit(self):
+        data = generateData(years=0.25, periodsPerDay=24, labels=2, seed=1)
+        data = data.subset(sorted(data.days())[0:90])
+        selector = MIPDaysSelector(numberRepresentativeDays=4, timelimit=2, binsPerTimeSeries=40, solverName=SOLVER)
+        model = selector._buildModel(createBins(data, 40))
+
+        tic = time.time()
+        results = selector._solve(model)
+        self.assertLess(time.time() - tic, 10)
+        self.assertEqual(results.solver.termination_condition, TerminationCondition.maxTimeLimit)
+        self.assertEqual(sum(round(model.u[d].value) for d in model.days), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
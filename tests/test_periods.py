@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+
+from daysxtractor import SamplingDaysSelector, PeriodData, PeriodBins, MinPopBins, createBins
+from daysxtractor.durationcurves import DurationCurves
+from daysxtractor.synthetic import generateData
+
+
+## Test the representative periods of consecutive days.
+class TestPeriods(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=3)
+        self.days = list(self.data.days())
+
+    ## Test the periods and their values.
+    def testPeriodData(self):
+        periods = PeriodData(self.data, 7, 3)
+        self.assertEqual(len(periods.timeSeries), (len(self.days) - 7) // 3 + 1)
+        self.assertEqual(list(periods.days())[:2], [self.days[0], self.days[3]])
+        self.assertEqual(periods.periodDays(self.days[3]), self.days[3:10])
+
+        values, periodIndexes = periods.labelValues(1)
+        self.assertEqual(len(values), len(periods.timeSeries) * 7 * 4)
+        period = self.days[3]
+        self.assertEqual(values[periodIndexes == 1].tolist(), periods.timeSeries[period][1])
+        self.assertEqual(periods.timeSeries[period][1][4:8], self.data.timeSeries[self.days[4]][1])
+        self.assertNotEqual(periods.fingerprint(), PeriodData(self.data, 7, 2).fingerprint())
+
+        self.assertRaises(Exception, PeriodData, self.data, len(self.days) + 1)
+
+    ## Test that the bins of the periods are windows of the bins of the days.
+    def testPeriodBins(self):
+        dayBins = MinPopBins(self.data, 10)
+        bins = PeriodBins(dayBins, 7, 2)
+        for p in bins.labelRanges():
+            self.assertTrue(np.shares_memory(bins.windows[p], dayBins.A[p]))
+            for w, s in enumerate(range(0, len(self.days) - 6, 2)):
+                np.testing.assert_array_equal(bins.A[p][:, w], dayBins.A[p][:, s:s + 7].sum(axis=1))
+        self.assertEqual(bins.days[1], self.days[2])
+
+        # The cache derives the bins of the periods from the bins of the days
+        periodBins = createBins(PeriodData(self.data, 7, 2), 10)
+        for p in bins.labelRanges():
+            np.testing.assert_array_equal(periodBins.A[p], bins.A[p])
+
+    ## Test a selection of representative periods and its errors.
+    def testSelectPeriods(self):
+        periods = PeriodData(self.data, 2)
+        selector = SamplingDaysSelector(numberRepresentativeDays=3, timelimit=0.1, binsPerTimeSeries=10)
+        representativePeriods = selector.selectDays(periods)
+        self.assertEqual(sum(representativePeriods.values()), len(periods.timeSeries))
+        for period in representativePeriods:
+            self.assertIn(period, periods.timeSeries)
+
+        curves = DurationCurves(periods)
+        for p in periods.labelRanges():
+            self.assertLess(curves.relativeAreaError(p, representativePeriods), 0.2)
+
+        times, columns, weights = periods.representativeSeries(representativePeriods)
+        self.assertEqual(len(times), 3 * 2 * 4)
+        self.assertEqual(weights.sum(), len(periods.timeSeries) * 2 * 4)
+
+
+    ## Test that the exported weights of overlapping periods count the days of the data.
+    def testOverlappingWeights(self):
+        periods = PeriodData(self.data, 7, 1)
+        selector = SamplingDaysSelector(numberRepresentativeDays=3, timelimit=0.1, binsPerTimeSeries=10)
+        representativePeriods = selector.selectDays(periods)
+        self.assertAlmostEqual(sum(representativePeriods.values()), len(periods.timeSeries))
+
+        times, columns, weights = periods.representativeSeries(representativePeriods)
+        self.assertAlmostEqual(weights.sum(), len(periods.timeSeries) * 4)
+        for p in periods.labelRanges():
+            total = self.data.labelValues(p)[0].sum()
+            self.assertAlmostEqual(weights.dot(columns[p]) / total, 1.0, delta=0.2)
+
+    ## Test that the duration curves of overlapping periods keep the values of the days once.
+    def testOverlappingCurves(self):
+        periods = PeriodData(self.data, 7, 1)
+        curves = DurationCurves(periods)
+        weight = len(periods.timeSeries) / 2.0
+        representativePeriods = {self.days[0]: weight, self.days[10]: weight}
+        for p in periods.labelRanges():
+            self.assertEqual(len(curves._dayValues[p][0]), len(self.days) * 4)
+            curve = np.sort(periods.labelValues(p)[0])[::-1]
+            np.testing.assert_array_equal(curves.curve(p), curve)
+            difference = curve - curves.representativeCurve(p, representativePeriods)
+            expected = np.sqrt(difference.dot(difference) / len(curve)) / (curve[0] - curve[-1])
+            self.assertAlmostEqual(curves.nrmsError(p, representativePeriods), expected)
+
+    ## Test that more representative periods than periods are refused instead of sampling forever.
+    def testTooManyPeriods(self):
+        periods = PeriodData(self.data, 30, 30)
+        selector = SamplingDaysSelector(numberRepresentativeDays=len(periods.timeSeries) + 1, timelimit=0.1,
+                                        binsPerTimeSeries=10)
+        self.assertRaises(Exception, selector.selectDays, periods)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from daysxtractor import Bins, binscache
+from daysxtractor.data import plotLabels
+from daysxtractor.synthetic import generateData
+
+
+## Test the plots of the duration curves.
+class TestPlot(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.2, periodsPerDay=8, labels=3, seed=31)
+        self.days = list(self.data.days())
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test that the curves are the histograms of the values, read from the cached bins.
+    def testDurationCurve(self):
+        representativeDays = {self.days[2]: 40.0, self.days[50]: 33.0}
+        for p in self.data.labelRanges():
+            label = self.data.labels[p]
+            values, dayIndexes = self.data.labelValues(p)
+            edges = np.append(label.min + np.arange(0, 21) * (label.max - label.min) / 21, np.inf)[1:]
+            buckets = 20 - np.searchsorted(edges, values, side='right')
+
+            ticks, cumulated = self.data._durationCurve(p, 0.05)
+            self.assertEqual(len(ticks), 21)
+            self.assertTrue(np.allclose(cumulated, np.cumsum(np.bincount(buckets, minlength=21)) / len(values)))
+
+            weights = np.array([representativeDays.get(self.days[d], 0.0) for d in dayIndexes])
+            expected = np.cumsum(np.bincount(buckets, weights=weights, minlength=21)) / len(values)
+            self.assertTrue(np.allclose(self.data._durationCurve(p, 0.05, representativeDays)[1], expected))
+        self.assertIsNotNone(binscache.defaultCache.lookup(self.data, 21, Bins))
+        self.assertRaises(Exception, self.data._durationCurve, 0, 0.05, {'missing': 1.0})
+        self.assertRaises(Exception, self.data._durationCurve, 0, 1.5)
+
+    ## Test that a file is written for each label, in this process or in a pool.
+    def testPlot(self):
+        for processes, prefix in ((None, 'a-'), (2, 'b-')):
+            plotLabels(self.data, self.data.labels, {self.days[3]: len(self.days)},
+                       pathPrefix=os.path.join(self.folder, prefix), fileFormat='png', processes=processes)
+        self.assertEqual(sorted(os.listdir(self.folder)),
+                         sorted(prefix + label.name + '.png' for prefix in ('a-', 'b-') for label in self.data.labels))
+
+
+if __name__ == '__main__':
+    unittest.main()
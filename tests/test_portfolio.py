@@ -0,0 +1,79 @@
+import time
+import unittest
+from unittest import mock
+
+from daysxtractor.__main__ import main
+from daysxtractor.synthetic import generateData
+
+try:
+    from daysxtractor.mipdaysselector import solverAvailable
+    from daysxtractor.portfoliodaysselector import PortfolioMIPDaysSelector
+    solvers = [name for name in ('appsi_highs', 'highs', 'cbc', 'glpk') if solverAvailable(name)]
+except ImportError:
+    solvers = []
+
+
+## Test the racing of solvers.
+@unittest.skipIf(len(solvers) == 0, 'no optimization solver available')
+class TestPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.05, periodsPerDay=4, labels=2, seed=3)
+
+    ## Test that unavailable solvers are skipped and that each racing solver is reported.
+    def testRace(self):
+        selector = PortfolioMIPDaysSelector(numberRepresentativeDays=2, timelimit=10, binsPerTimeSeries=5,
+                                            solverNames=['missing'] + solvers)
+        representativeDays = selector.selectDays(self.data)
+        self.assertEqual(len(representativeDays), 2)
+        self.assertAlmostEqual(sum(representativeDays.values()), len(self.data.days()), 4)
+        self.assertEqual(selector.solverResults['missing']['status'], 'unavailable')
+        statuses = [selector.solverResults[name]['status'] for name in solvers]
+        self.assertIn('optimal', statuses)
+        self.assertEqual(len(selector.solverReport()), len(solvers) + 1)
+        self.assertIsNotNone(selector.objective)
+
+    ## Test that a portfolio without available solver is refused.
+    def testUnavailable(self):
+        self.assertRaises(Exception, PortfolioMIPDaysSelector, solverNames=['missing'])
+
+    ## Test that the solvers return their best solution at the time limit rather than being stopped after the grace.
+    @unittest.skipIf('appsi_highs' not in solvers, 'appsi_highs not available')
+    def testTimeLimit(self):
+        data = generateData(years=0.25, periodsPerDay=24, labels=2, seed=1)
+        selector = PortfolioMIPDaysSelector(numberRepresentativeDays=4, timelimit=2, binsPerTimeSeries=40,
+                                            solverNames=['appsi_highs'], grace=5)
+        tic = time.time()
+        representativeDays = selector.selectDays(data)
+        self.assertLess(time.time() - tic, 2 + 5)
+        self.assertEqual(selector.solverResults['appsi_highs']['status'], 'feasible')
+        self.assertEqual(len(representativeDays), 4)
+
+    ## Test that the failure of every solver is reported with the status of each solver.
+    def testNoSolution(self):
+        selector = PortfolioMIPDaysSelector(numberRepresentativeDays=2, timelimit=10, binsPerTimeSeries=5,
+                                            solverNames=solvers)
+        with mock.patch('daysxtractor.portfoliodaysselector._solve', _fail):
+            with self.assertRaisesRegex(Exception, 'No solution found:\n\t%s: error' % solvers[0]):
+                selector.selectDays(self.data)
+
+
+
+## Test the options of the portfolio.
+class TestPortfolioOptions(unittest.TestCase):
+
+    ## Test that a list of solvers is refused with a rounding or a decomposition instead of ignoring them.
+    def testRoundingOrDecomposition(self):
+        self.assertRaises(Exception, main, ['-s', 'cbc,glpk', '-r', 'top', 'data.csv'])
+        self.assertRaises(Exception, main, ['-s', 'cbc,glpk', '-d', 'month', 'data.csv'])
+
+
+## Racing process of a solver failing.
+# @param connection Connection receiving the result.
+def _fail(connection, model, solverName, timelimit):
+    connection.send({'status': 'error', 'error': 'failure'})
+    connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
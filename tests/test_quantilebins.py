@@ -0,0 +1,33 @@
+import os
+import unittest
+
+from daysxtractor import parseData
+from daysxtractor import QuantileBins
+
+
+## Test the quantile bins.
+class TestQuantileBins(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(__file__), '..', 'data', 'data.csv'), newline='') as file:
+            self.data = parseData(file)
+        self.bins = QuantileBins(self.data, 20)
+
+    ## Test that every value is in a bin.
+    def testSizes(self):
+        for p in self.bins.labelRanges():
+            self.assertEqual(self.bins.binsNumber[p], 20)
+            self.assertEqual(sum(self.bins.binSize[p]), self.data.labels[p].datapoints)
+            for b in self.bins.binRange(p):
+                self.assertEqual(sum(self.bins.A[p][b]), self.bins.binSize[p][b])
+
+    ## Test that the bins are evenly populated.
+    def testPopulations(self):
+        for p in self.bins.labelRanges():
+            populationMin, populationMax = self.bins.population(p)
+            self.assertGreater(populationMin, 0.0)
+            self.assertLess(populationMax, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from daysxtractor import csv_interface, columnar_interface
+from daysxtractor.data import parsePeriod, RESAMPLE_CHUNK_DAYS
+from daysxtractor.synthetic import generateData
+
+
+## Test the resampling of the time series.
+class TestResample(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.05, periodsPerDay=96, labels=2, seed=5)
+        # Day with a missing hour, as when switching to daylight saving time
+        self.short = list(self.data.days())[2]
+        self.data.timeSeries[self.short] = {p: v[:92] for p, v in self.data.timeSeries[self.short].items()}
+        self.data.computeLabelStatistics()
+
+    ## Test the parsing of the periods.
+    def testParsePeriod(self):
+        self.assertEqual(parsePeriod('1h'), datetime.timedelta(hours=1))
+        self.assertEqual(parsePeriod('15min'), datetime.timedelta(minutes=15))
+        self.assertEqual(parsePeriod('30s'), datetime.timedelta(seconds=30))
+        self.assertRaises(Exception, parsePeriod, 'hourly')
+
+    ## Test the aggregated values and the statistics of the labels.
+    def testAggregations(self):
+        functions = {'mean': np.mean, 'sum': np.sum, 'min': np.min, 'max': np.max}
+        for aggregation, function in functions.items():
+            data = self.data.resample(datetime.timedelta(hours=1), aggregation)
+            self.assertEqual(len(data.timeSeries[self.short][0]), 23)
+            for p in data.labelRanges():
+                values = []
+                for day in self.data.days():
+                    v = np.array(self.data.timeSeries[day][p])
+                    expected = [function(v[i:i + 4]) for i in range(0, len(v), 4)]
+                    np.testing.assert_allclose(data.timeSeries[day][p], expected)
+                    values += expected
+                self.assertEqual(data.labels[p].datapoints, len(values))
+                self.assertAlmostEqual(data.labels[p].min, min(values))
+                self.assertAlmostEqual(data.labels[p].max, max(values))
+                self.assertAlmostEqual(data.labels[p].average, np.mean(values))
+
+    ## Test that a period which is not a multiple of the period of the data is rejected.
+    def testInvalidPeriod(self):
+        self.assertRaises(Exception, self.data.resample, datetime.timedelta(minutes=10))
+        self.assertRaises(Exception, self.data.resample, datetime.timedelta(hours=1), 'median')
+
+    ## Test that resampling while parsing, by chunks of days, gives the resampled data of the file.
+    def testParse(self):
+        data = generateData(years=0.2, periodsPerDay=96, labels=2, seed=6)
+        self.assertGreater(len(data.days()), 2 * RESAMPLE_CHUNK_DAYS)
+        period = datetime.timedelta(hours=1)
+        with tempfile.TemporaryDirectory() as folder:
+            csvPath, npzPath = os.path.join(folder, 'data.csv'), os.path.join(folder, 'data.npz')
+            csv_interface.writeData(data, csvPath)
+            columnar_interface.writeData(data, npzPath)
+            for parse, path in ((csv_interface.parseFile, csvPath), (columnar_interface.parseFile, npzPath)):
+                for aggregation in ('mean', 'max'):
+                    expected = parse(path).resample(period, aggregation)
+                    parsed = parse(path, period=period, aggregation=aggregation)
+                    self.assertEqual(parsed.days(), expected.days())
+                    for p in expected.labelRanges():
+                        np.testing.assert_allclose(parsed.labelValues(p)[0], expected.labelValues(p)[0])
+                        self.assertEqual(parsed.labels[p].datapoints, expected.labels[p].datapoints)
+                        self.assertAlmostEqual(parsed.labels[p].min, expected.labels[p].min)
+                        self.assertAlmostEqual(parsed.labels[p].max, expected.labels[p].max)
+                        self.assertAlmostEqual(parsed.labels[p].average, expected.labels[p].average)
+
+
+if __name__ == '__main__':
+    unittest.main()
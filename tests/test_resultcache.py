@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.resultcache import ResultCache
+from daysxtractor.synthetic import generateData
+
+
+## Test the cache of the selections.
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.3, periodsPerDay=4, labels=2, seed=11)
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test that a selection is reused from the folder for the same data and configuration only.
+    def testHit(self):
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.2)
+        days, hit = ResultCache(self.folder).selectDays(self.data, selector)
+        self.assertFalse(hit)
+
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.2)
+        tic = time.time()
+        cachedDays, hit = ResultCache(self.folder).selectDays(self.data, selector)
+        self.assertTrue(hit)
+        self.assertLess(time.time() - tic, 0.2)
+        self.assertEqual(cachedDays, days)
+        self.assertIsNotNone(selector.objective)
+
+        for selector in (SamplingDaysSelector(numberRepresentativeDays=5, timelimit=0.2),
+                         SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.2, seed=1),
+                         SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.4)):
+            self.assertFalse(ResultCache(self.folder).selectDays(self.data, selector)[1])
+
+    ## Test that a longer time limit continues from the cached selection without degrading it.
+    def testContinue(self):
+        cache = ResultCache()
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.1)
+        cache.selectDays(self.data, selector)
+        objective = selector.objective
+
+        selector = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.3)
+        days, hit = cache.selectDays(self.data, selector, continueSelection=True)
+        self.assertFalse(hit)
+        self.assertLessEqual(selector.objective, objective)
+        self.assertEqual(cache.get(self.data, selector)['timeLimit'], 0.3)
+        self.assertEqual(len(days), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from daysxtractor.synthetic import generateData
+from daysxtractor.lproundingdaysselector import LPRoundingDaysSelector
+from daysxtractor.mipdaysselector import solverAvailable
+
+SOLVER = 'appsi_highs' if solverAvailable('appsi_highs') else 'glpk' if solverAvailable('glpk') else None
+
+
+## Test the rounding of the linear relaxation.
+class TestRounding(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.1, periodsPerDay=4, labels=2, seed=3)
+
+    ## Test the top and randomized roundings of a relaxed selection.
+    def testRound(self):
+        relaxed = {0: 0.9, 1: 0.1, 2: None, 3: 0.5, 4: 0.0}
+        selector = LPRoundingDaysSelector(numberRepresentativeDays=3, solverName='glpk')
+        self.assertEqual(selector._round(relaxed), [0, 3, 1])
+
+        selector = LPRoundingDaysSelector(numberRepresentativeDays=4, solverName='glpk', rounding='random', seed=5)
+        selection = selector._round(relaxed)
+        self.assertEqual(len(selection), 4)
+        self.assertEqual(set(selection[0:3]), {0, 1, 3})
+        self.assertEqual(selection, selector._round(relaxed))
+
+        self.assertRaises(Exception, LPRoundingDaysSelector, rounding='floor')
+
+    ## Test that the rounded selection is bounded by the optimal relaxation, whose bound is reported as trivial.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testSelect(self):
+        for rounding in ('top', 'random'):
+            selector = LPRoundingDaysSelector(numberRepresentativeDays=3, timelimit=10, binsPerTimeSeries=5,
+                                              solverName=SOLVER, rounding=rounding)
+            representativeDays = selector.selectDays(self.data)
+            self.assertEqual(len(representativeDays), 3)
+            self.assertAlmostEqual(sum(representativeDays.values()), len(self.data.days()), 4)
+            self.assertLessEqual(selector.lowerBound, selector.objective + 1e-6)
+            self.assertGreaterEqual(selector.gap(), -1e-6)
+            self.assertIn("trivial lower bound", selector.boundReport())
+
+    ## Test that a relaxation stopped before optimality gives no lower bound.
+    @unittest.skipIf(SOLVER is None, 'no optimization solver available')
+    def testStopped(self):
+        from pyomo.environ import TerminationCondition
+
+        class StoppedSelector(LPRoundingDaysSelector):
+            def _solve(self, model, warmstart=False, timeLimit=None):
+                results = LPRoundingDaysSelector._solve(self, model, warmstart, timeLimit)
+                results.solver.termination_condition = TerminationCondition.maxTimeLimit
+                return results
+
+        selector = StoppedSelector(numberRepresentativeDays=3, timelimit=10, binsPerTimeSeries=5, solverName=SOLVER)
+        self.assertEqual(len(selector.selectDays(self.data)), 3)
+        self.assertIsNotNone(selector.objective)
+        self.assertIsNone(selector.lowerBound)
+        self.assertIsNone(selector.gap())
+        self.assertIn("without lower bound", selector.boundReport())
+
+
+if __name__ == '__main__':
+    unittest.main()
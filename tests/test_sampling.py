@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from daysxtractor import SamplingDaysSelector
+from daysxtractor.synthetic import generateData
+
+
+## Test the random sampling of representative days.
+class TestSampling(unittest.TestCase):
+
+    ## Test that each day is assigned to the closest selected day.
+    def testAssignment(self):
+        profiles = np.array([[4, 0], [0, 4], [3, 1], [1, 3], [4, 0], [0, 4]])
+        cumulatedBinSize = profiles.sum(axis=0)
+        selector = SamplingDaysSelector(numberRepresentativeDays=2)
+        objValue, weights = selector._evaluateDays([4, 5], profiles, cumulatedBinSize)
+        self.assertEqual(weights, {4: 3, 5: 3})
+        self.assertEqual(objValue, float(np.abs(cumulatedBinSize - profiles[[4, 5]].sum(axis=0)).sum()))
+
+        objValue, weights = selector._evaluateDays([5, 2], profiles, cumulatedBinSize)
+        self.assertEqual(weights, {5: 3, 2: 3})
+
+    ## Test that the weights of a selection cover all the days.
+    def testSelect(self):
+        data = generateData(years=0.2, periodsPerDay=4, labels=2, seed=17)
+        days = SamplingDaysSelector(numberRepresentativeDays=4, timelimit=0.1, binsPerTimeSeries=8).selectDays(data)
+        self.assertEqual(len(days), 4)
+        self.assertEqual(sum(days.values()), len(data.days()))
+        self.assertTrue(all(w >= 1 for w in days.values()))
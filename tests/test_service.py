@@ -0,0 +1,87 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from daysxtractor.csv_interface import writeData
+from daysxtractor.service import DaysService, ServiceClient
+from daysxtractor.synthetic import generateData
+
+
+## Test the service with a local client.
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.folder, 'data.csv')
+        writeData(generateData(years=0.3, periodsPerDay=4, labels=2, seed=13), cls.path)
+
+        # Run the service in the event loop of another thread
+        cls.loop = asyncio.new_event_loop()
+        cls.service = DaysService(maxDatasets=2, processes=2)
+        threading.Thread(target=cls.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(cls.service.start(port=0), cls.loop).result()
+        cls.client = ServiceClient(port=cls.service.port())
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.service.close(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        shutil.rmtree(cls.folder)
+
+    ## Test that the data is parsed once and kept in memory.
+    def testLoad(self):
+        status, response = self.client.request('/load', {'path': self.path})
+        self.assertEqual(status, 200)
+        self.assertEqual(response['days'], 110)
+        self.assertEqual([l['name'] for l in response['labels']], ['Series 1', 'Series 2'])
+
+        status, response = self.client.request('/datasets')
+        self.assertEqual([dataset['path'] for dataset in response['datasets']], [os.path.abspath(self.path)])
+
+    ## Test that concurrent loads of a dataset share its worker and its parsing.
+    def testConcurrentLoads(self):
+        path = os.path.abspath(self.path)
+        started = []
+        startDataset = self.service._startDataset
+        self.service._startDataset = lambda *args: started.append(args) or startDataset(*args)
+        try:
+            async def load():
+                if (path, False) in self.service._datasets:
+                    self.service._evict((path, False))
+                return await asyncio.gather(*[self.service.handle('POST', '/load', {'path': path}) for _ in range(3)])
+            responses = asyncio.run_coroutine_threadsafe(load(), self.loop).result()
+        finally:
+            del self.service._startDataset
+        self.assertEqual(len(started), 1)
+        for status, response in responses:
+            self.assertEqual(status, 200, response)
+            self.assertEqual(response['days'], 110)
+
+    ## Test a selection and the check of the selected days.
+    def testSelectAndCheck(self):
+        status, selection = self.client.request('/select', {'path': self.path, 'number': 4, 'timelimit': 0.2})
+        self.assertEqual(status, 200, selection)
+        self.assertEqual(len(selection['days']), 4)
+        self.assertAlmostEqual(sum(selection['days'].values()), 110)
+
+        status, check = self.client.request('/check', {'path': self.path, 'days': selection['days']})
+        self.assertEqual(status, 200, check)
+        for name in ('Series 1', 'Series 2'):
+            self.assertAlmostEqual(check['errors'][name]['nrmsError'], selection['errors'][name]['nrmsError'])
+
+    ## Test the errors reported to the client.
+    def testErrors(self):
+        self.assertEqual(self.client.request('/unknown')[0], 404)
+        status, response = self.client.request('/select', {'path': os.path.join(self.folder, 'missing.csv')})
+        self.assertEqual(status, 400)
+        self.assertIn('error', response)
+        status, response = self.client.request('/check', {'path': self.path, 'days': {'2000-01-01': 1}})
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
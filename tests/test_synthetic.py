@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from daysxtractor import parseData
+from daysxtractor.csv_interface import writeData
+from daysxtractor.synthetic import generateData
+
+
+## Test the synthetic data generator.
+class TestSynthetic(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generateData(years=0.1, periodsPerDay=4, labels=2, seed=7)
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    ## Test the dimensions of the generated data.
+    def testDimensions(self):
+        self.assertEqual(len(self.data.days()), 36)
+        for l in self.data.labels:
+            self.assertEqual(l.datapoints, 36 * 4)
+
+    ## Test that the generator is reproducible.
+    def testSeed(self):
+        self.assertEqual(generateData(years=0.1, periodsPerDay=4, labels=2, seed=7).timeSeries, self.data.timeSeries)
+        self.assertNotEqual(generateData(years=0.1, periodsPerDay=4, labels=2, seed=8).timeSeries, self.data.timeSeries)
+
+    ## Test a round trip through a CSV file.
+    def testCSV(self):
+        path = os.path.join(self.folder, 'data.csv')
+        writeData(self.data, path, with_units=True)
+        with open(path, newline='') as file:
+            data = parseData(file, with_units=True)
+        self.assertEqual(list(data.days()), list(self.data.days()))
+        for p in data.labelRanges():
+            self.assertEqual(data.labels[p].units, 'MW')
+            self.assertAlmostEqual(data.labels[p].average, self.data.labels[p].average)
+
+
+if __name__ == '__main__':
+    unittest.main()